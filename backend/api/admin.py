@@ -0,0 +1,44 @@
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from ..core.security import UserPrincipal, get_current_superuser
+from ..core.config import settings
+from ..core.profiling import profile_store
+
+router = APIRouter(prefix=f"{settings.API_V1_STR}/admin", tags=["admin"])
+
+
+@router.get("/profiles")
+async def list_profiles(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: UserPrincipal = Depends(get_current_superuser)
+) -> List[Dict[str, Any]]:
+    """List the newest stored request profiles"""
+    return await run_in_threadpool(profile_store.list, limit)
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: str = Query("json", pattern="^(json|collapsed)$"),
+    current_user: UserPrincipal = Depends(get_current_superuser)
+):
+    """
+    Get a stored request profile
+    
+    format=collapsed returns the sampled stacks in the folded format read by
+    flamegraph.pl and speedscope.
+    """
+    profile = await run_in_threadpool(profile_store.get, profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    
+    if format == "collapsed":
+        stacks = profile.get("cpu", {}).get("collapsed_stacks", {})
+        return PlainTextResponse("\n".join(f"{stack} {count}" for stack, count in stacks.items()))
+    return profile
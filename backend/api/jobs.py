@@ -1,30 +1,749 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-
-from ..database.session import get_db
-from ..database.models import User, Job, Resume, JobMatch
-from ..schemas.job import JobCreate, JobResponse, MatchRequest, MatchResponse, MatchScore
-from ..core.security import get_current_user
+import time
+import numpy as np
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, delete, exists, func, or_, select
+from sqlalchemy.orm import aliased, defer
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from ..database.session import AsyncSessionLocal, get_async_db
+from ..database.bulk import (
+    bump_match_generation, delete_job_matches_except, rerank_job_matches, update_job_match_ranking,
+    update_job_match_scores, update_match_summary, update_resume_embeddings, upsert_job_matches
+)
+from ..database.models import Job, Resume, JobMatch
+from ..schemas.job import (
+    JobCreate, JobResponse, JobUpdate, JobUpdateResponse, MatchRequest, MatchStreamRequest, MatchResponse, MatchScore, RerankRequest,
+    BatchMatchRequest, BatchMatchResponse
+)
+from ..core.admission import admission, match_limiter
+from ..core.security import UserPrincipal, get_current_user
 from ..core.config import settings
-from ..services.matching_service import MatchingService
+from ..core.cache import TTLCache
+from ..core.http_cache import etag_matches, make_etag, not_modified, set_cache_headers
+from ..core.metrics import CACHE_REQUESTS, timed_stage
+from ..core.responses import FastJSONResponse, dump_json, model_content, rows_to_dicts, schema_fields
+from ..services.matching_service import (
+    MatchingService, compute_description_hash, compute_job_fingerprint, compute_resume_fingerprint
+)
+from ..services.embedding_store import get_embedding_store, store_embeddings
+from ..services.lexical_index import LexicalIndex, get_lexical_index
+from ..services.ranking import TopMatches, reciprocal_rank_fusion
 
 router = APIRouter(prefix=f"{settings.API_V1_STR}/jobs", tags=["jobs"])
 
 # Initialize matching service
 matching_service = MatchingService()
 
+# Keys of a match in responses, in MatchScore field order
+MATCH_SCORE_FIELDS = schema_fields(MatchScore)
+
+# Job list columns, selected in JobResponse field order
+JOB_RESPONSE_FIELDS = schema_fields(JobResponse)
+JOB_RESPONSE_COLUMNS = [getattr(Job, field) for field in JOB_RESPONSE_FIELDS]
+
+# Stored match component recomputed when a job field changes (title and
+# preferred_skills do not affect scoring; education does not depend on the job)
+COMPONENT_FIELDS = {
+    'semantic': 'description',
+    'skills': 'required_skills',
+    'experience': 'experience_level'
+}
+
+# Rankings ETag -> encoded MatchResponse body, per worker. The ETag covers the job's
+# updated_at and match generation, so a match run invalidates every entry of
+# the job in every worker; superseded entries age out.
+rankings_cache = TTLCache(
+    maxsize=settings.RANKINGS_CACHE_MAX_SIZE,
+    ttl=settings.RANKINGS_CACHE_TTL_SECONDS
+)
+
+
+@timed_stage("scoring")
+def _score_resumes(
+    job: Job,
+    resumes: List[Resume],
+    stored_embeddings: Dict[int, Tuple[str, Any]]
+) -> Tuple[List[Dict[str, Any]], Dict[int, List[float]]]:
+    """
+    Score resumes against a job (CPU-bound, run in the threadpool)
+    
+    Args:
+        job: Job to match against
+        resumes: Resumes to score
+        stored_embeddings: Readable stored (model, vector) per resume ID
+        
+    Returns:
+        Tuple of unsorted match dicts and embeddings generated with the
+        current model for resumes that had no readable one, keyed by resume ID
+    """
+    matches = []
+    new_embeddings = {}
+    job_embeddings = {matching_service.model_name: job.embedding}
+    
+    # Match each resume
+    for resume in resumes:
+        # Compare in one embedding space: the resume's stored model while it is
+        # still readable, otherwise re-embed the resume with the current model
+        space, resume_embedding = stored_embeddings.get(resume.id, (None, None))
+        if space is None:
+            space = matching_service.model_name
+            resume_embedding = matching_service.generate_embedding(resume.raw_text or "")
+            new_embeddings[resume.id] = resume_embedding
+        if space not in job_embeddings:
+            # Dual-read during a model migration: embed the job in the previous model too
+            job_embeddings[space] = matching_service.generate_embedding(job.description, space)
+        
+        # Calculate matching scores
+        match_result = matching_service.match_resume_to_job(
+            resume_text=resume.raw_text or "",
+            resume_skills=resume.skills or [],
+            resume_experience=resume.experience or [],
+            resume_education=resume.education or [],
+            job_description=job.description,
+            job_skills=job.required_skills or [],
+            job_experience_level=job.experience_level,
+            resume_embedding=resume_embedding,
+            job_embedding=job_embeddings[space],
+            weights=job.scoring_weights,
+            embedding_model=space
+        )
+        
+        matches.append({
+            'resume_id': resume.id,
+            'filename': resume.filename,
+            'overall_score': match_result['overall_score'],
+            'skill_match_score': match_result['skill_match_score'],
+            'experience_score': match_result['experience_score'],
+            'education_score': match_result['education_score'],
+            'semantic_similarity': match_result['semantic_similarity'],
+            'embedding_model': space
+        })
+    
+    return matches, new_embeddings
+
+
+async def _ensure_job_embedding(job: Job) -> None:
+    """Embed the job with the current model unless its stored vector already comes from it"""
+    if job.embedding and matching_service.embedding_space(job.embedding_model) == matching_service.model_name:
+        return
+    job.embedding = await run_in_threadpool(matching_service.generate_embedding, job.description)
+    job.embedding_model = matching_service.model_name
+    job.embedding_dim = len(job.embedding)
+    job.description_hash = compute_description_hash(job.description)
+
+
+async def _load_embeddings(
+    db: AsyncSession,
+    owner_id: int,
+    rows: List[Any]
+) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Readable stored resume embeddings, grouped by model
+    
+    Vectors are read from the host-local mmap store without deserialization;
+    any the store lacks are read from the database once and written back.
+    
+    Args:
+        db: Database session
+        owner_id: Owner of the resumes
+        rows: Resume rows with id and embedding_model
+        
+    Returns:
+        Per readable model, (resume IDs ascending, float32 matrix); resumes
+        without a readable embedding are left out
+    """
+    spaces: Dict[str, List[int]] = {}
+    for row in rows:
+        space = matching_service.embedding_space(row.embedding_model)
+        if space is not None:
+            spaces.setdefault(space, []).append(row.id)
+    
+    loaded = {}
+    for space, space_ids in spaces.items():
+        ids = np.array(sorted(space_ids), dtype=np.int64)
+        store = get_embedding_store(owner_id, space)
+        found, matrix = await run_in_threadpool(store.get, ids)
+        
+        missing = ids[~found].tolist()
+        if missing:
+            result = await db.execute(select(Resume.id, Resume.embedding).where(Resume.id.in_(missing)))
+            backfill = {row.id: row.embedding for row in result if row.embedding}
+            if backfill:
+                await run_in_threadpool(store_embeddings, owner_id, space, backfill)
+                if matrix.shape[1] == 0:
+                    matrix = np.empty((len(ids), len(next(iter(backfill.values())))), dtype=np.float32)
+                positions = np.searchsorted(ids, list(backfill.keys()))
+                matrix[positions] = np.asarray(list(backfill.values()), dtype=np.float32)
+                found[positions] = True
+        
+        if found.all():
+            loaded[space] = (ids, matrix)
+        elif found.any():
+            loaded[space] = (ids[found], matrix[found])
+    return loaded
+
+
+class MatchPlan(NamedTuple):
+    """Split of a match run into reusable stored scores and pairs to compute"""
+    job_fingerprint: str
+    total: int
+    reused: List[Dict[str, Any]]
+    changed_ids: List[int]
+    resume_fingerprints: Dict[int, str]
+
+
+async def _plan_match(
+    db: AsyncSession,
+    job: Job,
+    owner_id: int,
+    resume_ids: Optional[List[int]],
+    collapse_duplicates: bool = False
+) -> MatchPlan:
+    """
+    Decide which resumes need scoring for a match run
+    
+    Args:
+        db: Database session
+        job: Job being matched
+        owner_id: Owner of the job and resumes
+        resume_ids: Restrict the run to these resumes (all owned resumes if None)
+        collapse_duplicates: Keep only the most recently updated resume of each near-duplicate cluster
+        
+    Returns:
+        MatchPlan with reused match dicts and the IDs of new or changed resumes
+    """
+    # Get resumes to match (light columns only; full rows are loaded for changed pairs)
+    candidates_query = select(
+        Resume.id, Resume.filename, Resume.updated_at, Resume.duplicate_cluster_id, Resume.embedding_model
+    ).where(
+        Resume.owner_id == owner_id
+    )
+    if resume_ids:
+        candidates_query = candidates_query.where(Resume.id.in_(resume_ids))
+    candidates = (await db.execute(candidates_query)).all()
+    
+    if collapse_duplicates:
+        latest = {}
+        for candidate in candidates:
+            cluster = candidate.duplicate_cluster_id or candidate.id
+            current = latest.get(cluster)
+            if current is None or (candidate.updated_at, candidate.id) > (current.updated_at, current.id):
+                latest[cluster] = candidate
+        candidates = list(latest.values())
+    
+    if not candidates:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No resumes found to match"
+        )
+    
+    job_fingerprint = compute_job_fingerprint(job.description, job.required_skills, job.experience_level)
+    
+    # Stored scores are reusable when the job, resume, model and scoring code are unchanged
+    result = await db.execute(select(
+        JobMatch.resume_id,
+        JobMatch.overall_score,
+        JobMatch.skill_match_score,
+        JobMatch.experience_score,
+        JobMatch.education_score,
+        JobMatch.semantic_similarity,
+        JobMatch.resume_fingerprint,
+        JobMatch.embedding_model
+    ).where(
+        JobMatch.job_id == job.id,
+        JobMatch.job_fingerprint == job_fingerprint,
+        JobMatch.embedding_model.in_(matching_service.readable_models),
+        JobMatch.scoring_version == MatchingService.SCORING_VERSION
+    ))
+    stored = {row.resume_id: row for row in result}
+    
+    reused = []
+    changed_ids = []
+    resume_fingerprints = {}
+    for candidate in candidates:
+        fingerprint = compute_resume_fingerprint(candidate.updated_at)
+        resume_fingerprints[candidate.id] = fingerprint
+        row = stored.get(candidate.id)
+        # A re-embedded resume keeps its fingerprint, so the row's model must match the resume's
+        if (
+            row is not None
+            and row.resume_fingerprint == fingerprint
+            and row.embedding_model == matching_service.embedding_space(candidate.embedding_model)
+        ):
+            reused.append({
+                'resume_id': candidate.id,
+                'filename': candidate.filename,
+                # Components are reused as-is; the weights may have changed since
+                'overall_score': matching_service.calculate_overall_score(
+                    row.semantic_similarity or 0.0,
+                    row.skill_match_score or 0.0,
+                    row.experience_score or 0.0,
+                    row.education_score or 0.0,
+                    job.scoring_weights
+                ),
+                'skill_match_score': row.skill_match_score,
+                'experience_score': row.experience_score,
+                'education_score': row.education_score,
+                'semantic_similarity': row.semantic_similarity,
+                'embedding_model': row.embedding_model
+            })
+        else:
+            changed_ids.append(candidate.id)
+    
+    return MatchPlan(
+        job_fingerprint=job_fingerprint,
+        total=len(candidates),
+        reused=reused,
+        changed_ids=changed_ids,
+        resume_fingerprints=resume_fingerprints
+    )
+
+
+async def _build_lexical_index(db: AsyncSession, owner_id: int, index: LexicalIndex) -> None:
+    """
+    Build an owner's lexical index from stored resume text
+    
+    Uploads and deletes skip the index while it does not exist, so those
+    committed after the snapshot was read are applied once it is written.
+    
+    Args:
+        db: Database session
+        owner_id: Owner of the resumes
+        index: The owner's (unbuilt) index
+    """
+    result = await db.execute(select(Resume.id, Resume.raw_text).where(Resume.owner_id == owner_id))
+    documents = [(row.id, row.raw_text or "") for row in result]
+    await run_in_threadpool(index.rebuild, documents)
+    
+    # A new session, so that the check sees commits made after the snapshot
+    async with AsyncSessionLocal() as fresh:
+        current_ids = set((await fresh.execute(select(Resume.id).where(Resume.owner_id == owner_id))).scalars())
+        snapshot_ids = {doc_id for doc_id, _ in documents}
+        added_ids = current_ids - snapshot_ids
+        added = []
+        if added_ids:
+            result = await fresh.execute(select(Resume.id, Resume.raw_text).where(Resume.id.in_(added_ids)))
+            added = [(row.id, row.raw_text or "") for row in result]
+    
+    for doc_id, text in added:
+        await run_in_threadpool(index.add, doc_id, text)
+    for doc_id in snapshot_ids - current_ids:
+        await run_in_threadpool(index.remove, doc_id)
+
+
+async def _select_candidates(
+    db: AsyncSession,
+    job: Job,
+    owner_id: int,
+    match_request: MatchRequest
+) -> Optional[List[int]]:
+    """
+    Resolve which resumes a match run covers
+    
+    Explicit resume_ids win. Otherwise, with first_stage_k, the best
+    candidates from BM25 over resume text and from embedding similarity are
+    fused with reciprocal rank fusion so that only they reach component
+    scoring.
+    
+    Args:
+        db: Database session
+        job: Job being matched
+        owner_id: Owner of the job and resumes
+        match_request: Match parameters
+        
+    Returns:
+        Resume IDs to match, or None for all owned resumes
+    """
+    if match_request.resume_ids or match_request.first_stage_k is None:
+        return match_request.resume_ids
+    
+    k = match_request.first_stage_k
+    
+    # Lexical stage; build the index from stored text the first time it is needed
+    index = get_lexical_index(owner_id)
+    if not index.exists():
+        await _build_lexical_index(db, owner_id, index)
+    query = " ".join([job.description] + list(job.required_skills or []))
+    lexical = await run_in_threadpool(index.search, query, k)
+    
+    # Dense stage over stored embeddings, one ranking per readable model
+    await _ensure_job_embedding(job)
+    result = await db.execute(select(Resume.id, Resume.embedding_model).where(Resume.owner_id == owner_id))
+    embeddings = await _load_embeddings(db, owner_id, result.all())
+    
+    rankings = [[resume_id for resume_id, _ in lexical]]
+    for space, (ids, matrix) in embeddings.items():
+        job_embedding = job.embedding
+        if space != matching_service.model_name:
+            job_embedding = await run_in_threadpool(matching_service.generate_embedding, job.description, space)
+        neighbors = await run_in_threadpool(matching_service.nearest_neighbors, job_embedding, matrix, k)
+        rankings.append(ids[neighbors].tolist())
+    
+    fused = reciprocal_rank_fusion(rankings)
+    candidate_ids = [resume_id for resume_id, _ in fused[:k]]
+    if not candidate_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No resumes found to match"
+        )
+    return candidate_ids
+
+
+async def _score_changed(
+    db: AsyncSession,
+    job: Job,
+    owner_id: int,
+    resume_ids: List[int]
+) -> List[Dict[str, Any]]:
+    """
+    Load and score resumes, storing any embeddings generated on the way
+    
+    Args:
+        db: Database session
+        job: Job being matched
+        owner_id: Owner of the job and resumes
+        resume_ids: Resumes to score
+        
+    Returns:
+        Unsorted match dicts
+    """
+    # Get or generate job embedding
+    await _ensure_job_embedding(job)
+    
+    # Vectors come from the embedding store, not the JSON column
+    result = await db.execute(select(Resume).options(defer(Resume.embedding)).where(
+        Resume.id.in_(resume_ids),
+        Resume.owner_id == owner_id
+    ))
+    resumes = result.scalars().all()
+    stored_embeddings = {
+        resume_id: (space, vector)
+        for space, (ids, matrix) in (await _load_embeddings(db, owner_id, resumes)).items()
+        for resume_id, vector in zip(ids.tolist(), matrix)
+    }
+    
+    # Scoring runs the embedding model, keep it off the event loop
+    matches, new_embeddings = await run_in_threadpool(_score_resumes, job, resumes, stored_embeddings)
+    await update_resume_embeddings(db, new_embeddings, matching_service.model_name)
+    await run_in_threadpool(store_embeddings, owner_id, matching_service.model_name, new_embeddings)
+    return matches
+
+
+def _match_rows(job_id: int, matches: List[Dict[str, Any]], plan: MatchPlan) -> List[Dict[str, Any]]:
+    """Build job_matches upsert rows with scores, ranks and fingerprints"""
+    return [
+        {
+            'job_id': job_id,
+            'resume_id': m['resume_id'],
+            'overall_score': m['overall_score'],
+            'skill_match_score': m['skill_match_score'],
+            'experience_score': m['experience_score'],
+            'education_score': m['education_score'],
+            'semantic_similarity': m['semantic_similarity'],
+            'rank': m['rank'],
+            'job_fingerprint': plan.job_fingerprint,
+            'resume_fingerprint': plan.resume_fingerprints[m['resume_id']],
+            'embedding_model': m['embedding_model'],
+            'scoring_version': MatchingService.SCORING_VERSION
+        }
+        for m in matches
+    ]
+
+
+async def _apply_top_k(
+    db: AsyncSession,
+    job: Job,
+    matches: List[Dict[str, Any]],
+    selection: TopMatches,
+    scored_ids: Optional[List[int]]
+) -> None:
+    """
+    With top_k, delete this run's rows outside the top k and keep a tail summary on the job
+    
+    Only rows of the resumes scored in this run (all of the job's rows if
+    scored_ids is None) are pruned; rows of resumes the run did not reach (other
+    resume_ids, a stream deadline) are left as they are. Pruned pairs have no
+    stored scores, so the next match run scores them again: top_k trades reuse
+    of the tail for bounded storage.
+    """
+    match_summary = None
+    if selection.k is not None:
+        await delete_job_matches_except(
+            db, job.id, [m['resume_id'] for m in matches], within_resume_ids=scored_ids
+        )
+        match_summary = {
+            'total_scored': selection.total,
+            'tail_histogram': selection.tail_histogram()
+        }
+    
+    if job.match_summary != match_summary:
+        # Written like the match generation, so match runs do not move the job's updated_at
+        await update_match_summary(db, job.id, match_summary)
+        set_committed_value(job, 'match_summary', match_summary)
+
+
+async def _persist_matches(
+    db: AsyncSession,
+    job: Job,
+    matches: List[Dict[str, Any]],
+    plan: MatchPlan,
+    selection: TopMatches,
+    scored_ids: List[int],
+    partial: bool
+) -> None:
+    """
+    Write scores, ranks and fingerprints for the kept matches in one bulk upsert
+    
+    Args:
+        db: Database session
+        job: Job that was matched
+        matches: Kept matches, ranked
+        plan: Plan of the run
+        selection: Top-k selection the matches came from
+        scored_ids: Resumes scored (or reused) by this run
+        partial: The run may not have covered every resume with a stored match
+    """
+    await upsert_job_matches(db, _match_rows(job.id, matches, plan))
+    await _apply_top_k(db, job, matches, selection, scored_ids if partial else None)
+    if partial:
+        # Rows outside this run keep their old ranks; re-rank the whole job so ranks stay 1..N
+        await rerank_job_matches(db, job.id, job.scoring_weights or MatchingService.DEFAULT_WEIGHTS)
+    await bump_match_generation(db, [job.id])
+
+
+@timed_stage("scoring.batch")
+def _score_batch(
+    jobs: List[Job],
+    resumes: List[Any],
+    resume_embeddings: Dict[int, List[float]],
+    resume_spaces: Dict[int, str],
+    top_k: Optional[int]
+) -> List[TopMatches]:
+    """
+    Score several jobs against one resume matrix (CPU-bound, run in the threadpool)
+    
+    Args:
+        jobs: Jobs with current-model embeddings
+        resumes: Resume rows (id, filename, skills, experience, education)
+        resume_embeddings: Embedding per resume ID
+        resume_spaces: Readable model of each resume's embedding
+        top_k: Best matches kept per job (all if None)
+        
+    Returns:
+        One TopMatches selection per job, in job order
+    """
+    selections = [TopMatches(top_k) for _ in jobs]
+    
+    groups: Dict[str, List[Any]] = {}
+    for resume in resumes:
+        groups.setdefault(resume_spaces[resume.id], []).append(resume)
+    
+    # One matrix pass per embedding model; vectors are never compared across models
+    for space, group in groups.items():
+        if space == matching_service.model_name:
+            job_embeddings = [job.embedding for job in jobs]
+        else:
+            # Dual-read during a model migration: embed the jobs in the previous model too
+            job_embeddings = matching_service.generate_embeddings([job.description for job in jobs], space)
+        
+        blocks = matching_service.score_matrix_blocks(
+            job_embeddings=np.array(job_embeddings, dtype=np.float32),
+            job_skills=[job.required_skills or [] for job in jobs],
+            job_experience_levels=[job.experience_level for job in jobs],
+            job_weights=[job.scoring_weights for job in jobs],
+            resume_embeddings=np.array([resume_embeddings[r.id] for r in group], dtype=np.float32),
+            resume_skills=[r.skills or [] for r in group],
+            resume_experience_counts=np.array([len(r.experience or []) for r in group]),
+            resume_education_scores=np.array([
+                matching_service.calculate_education_score(r.education or []) for r in group
+            ]),
+            block_size=settings.MATCH_CHUNK_SIZE
+        )
+        
+        for start, scores in blocks:
+            for j, selection in enumerate(selections):
+                def build_match(i: int, j: int = j) -> Dict[str, Any]:
+                    resume = group[start + i]
+                    return {
+                        'resume_id': resume.id,
+                        'filename': resume.filename,
+                        'overall_score': float(scores['overall'][j, i]),
+                        'skill_match_score': float(scores['skills'][j, i]),
+                        'experience_score': float(scores['experience'][j, i]),
+                        'education_score': float(scores['education'][j, i]),
+                        'semantic_similarity': float(scores['semantic'][j, i]),
+                        'embedding_model': space
+                    }
+                
+                selection.extend_scores(scores['overall'][j], build_match)
+    
+    return selections
+
+
+def _match_content(job: Job, matches: List[Dict[str, Any]], plan: MatchPlan, selection: TopMatches) -> Dict[str, Any]:
+    """MatchResponse content built straight from the match dicts (see core.responses)"""
+    return model_content(
+        MatchResponse,
+        job_id=job.id,
+        job_title=job.title,
+        matches=[{field: m[field] for field in MATCH_SCORE_FIELDS} for m in matches],
+        total_matched=len(matches),
+        computed=selection.total - len(plan.reused),
+        reused=len(plan.reused),
+        total_scored=selection.total,
+        tail_histogram=selection.tail_histogram()
+    )
+
+
+def _encode_ndjson(event: Dict[str, Any]) -> bytes:
+    return dump_json(event) + b"\n"
+
+
+def _encode_sse(event: Dict[str, Any]) -> bytes:
+    return b"event: " + event['event'].encode() + b"\ndata: " + dump_json(event) + b"\n\n"
+
+
+async def _rescore_stored_matches(
+    db: AsyncSession,
+    job: Job,
+    owner_id: int,
+    previous_fingerprint: str,
+    components: List[str]
+) -> Tuple[int, int]:
+    """
+    Bring a job's stored matches up to date after an edit, recomputing only the changed components
+    
+    Rows scored against the job as it was before the edit get the given
+    components recomputed from the resumes' stored fields and vectors (no
+    resume is re-embedded), a new overall score and the job's new fingerprint,
+    so the next match run reuses them. Rows that were already stale keep their
+    scores and are recomputed by the next match run. A row whose resume has no
+    readable vector cannot get a new semantic score and is deleted. All rows
+    are then re-ranked. Matches cut by an earlier top_k run are not reconsidered.
+    
+    Args:
+        db: Database session
+        job: Job with the edit (and its new embedding) applied
+        owner_id: Owner of the job and resumes
+        previous_fingerprint: Job fingerprint before the edit
+        components: Components to recompute ('semantic', 'skills', 'experience')
+        
+    Returns:
+        Tuple of rows rescored and rows deleted
+    """
+    columns = [
+        JobMatch.id.label('match_id'),
+        JobMatch.job_fingerprint,
+        JobMatch.scoring_version,
+        JobMatch.semantic_similarity,
+        JobMatch.skill_match_score,
+        JobMatch.experience_score,
+        JobMatch.education_score,
+        JobMatch.embedding_model.label('match_embedding_model'),
+        Resume.id,
+        Resume.embedding_model
+    ]
+    if 'skills' in components:
+        columns.append(Resume.skills)
+    if 'experience' in components:
+        columns.append(Resume.experience)
+    result = await db.execute(select(*columns).join(
+        Resume, Resume.id == JobMatch.resume_id
+    ).where(JobMatch.job_id == job.id))
+    rows = result.all()
+    
+    if not rows:
+        return 0, 0
+    
+    scores = np.array(
+        [(r.semantic_similarity, r.skill_match_score, r.experience_score, r.education_score) for r in rows],
+        dtype=np.float64
+    )
+    spaces = [r.match_embedding_model for r in rows]
+    current = np.array([
+        r.job_fingerprint == previous_fingerprint and r.scoring_version == MatchingService.SCORING_VERSION
+        for r in rows
+    ], dtype=bool)
+    positions = np.flatnonzero(current)
+    keep = np.ones(len(rows), dtype=bool)
+    
+    if 'skills' in components:
+        for i in positions:
+            scores[i, 1] = matching_service.calculate_skill_match_score(rows[i].skills or [], job.required_skills or [])
+    
+    if 'experience' in components:
+        counts = np.array([len(rows[i].experience or []) for i in positions])
+        scores[positions, 2] = matching_service.calculate_experience_scores(counts, job.experience_level)
+    
+    if 'semantic' in components:
+        # Stored resume vectors against the new job vector; rows without a readable vector are dropped
+        keep[positions] = False
+        position_of = {rows[i].id: i for i in positions}
+        for space, (ids, matrix) in (await _load_embeddings(db, owner_id, [rows[i] for i in positions])).items():
+            if space == matching_service.model_name:
+                job_embedding = job.embedding
+            else:
+                # Dual-read during a model migration: embed the job in the previous model too
+                job_embedding = await run_in_threadpool(matching_service.generate_embedding, job.description, space)
+            space_positions = [position_of[resume_id] for resume_id in ids.tolist()]
+            scores[space_positions, 0] = await run_in_threadpool(
+                matching_service.calculate_semantic_similarities, job_embedding, matrix
+            )
+            keep[space_positions] = True
+            for i in space_positions:
+                spaces[i] = space
+    
+    dropped = [rows[i].match_id for i in np.flatnonzero(~keep)]
+    if dropped:
+        await db.execute(delete(JobMatch).where(JobMatch.id.in_(dropped)))
+    
+    # Re-rank everything kept; ties broken by resume ID like a full match run
+    kept = np.flatnonzero(keep)
+    overall = matching_service.calculate_overall_scores(scores[kept], job.scoring_weights)
+    order = np.lexsort((np.array([rows[i].id for i in kept]), -overall))
+    ranks = np.empty(len(kept), dtype=np.int64)
+    ranks[order] = np.arange(1, len(kept) + 1)
+    
+    def nullable(value: float) -> Optional[float]:
+        return None if np.isnan(value) else float(value)
+    
+    job_fingerprint = compute_job_fingerprint(job.description, job.required_skills, job.experience_level)
+    rescored, reranked = [], []
+    for k, i in enumerate(kept):
+        if current[i]:
+            rescored.append({
+                'id': rows[i].match_id,
+                'overall_score': float(overall[k]),
+                'skill_match_score': nullable(scores[i, 1]),
+                'experience_score': nullable(scores[i, 2]),
+                'education_score': nullable(scores[i, 3]),
+                'semantic_similarity': nullable(scores[i, 0]),
+                'rank': int(ranks[k]),
+                'job_fingerprint': job_fingerprint,
+                'embedding_model': spaces[i]
+            })
+        else:
+            reranked.append({'id': rows[i].match_id, 'overall_score': float(overall[k]), 'rank': int(ranks[k])})
+    
+    await update_job_match_scores(db, rescored)
+    await update_job_match_ranking(db, reranked)
+    return len(rescored), len(dropped)
+
 
 @router.post("/", response_model=JobResponse, status_code=status.HTTP_201_CREATED)
-def create_job(
+async def create_job(
     job_data: JobCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new job posting"""
     
     # Generate embedding for job description
-    job_embedding = matching_service.generate_embedding(job_data.description)
+    job_embedding = await run_in_threadpool(matching_service.generate_embedding, job_data.description)
     
     job = Job(
         title=job_data.title,
@@ -33,61 +752,212 @@ def create_job(
         preferred_skills=job_data.preferred_skills or [],
         experience_level=job_data.experience_level,
         owner_id=current_user.id,
-        embedding=job_embedding
+        embedding=job_embedding,
+        embedding_model=matching_service.model_name,
+        embedding_dim=len(job_embedding),
+        description_hash=compute_description_hash(job_data.description)
     )
     
     db.add(job)
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
     
     return job
 
 
 @router.get("/", response_model=List[JobResponse])
-def get_jobs(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_jobs(
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all jobs for the current user"""
-    jobs = db.query(Job).filter(Job.owner_id == current_user.id).all()
-    return jobs
+    # Version of the whole list: any create, delete or update changes one of these
+    result = await db.execute(select(
+        func.count(Job.id), func.max(Job.id), func.max(Job.updated_at)
+    ).where(Job.owner_id == current_user.id))
+    etag = make_etag("jobs", current_user.id, *result.one())
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    # Column tuples straight to JSON: no ORM objects (or embeddings) per job
+    result = await db.execute(select(*JOB_RESPONSE_COLUMNS).where(Job.owner_id == current_user.id))
+    response = FastJSONResponse(rows_to_dicts(result.all(), JOB_RESPONSE_FIELDS))
+    set_cache_headers(response, etag)
+    return response
 
 
 @router.get("/{job_id}", response_model=JobResponse)
-def get_job(
+async def get_job(
     job_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific job by ID"""
-    job = db.query(Job).filter(
+    result = await db.execute(select(Job.updated_at).where(
         Job.id == job_id,
         Job.owner_id == current_user.id
-    ).first()
+    ))
+    version = result.first()
+    
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    etag = make_etag("job", job_id, version.updated_at)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    # Skip the embedding; the response does not include it
+    result = await db.execute(select(Job).options(defer(Job.embedding)).where(Job.id == job_id))
+    job = result.scalar_one_or_none()
     
     if not job:
+        # Deleted since the version was read
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found"
         )
     
+    set_cache_headers(response, etag)
     return job
 
 
-@router.post("/{job_id}/match", response_model=MatchResponse)
-def match_candidates(
+@router.patch("/{job_id}", response_model=JobUpdateResponse)
+async def update_job(
+    job_id: int,
+    job_update: JobUpdate,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Edit a job posting, keeping its stored matches
+    
+    Only what the edit affects is recomputed: the job is re-embedded only when
+    the description's hash changes, and stored matches get just the affected
+    component scores recomputed (semantic for description, skills for
+    required_skills, experience for experience_level) before being re-ranked.
+    """
+    result = await db.execute(select(Job).where(
+        Job.id == job_id,
+        Job.owner_id == current_user.id
+    ))
+    job = result.scalar_one_or_none()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    updates = job_update.model_dump(exclude_unset=True)
+    for field in ('required_skills', 'preferred_skills'):
+        if field in updates and updates[field] is None:
+            updates[field] = []
+    changed_fields = [field for field, value in updates.items() if getattr(job, field) != value]
+    components = [component for component, field in COMPONENT_FIELDS.items() if field in changed_fields]
+    rescored, dropped = 0, 0
+    
+    if changed_fields:
+        previous_fingerprint = compute_job_fingerprint(job.description, job.required_skills, job.experience_level)
+        # Jobs created before the hash was stored: the embedding is of the current description
+        previous_hash = job.description_hash or compute_description_hash(job.description)
+        for field in changed_fields:
+            setattr(job, field, updates[field])
+        
+        description_hash = compute_description_hash(job.description)
+        if description_hash != previous_hash:
+            job.embedding = await run_in_threadpool(matching_service.generate_embedding, job.description)
+            job.embedding_model = matching_service.model_name
+            job.embedding_dim = len(job.embedding)
+            job.description_hash = description_hash
+        
+        if components:
+            rescored, dropped = await _rescore_stored_matches(
+                db, job, current_user.id, previous_fingerprint, components
+            )
+            if rescored or dropped:
+                if job.match_summary and job.match_summary.get('tail_histogram'):
+                    # Scores of the matches cut by top_k were not kept, so their histogram is out of date
+                    job.match_summary = {**job.match_summary, 'tail_histogram': None}
+                await bump_match_generation(db, [job_id])
+        
+        await db.commit()
+        await db.refresh(job)
+    
+    return JobUpdateResponse(
+        **{field: getattr(job, field) for field in JOB_RESPONSE_FIELDS},
+        changed_fields=changed_fields,
+        rescored_components=components,
+        rescored_matches=rescored,
+        invalidated_matches=dropped
+    )
+
+
+@router.post("/{job_id}/match", response_model=MatchResponse, dependencies=[Depends(admission(match_limiter))])
+async def match_candidates(
     job_id: int,
     match_request: MatchRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Match candidates with a job posting"""
     
     # Get job
-    job = db.query(Job).filter(
+    result = await db.execute(select(Job).where(
+        Job.id == job_id,
+        Job.owner_id == current_user.id
+    ))
+    job = result.scalar_one_or_none()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    resume_ids = await _select_candidates(db, job, current_user.id, match_request)
+    plan = await _plan_match(db, job, current_user.id, resume_ids, match_request.collapse_duplicates)
+    selection = TopMatches(match_request.top_k)
+    selection.extend(plan.reused)
+    
+    # Score new or changed resumes in bounded batches
+    chunk_size = settings.MATCH_CHUNK_SIZE
+    for offset in range(0, len(plan.changed_ids), chunk_size):
+        selection.extend(await _score_changed(
+            db, job, current_user.id, plan.changed_ids[offset:offset + chunk_size]
+        ))
+    
+    matches = selection.ranked()
+    scored_ids = [m['resume_id'] for m in plan.reused] + plan.changed_ids
+    partial = resume_ids is not None or match_request.collapse_duplicates
+    await _persist_matches(db, job, matches, plan, selection, scored_ids, partial)
+    await db.commit()
+    
+    return FastJSONResponse(_match_content(job, matches, plan, selection))
+
+
+@router.post("/{job_id}/match/stream", dependencies=[Depends(admission(match_limiter))])
+async def stream_match_candidates(
+    job_id: int,
+    match_request: MatchStreamRequest,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Match candidates, streaming progress and partial top matches as chunks are scored"""
+    started = time.monotonic()
+    
+    # Get job
+    result = await db.execute(select(Job).where(
         Job.id == job_id,
         Job.owner_id == current_user.id
-    ).first()
+    ))
+    job = result.scalar_one_or_none()
     
     if not job:
         raise HTTPException(
@@ -95,15 +965,103 @@ def match_candidates(
             detail="Job not found"
         )
     
-    # Get resumes to match
-    if match_request.resume_ids:
-        resumes = db.query(Resume).filter(
-            Resume.id.in_(match_request.resume_ids),
-            Resume.owner_id == current_user.id
-        ).all()
+    resume_ids = await _select_candidates(db, job, current_user.id, match_request)
+    plan = await _plan_match(db, job, current_user.id, resume_ids, match_request.collapse_duplicates)
+    deadline = None
+    if match_request.deadline_ms is not None:
+        deadline = started + match_request.deadline_ms / 1000
+    
+    async def events():
+        selection = TopMatches(match_request.top_k)
+        preview = TopMatches(match_request.preview_size)
+        selection.extend(plan.reused)
+        preview.extend(plan.reused)
+        scored_ids = [m['resume_id'] for m in plan.reused]
+        
+        yield {
+            'event': 'start',
+            'total': plan.total,
+            'reused': len(plan.reused),
+            'to_compute': len(plan.changed_ids)
+        }
+        
+        complete = True
+        chunk_size = match_request.chunk_size
+        for offset in range(0, len(plan.changed_ids), chunk_size):
+            if deadline is not None and time.monotonic() >= deadline:
+                complete = False
+                break
+            
+            chunk_ids = plan.changed_ids[offset:offset + chunk_size]
+            chunk_matches = await _score_changed(db, job, current_user.id, chunk_ids)
+            scored_ids.extend(chunk_ids)
+            selection.extend(chunk_matches)
+            preview.extend(chunk_matches)
+            
+            yield {
+                'event': 'progress',
+                'scored': selection.total,
+                'total': plan.total,
+                'top': preview.ranked()
+            }
+        
+        matches = selection.ranked()
+        # Unscored resumes keep their previous rows and are re-ranked with the rest
+        partial = resume_ids is not None or match_request.collapse_duplicates or not complete
+        await _persist_matches(db, job, matches, plan, selection, scored_ids, partial)
+        await db.commit()
+        
+        yield {
+            'event': 'final',
+            'complete': complete,
+            'result': _match_content(job, matches, plan, selection)
+        }
+    
+    if format == "sse":
+        body = (_encode_sse(event) async for event in events())
+        media_type = "text/event-stream"
     else:
-        # Match all resumes
-        resumes = db.query(Resume).filter(Resume.owner_id == current_user.id).all()
+        body = (_encode_ndjson(event) async for event in events())
+        media_type = "application/x-ndjson"
+    
+    return StreamingResponse(body, media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+@router.post("/match/batch", response_model=BatchMatchResponse, dependencies=[Depends(admission(match_limiter))])
+async def batch_match_candidates(
+    batch_request: BatchMatchRequest,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Match several jobs against the owner's resumes in a single matrix pass"""
+    
+    # Get jobs
+    result = await db.execute(select(Job).where(
+        Job.id.in_(batch_request.job_ids),
+        Job.owner_id == current_user.id
+    ))
+    jobs = result.scalars().all()
+    
+    missing_job_ids = set(batch_request.job_ids) - {job.id for job in jobs}
+    if missing_job_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Jobs not found: {sorted(missing_job_ids)}"
+        )
+    
+    # Load the resume matrix once for every job
+    resumes_query = select(
+        Resume.id,
+        Resume.filename,
+        Resume.updated_at,
+        Resume.skills,
+        Resume.experience,
+        Resume.education,
+        Resume.embedding_model
+    ).where(Resume.owner_id == current_user.id)
+    if batch_request.resume_ids:
+        resumes_query = resumes_query.where(Resume.id.in_(batch_request.resume_ids))
+    resumes = (await db.execute(resumes_query)).all()
     
     if not resumes:
         raise HTTPException(
@@ -111,107 +1069,303 @@ def match_candidates(
             detail="No resumes found to match"
         )
     
-    # Get or generate job embedding
-    if not job.embedding:
-        job.embedding = matching_service.generate_embedding(job.description)
-        db.commit()
+    # Embed whatever is missing, one model call per kind
+    jobs_without_embedding = [
+        job for job in jobs
+        if not job.embedding or matching_service.embedding_space(job.embedding_model) != matching_service.model_name
+    ]
+    if jobs_without_embedding:
+        embeddings = await run_in_threadpool(
+            matching_service.generate_embeddings, [job.description for job in jobs_without_embedding]
+        )
+        for job, embedding in zip(jobs_without_embedding, embeddings):
+            job.embedding = embedding
+            job.embedding_model = matching_service.model_name
+            job.embedding_dim = len(embedding)
+            job.description_hash = compute_description_hash(job.description)
     
-    matches = []
+    resume_embeddings = {}
+    resume_spaces = {}
+    for space, (ids, matrix) in (await _load_embeddings(db, current_user.id, resumes)).items():
+        for resume_id, vector in zip(ids.tolist(), matrix):
+            resume_embeddings[resume_id] = vector
+            resume_spaces[resume_id] = space
+    resume_ids_without_embedding = [r.id for r in resumes if r.id not in resume_spaces]
+    if resume_ids_without_embedding:
+        result = await db.execute(select(Resume.id, Resume.raw_text).where(
+            Resume.id.in_(resume_ids_without_embedding)
+        ))
+        texts = result.all()
+        embeddings = await run_in_threadpool(
+            matching_service.generate_embeddings, [t.raw_text or "" for t in texts]
+        )
+        new_embeddings = {t.id: embedding for t, embedding in zip(texts, embeddings)}
+        await update_resume_embeddings(db, new_embeddings, matching_service.model_name)
+        await run_in_threadpool(store_embeddings, current_user.id, matching_service.model_name, new_embeddings)
+        resume_embeddings.update(new_embeddings)
+        resume_spaces.update({resume_id: matching_service.model_name for resume_id in new_embeddings})
     
-    # Match each resume
-    for resume in resumes:
-        # Generate resume embedding if not exists
-        if not resume.embedding:
-            resume.embedding = matching_service.generate_embedding(resume.raw_text or "")
-            db.commit()
-        
-        # Calculate matching scores
-        match_result = matching_service.match_resume_to_job(
-            resume_text=resume.raw_text or "",
-            resume_skills=resume.skills or [],
-            resume_experience=resume.experience or [],
-            resume_education=resume.education or [],
-            job_description=job.description,
-            job_skills=job.required_skills or [],
-            job_experience_level=job.experience_level
+    # Jobs x resumes scoring is CPU-bound, keep it off the event loop
+    selections = await run_in_threadpool(
+        _score_batch, jobs, resumes, resume_embeddings, resume_spaces, batch_request.top_k
+    )
+    
+    resume_fingerprints = {r.id: compute_resume_fingerprint(r.updated_at) for r in resumes}
+    rows = []
+    results = []
+    for job, selection in zip(jobs, selections):
+        plan = MatchPlan(
+            job_fingerprint=compute_job_fingerprint(job.description, job.required_skills, job.experience_level),
+            total=len(resumes),
+            reused=[],
+            changed_ids=[],
+            resume_fingerprints=resume_fingerprints
         )
-        
-        # Update resume embedding if generated
-        if not resume.embedding:
-            resume.embedding = match_result['resume_embedding']
-            db.commit()
-        
-        # Create or update job match record
-        existing_match = db.query(JobMatch).filter(
-            JobMatch.job_id == job_id,
-            JobMatch.resume_id == resume.id
-        ).first()
-        
-        if existing_match:
-            match_record = existing_match
-        else:
-            match_record = JobMatch(
-                job_id=job_id,
-                resume_id=resume.id
-            )
-            db.add(match_record)
-        
-        match_record.overall_score = match_result['overall_score']
-        match_record.skill_match_score = match_result['skill_match_score']
-        match_record.experience_score = match_result['experience_score']
-        match_record.education_score = match_result['education_score']
-        match_record.semantic_similarity = match_result['semantic_similarity']
-        
-        matches.append({
-            'resume_id': resume.id,
-            'filename': resume.filename,
-            'overall_score': match_result['overall_score'],
-            'skill_match_score': match_result['skill_match_score'],
-            'experience_score': match_result['experience_score'],
-            'education_score': match_result['education_score'],
-            'semantic_similarity': match_result['semantic_similarity']
-        })
+        matches = selection.ranked()
+        rows.extend(_match_rows(job.id, matches, plan))
+        results.append((job, matches, plan, selection))
     
-    db.commit()
+    # Every job's rankings go out in one bulk upsert
+    await upsert_job_matches(db, rows)
+    for job, matches, plan, selection in results:
+        await _apply_top_k(db, job, matches, selection, batch_request.resume_ids or None)
+        if batch_request.resume_ids:
+            await rerank_job_matches(db, job.id, job.scoring_weights or MatchingService.DEFAULT_WEIGHTS)
+    await bump_match_generation(db, [job.id for job in jobs])
+    await db.commit()
     
-    # Sort matches by overall score (descending)
-    matches.sort(key=lambda x: x['overall_score'], reverse=True)
+    return FastJSONResponse(model_content(
+        BatchMatchResponse,
+        results=[_match_content(job, matches, plan, selection) for job, matches, plan, selection in results],
+        total_jobs=len(jobs),
+        total_resumes=len(resumes)
+    ))
+
+
+@router.post("/{job_id}/rerank", response_model=MatchResponse)
+async def rerank_candidates(
+    job_id: int,
+    rerank_request: RerankRequest,
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Re-rank stored matches with custom weights, without rescoring any resume
     
-    # Assign ranks
-    for rank, match_data in enumerate(matches, start=1):
-        match_data['rank'] = rank
-        
-        # Update rank in database
-        match_record = db.query(JobMatch).filter(
-            JobMatch.job_id == job_id,
-            JobMatch.resume_id == match_data['resume_id']
-        ).first()
-        if match_record:
-            match_record.rank = rank
+    Only with save_profile are the weights stored on the job and the new
+    scores and ranks written back; otherwise the result is a preview and the
+    stored rankings keep using the job's weights.
+    """
+    
+    # Get job
+    result = await db.execute(select(Job).where(
+        Job.id == job_id,
+        Job.owner_id == current_user.id
+    ))
+    job = result.scalar_one_or_none()
     
-    db.commit()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
     
-    return MatchResponse(
+    result = await db.execute(select(
+        JobMatch.id,
+        JobMatch.resume_id,
+        Resume.filename,
+        JobMatch.semantic_similarity,
+        JobMatch.skill_match_score,
+        JobMatch.experience_score,
+        JobMatch.education_score
+    ).join(
+        Resume, Resume.id == JobMatch.resume_id
+    ).where(JobMatch.job_id == job_id))
+    rows = result.all()
+    
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No matches to re-rank; run a match first"
+        )
+    
+    weights = rerank_request.weights.model_dump()
+    components = np.array(
+        [(r.semantic_similarity, r.skill_match_score, r.experience_score, r.education_score) for r in rows],
+        dtype=np.float64
+    )
+    overall = matching_service.calculate_overall_scores(components, weights)
+    
+    # Best score first; ties broken by resume ID like a full match run
+    order = np.lexsort((np.array([r.resume_id for r in rows]), -overall))
+    ranks = np.empty(len(rows), dtype=np.int64)
+    ranks[order] = np.arange(1, len(rows) + 1)
+    
+    if rerank_request.save_profile:
+        # Stored scores must follow the job's weights, which later match runs score with
+        await update_job_match_ranking(db, [
+            {'id': row.id, 'overall_score': float(overall[i]), 'rank': int(ranks[i])}
+            for i, row in enumerate(rows)
+        ])
+        job.scoring_weights = weights
+        await bump_match_generation(db, [job_id])
+        await db.commit()
+    
+    matches = [
+        {
+            'resume_id': rows[i].resume_id,
+            'filename': rows[i].filename,
+            'overall_score': float(overall[i]),
+            'skill_match_score': rows[i].skill_match_score,
+            'experience_score': rows[i].experience_score,
+            'education_score': rows[i].education_score,
+            'semantic_similarity': rows[i].semantic_similarity,
+            'rank': int(ranks[i])
+        }
+        for i in order[:limit]
+    ]
+    
+    return FastJSONResponse(model_content(
+        MatchResponse,
         job_id=job_id,
         job_title=job.title,
-        matches=[MatchScore(**m) for m in matches],
-        total_matched=len(matches)
+        matches=matches,
+        total_matched=len(matches),
+        # A preview's ranks are not stored, so only saved rankings can be paged through
+        next_cursor=(
+            _format_cursor(matches[-1]['rank'], matches[-1]['resume_id'])
+            if rerank_request.save_profile and len(rows) > limit else None
+        ),
+        total_scored=len(rows)
+    ))
+
+
+def _format_cursor(rank: int, resume_id: int) -> str:
+    """Keyset cursor "rank:resume_id" pointing just past a match"""
+    return f"{rank}:{resume_id}"
+
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[Tuple[int, Optional[int]]]:
+    """
+    Parse a rankings cursor
+    
+    Args:
+        cursor: "rank:resume_id" from next_cursor, or a bare rank (after every match of that rank)
+        
+    Returns:
+        (rank, resume_id or None), or None without a cursor
+    """
+    if cursor is None:
+        return None
+    
+    try:
+        parts = [int(part) for part in cursor.split(":")]
+    except ValueError:
+        parts = []
+    if len(parts) not in (1, 2) or min(parts) < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return parts[0], (parts[1] if len(parts) == 2 else None)
+
+
+def _ranked_after(match: Any, rank: Any, resume_id: Any) -> Any:
+    """SQL condition: match comes after (rank, resume_id) in ranking order"""
+    return or_(match.rank > rank, and_(match.rank == rank, match.resume_id > resume_id))
+
+
+async def _rankings_body(
+    db: AsyncSession,
+    job: Any,
+    limit: int,
+    cursor: Optional[Tuple[int, Optional[int]]],
+    min_score: Optional[float],
+    collapse_duplicates: bool
+) -> bytes:
+    """Query a page of a job's rankings and encode it as a MatchResponse"""
+    job_id = job.id
+    
+    # Single joined query over the (job_id, rank) index, projecting only the
+    # columns the response needs, in MatchScore field order
+    query = select(
+        JobMatch.resume_id,
+        Resume.filename,
+        JobMatch.overall_score,
+        JobMatch.skill_match_score,
+        JobMatch.experience_score,
+        JobMatch.education_score,
+        JobMatch.semantic_similarity,
+        JobMatch.rank
+    ).join(
+        Resume, Resume.id == JobMatch.resume_id
+    ).where(
+        JobMatch.job_id == job_id,
+        JobMatch.rank.isnot(None)
     )
+    
+    if cursor is not None:
+        # Keyset on (rank, resume_id), so the page boundary holds even if two rows share a rank
+        rank, resume_id = cursor
+        query = query.where(JobMatch.rank > rank if resume_id is None else _ranked_after(JobMatch, rank, resume_id))
+    if min_score is not None:
+        query = query.where(JobMatch.overall_score >= min_score)
+    if collapse_duplicates:
+        # Drop a match when a better-ranked match of the same job is in the same cluster
+        sibling_match = aliased(JobMatch)
+        sibling = aliased(Resume)
+        query = query.where(~exists().where(
+            sibling_match.job_id == job_id,
+            _ranked_after(JobMatch, sibling_match.rank, sibling_match.resume_id),
+            sibling.id == sibling_match.resume_id,
+            func.coalesce(sibling.duplicate_cluster_id, sibling.id) == func.coalesce(Resume.duplicate_cluster_id, Resume.id)
+        ))
+    
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(query.order_by(JobMatch.rank.asc(), JobMatch.resume_id.asc()).limit(limit + 1))
+    rows = result.all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _format_cursor(rows[-1].rank, rows[-1].resume_id)
+    
+    matches = rows_to_dicts(rows, MATCH_SCORE_FIELDS)
+    
+    return dump_json(model_content(
+        MatchResponse,
+        job_id=job_id,
+        job_title=job.title,
+        matches=matches,
+        total_matched=len(matches),
+        next_cursor=next_cursor,
+        total_scored=(job.match_summary or {}).get('total_scored'),
+        tail_histogram=(job.match_summary or {}).get('tail_histogram')
+    ))
 
 
 @router.get("/{job_id}/rankings", response_model=MatchResponse)
-def get_rankings(
+async def get_rankings(
     job_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (\"rank:resume_id\")"),
+    min_score: Optional[float] = Query(None, ge=0.0, le=1.0),
+    collapse_duplicates: bool = Query(False, description="Show only the best-ranked resume of each near-duplicate cluster"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get ranked candidates for a job"""
     
     # Get job
-    job = db.query(Job).filter(
+    result = await db.execute(select(
+        Job.id, Job.title, Job.match_summary, Job.updated_at, Job.match_generation
+    ).where(
         Job.id == job_id,
         Job.owner_id == current_user.id
-    ).first()
+    ))
+    job = result.first()
     
     if not job:
         raise HTTPException(
@@ -219,45 +1373,38 @@ def get_rankings(
             detail="Job not found"
         )
     
-    # Get all matches for this job
-    job_matches = db.query(JobMatch).filter(
-        JobMatch.job_id == job_id
-    ).order_by(JobMatch.rank.asc()).all()
+    position = _parse_cursor(cursor)
     
-    matches = []
-    for match in job_matches:
-        resume = db.query(Resume).filter(Resume.id == match.resume_id).first()
-        if resume:
-            matches.append(MatchScore(
-                resume_id=resume.id,
-                filename=resume.filename,
-                overall_score=match.overall_score,
-                skill_match_score=match.skill_match_score,
-                experience_score=match.experience_score,
-                education_score=match.education_score,
-                semantic_similarity=match.semantic_similarity,
-                rank=match.rank or 0
-            ))
-    
-    return MatchResponse(
-        job_id=job_id,
-        job_title=job.title,
-        matches=matches,
-        total_matched=len(matches)
+    # Rankings only change through match runs (match_generation) and job edits (updated_at)
+    etag = make_etag(
+        "rankings", job_id, job.updated_at, job.match_generation, limit, cursor, min_score, collapse_duplicates
     )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    body = rankings_cache.get(etag)
+    CACHE_REQUESTS.labels("rankings", "miss" if body is None else "hit").inc()
+    if body is None:
+        body = await _rankings_body(db, job, limit, position, min_score, collapse_duplicates)
+        rankings_cache.set(etag, body)
+    
+    response = Response(body, media_type="application/json")
+    set_cache_headers(response, etag)
+    return response
 
 
 @router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_job(
+async def delete_job(
     job_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a job posting"""
-    job = db.query(Job).filter(
+    result = await db.execute(select(Job).where(
         Job.id == job_id,
         Job.owner_id == current_user.id
-    ).first()
+    ))
+    job = result.scalar_one_or_none()
     
     if not job:
         raise HTTPException(
@@ -266,9 +1413,9 @@ def delete_job(
         )
     
     # Delete associated matches
-    db.query(JobMatch).filter(JobMatch.job_id == job_id).delete()
+    await db.execute(delete(JobMatch).where(JobMatch.job_id == job_id))
     
-    db.delete(job)
-    db.commit()
+    await db.delete(job)
+    await db.commit()
     
     return None
@@ -1,29 +1,93 @@
 import os
 import shutil
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, UploadFile, File
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from starlette.concurrency import run_in_threadpool
 
-from ..database.session import get_db
-from ..database.models import User, Resume
+from ..database.session import get_async_db
+from ..database.models import Resume, ResumeLSHBucket
 from ..schemas.resume import ResumeResponse, ResumeUploadResponse
-from ..core.security import get_current_user
+from ..core.admission import admission, upload_limiter
+from ..core.security import UserPrincipal, get_current_user
 from ..core.config import settings
+from ..core.http_cache import etag_matches, make_etag, not_modified, set_cache_headers
+from ..core.responses import FastJSONResponse, rows_to_dicts, schema_fields
 from ..services.resume_parser import ResumeParser
 from ..services.nlp_engine import NLPEngine
+from ..services.embedding_store import forget_resume
+from ..services.lexical_index import index_resume, unindex_resume
+from ..services.near_duplicates import NearDuplicateDetector
+from ..services.ingestion import extract_information, ingestion_pool, parse_resume
 
 router = APIRouter(prefix=f"{settings.API_V1_STR}/resumes", tags=["resumes"])
 
 # Initialize services
 resume_parser = ResumeParser()
 nlp_engine = NLPEngine()
+near_duplicates = NearDuplicateDetector()
 
+# Resume list columns, selected in ResumeResponse field order
+RESUME_RESPONSE_FIELDS = schema_fields(ResumeResponse)
+RESUME_RESPONSE_COLUMNS = [getattr(Resume, field) for field in RESUME_RESPONSE_FIELDS]
 
-@router.post("/upload", response_model=ResumeUploadResponse, status_code=status.HTTP_201_CREATED)
+
+def _save_upload(file: UploadFile, file_path: str) -> None:
+    """Copy an uploaded file to disk (blocking, run in the threadpool)"""
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+
+
+async def _ingest(task, fallback, *args):
+    """Run a parsing/NLP step in the ingestion pool, or in the threadpool when the pool is disabled"""
+    if ingestion_pool.enabled:
+        return await ingestion_pool.run(task, *args)
+    return await run_in_threadpool(fallback, *args)
+
+
+async def _find_near_duplicate(
+    db: AsyncSession,
+    owner_id: int,
+    signature: List[int]
+) -> Tuple[Optional[Resume], float]:
+    """
+    Find the owner's most similar existing resume through the LSH buckets
+    
+    Args:
+        db: Database session
+        owner_id: Owner whose resumes are searched
+        signature: MinHash signature of the new resume
+        
+    Returns:
+        (best candidate or None, its estimated Jaccard similarity)
+    """
+    keys = near_duplicates.band_keys(signature)
+    candidate_ids = select(ResumeLSHBucket.resume_id).where(
+        ResumeLSHBucket.owner_id == owner_id,
+        tuple_(ResumeLSHBucket.band, ResumeLSHBucket.bucket_key).in_(list(enumerate(keys)))
+    )
+    result = await db.execute(select(Resume).where(Resume.id.in_(candidate_ids)))
+    
+    best, best_similarity = None, 0.0
+    for candidate in result.scalars():
+        similarity = near_duplicates.similarity(signature, candidate.minhash_signature)
+        if similarity > best_similarity:
+            best, best_similarity = candidate, similarity
+    return best, best_similarity
+
+
+@router.post(
+    "/upload",
+    response_model=ResumeUploadResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admission(upload_limiter))]
+)
 async def upload_resume(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload and process a resume file"""
     
@@ -42,8 +106,7 @@ async def upload_resume(
     # Save file
     file_path = os.path.join(upload_dir, f"{current_user.id}_{file.filename}")
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await run_in_threadpool(_save_upload, file, file_path)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -52,7 +115,7 @@ async def upload_resume(
     
     # Parse resume
     try:
-        parsed_data = resume_parser.parse(file_path)
+        parsed_data = await _ingest(parse_resume, resume_parser.parse, file_path)
         raw_text = parsed_data['text']
     except Exception as e:
         os.remove(file_path)
@@ -61,16 +124,34 @@ async def upload_resume(
             detail=f"Error parsing resume: {str(e)}"
         )
     
-    # Extract information using NLP
-    try:
-        extracted_info = nlp_engine.process_resume(raw_text)
-    except Exception as e:
-        # Continue even if NLP extraction fails
+    # Look for a near-duplicate (re-submitted or re-exported) resume
+    signature = await run_in_threadpool(near_duplicates.signature, raw_text)
+    sibling, similarity = None, 0.0
+    if signature is not None:
+        sibling, similarity = await _find_near_duplicate(db, current_user.id, signature)
+        if similarity < settings.NEAR_DUPLICATE_THRESHOLD:
+            sibling = None
+    
+    embedding, embedding_model = None, None
+    if sibling is not None and similarity >= settings.NEAR_DUPLICATE_REUSE_THRESHOLD:
+        # Practically the same document: reuse the sibling's artifacts instead of reprocessing
         extracted_info = {
-            'skills': [],
-            'experience': [],
-            'education': []
+            'skills': sibling.skills or [],
+            'experience': sibling.experience or [],
+            'education': sibling.education or []
         }
+        embedding, embedding_model = sibling.embedding, sibling.embedding_model
+    else:
+        # Extract information using NLP
+        try:
+            extracted_info = await _ingest(extract_information, nlp_engine.process_resume, raw_text)
+        except Exception as e:
+            # Continue even if NLP extraction fails
+            extracted_info = {
+                'skills': [],
+                'experience': [],
+                'education': []
+            }
     
     # Create resume record
     resume = Resume(
@@ -80,62 +161,102 @@ async def upload_resume(
         raw_text=raw_text,
         skills=extracted_info.get('skills', []),
         experience=extracted_info.get('experience', []),
-        education=extracted_info.get('education', [])
+        education=extracted_info.get('education', []),
+        embedding=embedding,
+        embedding_model=embedding_model,
+        embedding_dim=len(embedding) if embedding else None,
+        minhash_signature=signature
     )
     
     db.add(resume)
-    db.commit()
-    db.refresh(resume)
+    await db.flush()
+    
+    # Join the sibling's cluster, or start a cluster of one
+    resume.duplicate_cluster_id = (sibling.duplicate_cluster_id or sibling.id) if sibling is not None else resume.id
+    if signature is not None:
+        db.add_all([
+            ResumeLSHBucket(owner_id=current_user.id, resume_id=resume.id, band=band, bucket_key=key)
+            for band, key in enumerate(near_duplicates.band_keys(signature))
+        ])
+    
+    await db.commit()
+    await db.refresh(resume)
+    
+    await run_in_threadpool(index_resume, current_user.id, resume.id, raw_text)
     
     return ResumeUploadResponse(
         id=resume.id,
         filename=resume.filename,
-        message="Resume uploaded and processed successfully"
+        message="Resume uploaded and processed successfully",
+        duplicate_cluster_id=resume.duplicate_cluster_id
     )
 
 
 @router.get("/", response_model=List[ResumeResponse])
-def get_resumes(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_resumes(
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all resumes for the current user"""
-    resumes = db.query(Resume).filter(Resume.owner_id == current_user.id).all()
-    return resumes
+    # Column tuples straight to JSON: no ORM objects, embeddings or signatures per resume
+    result = await db.execute(select(*RESUME_RESPONSE_COLUMNS).where(Resume.owner_id == current_user.id))
+    return FastJSONResponse(rows_to_dicts(result.all(), RESUME_RESPONSE_FIELDS))
 
 
 @router.get("/{resume_id}", response_model=ResumeResponse)
-def get_resume(
+async def get_resume(
     resume_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific resume by ID"""
-    resume = db.query(Resume).filter(
+    result = await db.execute(select(Resume.updated_at).where(
         Resume.id == resume_id,
         Resume.owner_id == current_user.id
-    ).first()
+    ))
+    version = result.first()
+    
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found"
+        )
+    
+    etag = make_etag("resume", resume_id, version.updated_at)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    # Skip the vectors; the response does not include them
+    result = await db.execute(select(Resume).options(
+        defer(Resume.embedding), defer(Resume.minhash_signature)
+    ).where(Resume.id == resume_id))
+    resume = result.scalar_one_or_none()
     
     if not resume:
+        # Deleted since the version was read
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Resume not found"
         )
     
+    set_cache_headers(response, etag)
     return resume
 
 
 @router.delete("/{resume_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_resume(
+async def delete_resume(
     resume_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a resume"""
-    resume = db.query(Resume).filter(
+    result = await db.execute(select(Resume).where(
         Resume.id == resume_id,
         Resume.owner_id == current_user.id
-    ).first()
+    ))
+    resume = result.scalar_one_or_none()
     
     if not resume:
         raise HTTPException(
@@ -147,7 +268,11 @@ def delete_resume(
     if os.path.exists(resume.file_path):
         os.remove(resume.file_path)
     
-    db.delete(resume)
-    db.commit()
+    await db.execute(delete(ResumeLSHBucket).where(ResumeLSHBucket.resume_id == resume_id))
+    await db.delete(resume)
+    await db.commit()
+    
+    await run_in_threadpool(unindex_resume, current_user.id, resume_id)
+    await run_in_threadpool(forget_resume, current_user.id, resume_id)
     
     return None
@@ -0,0 +1,176 @@
+"""
+Concurrent-request throughput of sync vs async database routes
+
+Serves the same rankings query from a sync `def` route on a sync Session
+(the previous request path) and from an `async def` route on an
+AsyncSession (the current one), then drives both in-process with an async
+HTTP client at a fixed concurrency.
+
+Usage:
+    python -m backend.benchmarks.bench_async_db --requests 2000 --concurrency 200
+    python -m backend.benchmarks.bench_async_db --database-url postgresql://... --db-latency-ms 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..database.models import Base, Job, JobMatch, Resume, User
+from ..database.session import get_async_database_url
+
+
+def seed(engine, num_resumes: int) -> int:
+    """Create tables and seed one job ranked against num_resumes resumes; returns the job ID"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(User.__table__.insert().values(
+            username="bench", email="bench@example.com", hashed_password="x"
+        )).inserted_primary_key[0]
+        job_id = conn.execute(Job.__table__.insert().values(
+            title="Benchmark job", description="benchmark", owner_id=user_id
+        )).inserted_primary_key[0]
+        conn.execute(Resume.__table__.insert(), [
+            {"filename": f"resume_{i}.pdf", "file_path": f"/tmp/resume_{i}.pdf", "owner_id": user_id}
+            for i in range(num_resumes)
+        ])
+        resume_ids = [row[0] for row in conn.execute(select(Resume.id).order_by(Resume.id))]
+        conn.execute(JobMatch.__table__.insert(), [
+            {"job_id": job_id, "resume_id": resume_id, "overall_score": 1.0 - rank / num_resumes, "rank": rank}
+            for rank, resume_id in enumerate(resume_ids, start=1)
+        ])
+    return job_id
+
+
+def rankings_query(job_id: int, limit: int):
+    return select(
+        JobMatch.resume_id, Resume.filename, JobMatch.overall_score, JobMatch.rank
+    ).join(
+        Resume, Resume.id == JobMatch.resume_id
+    ).where(
+        JobMatch.job_id == job_id
+    ).order_by(JobMatch.rank.asc()).limit(limit)
+
+
+def pool_options(database_url: str, pool_size: int) -> Dict[str, Any]:
+    """SQLite uses its own pool classes; size the pool only for server databases"""
+    if database_url.startswith("sqlite"):
+        return {}
+    return {"pool_size": pool_size, "max_overflow": 0}
+
+
+def build_sync_app(database_url: str, job_id: int, latency: float, pool_size: int) -> FastAPI:
+    engine = create_engine(database_url, **pool_options(database_url, pool_size))
+    SyncSession = sessionmaker(bind=engine, autoflush=False)
+    app = FastAPI()
+
+    def get_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @app.get("/rankings")
+    def rankings(db: Session = Depends(get_db)):
+        if latency:
+            time.sleep(latency)  # Simulated network round trip to the database
+        rows = db.execute(rankings_query(job_id, 50)).all()
+        return [{"resume_id": r.resume_id, "filename": r.filename, "score": r.overall_score, "rank": r.rank} for r in rows]
+
+    return app
+
+
+def build_async_app(database_url: str, job_id: int, latency: float, pool_size: int) -> FastAPI:
+    engine = create_async_engine(get_async_database_url(database_url), **pool_options(database_url, pool_size))
+    AsyncSessionFactory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    app = FastAPI()
+
+    async def get_db():
+        async with AsyncSessionFactory() as db:
+            yield db
+
+    @app.get("/rankings")
+    async def rankings(db: AsyncSession = Depends(get_db)):
+        if latency:
+            await asyncio.sleep(latency)  # Simulated network round trip to the database
+        rows = (await db.execute(rankings_query(job_id, 50))).all()
+        return [{"resume_id": r.resume_id, "filename": r.filename, "score": r.overall_score, "rank": r.rank} for r in rows]
+
+    return app
+
+
+async def drive(app: FastAPI, num_requests: int, concurrency: int) -> Dict[str, Any]:
+    """Issue num_requests GETs with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get("/rankings")
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(num_requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": num_requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(num_requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Sync database URL (default: temporary SQLite file)")
+    parser.add_argument("--resumes", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=40, help="Connection pool size for both engines")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Extra simulated I/O wait per request")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_async_db.db')}"
+
+    job_id = seed(create_engine(database_url), args.resumes)
+    latency = args.db_latency_ms / 1000
+
+    results = {
+        "sync": asyncio.run(drive(build_sync_app(database_url, job_id, latency, args.pool_size), args.requests, args.concurrency)),
+        "async": asyncio.run(drive(build_async_app(database_url, job_id, latency, args.pool_size), args.requests, args.concurrency)),
+    }
+
+    for name, result in results.items():
+        print(f"{name:>5}: {result['throughput_rps']:>8} req/s  p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  errors {result['errors']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
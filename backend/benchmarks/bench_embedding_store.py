@@ -0,0 +1,110 @@
+"""
+Loading an owner's resume embeddings: JSON column vs mmap embedding store
+
+Seeds resumes with embeddings, then times reading every vector the way the
+match path used to (SELECT of the JSON column, decoded per row) against an
+EmbeddingStore lookup (warm page cache; no decoding).
+
+Usage:
+    python -m backend.benchmarks.bench_embedding_store --resumes 20000
+    python -m backend.benchmarks.bench_embedding_store --database-url postgresql://... --output store.json
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+from sqlalchemy import create_engine, select
+
+from ..database.models import Base, Resume, User
+from ..services.embedding_store import EmbeddingStore
+
+
+def seed(engine, embeddings: np.ndarray) -> int:
+    """Create tables and one owner with a resume per embedding row; returns the owner ID"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(User.__table__.insert().values(
+            username="bench", email="bench@example.com", hashed_password="x"
+        )).inserted_primary_key[0]
+        conn.execute(Resume.__table__.insert(), [
+            {
+                "filename": f"resume_{i}.pdf",
+                "file_path": f"/tmp/resume_{i}.pdf",
+                "owner_id": user_id,
+                "embedding": embedding.tolist(),
+                "embedding_model": "bench",
+                "embedding_dim": len(embedding)
+            }
+            for i, embedding in enumerate(embeddings)
+        ])
+    return user_id
+
+
+def timings(fn: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 2),
+        "min_ms": round(min(samples) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Sync database URL (default: temporary SQLite file)")
+    parser.add_argument("--resumes", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench_embedding_store.db')}"
+    engine = create_engine(database_url)
+    embeddings = np.random.default_rng(0).standard_normal((args.resumes, args.dim), dtype=np.float32)
+    owner_id = seed(engine, embeddings)
+
+    with engine.connect() as conn:
+        ids = [row.id for row in conn.execute(select(Resume.id).where(Resume.owner_id == owner_id).order_by(Resume.id))]
+
+    store = EmbeddingStore(os.path.join(tmp, "store"))
+    store.put(dict(zip(ids, embeddings.tolist())))
+    store.compact()
+
+    def from_database():
+        with engine.connect() as conn:
+            rows = conn.execute(select(Resume.id, Resume.embedding).where(Resume.owner_id == owner_id)).all()
+        return np.asarray([row.embedding for row in rows], dtype=np.float32)
+
+    def from_store():
+        found, matrix = store.get(ids)
+        # Touch every page so the comparison includes reading the vectors
+        return float(np.asarray(matrix).sum())
+
+    from_store()  # Warm the page cache, as it is on a host with running workers
+    results = {
+        "resumes": args.resumes,
+        "dim": args.dim,
+        "store_mb": round(embeddings.nbytes / 1e6, 1),
+        "json_column": timings(from_database, args.repeats),
+        "mmap_store": timings(from_store, args.repeats),
+    }
+
+    for name in ("json_column", "mmap_store"):
+        print(f"{name:>12}: p50 {results[name]['p50_ms']} ms  min {results[name]['min_ms']} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Cold-start budget: time to import backend.main in a fresh interpreter
+
+Each repeat starts a new Python process that imports the app under
+-X importtime, so nothing is warm but the OS page cache. The check fails
+(exit status 1) when the median import takes longer than --budget-ms or when
+any of the heavy modules the services load lazily (torch, sentence
+transformers, spaCy, scikit-learn, pdfplumber, python-docx) was imported,
+so it can gate CI like a test. Importing must not touch the database either;
+tables are created at startup (see main.lifespan) or by python -m backend.database.
+
+Usage:
+    python -m backend.benchmarks.bench_import_time
+    python -m backend.benchmarks.bench_import_time --budget-ms 1500 --repeats 7 --output import.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Tuple
+
+# Top-level packages that must only be imported on first use
+HEAVY_MODULES = [
+    "torch", "sentence_transformers", "transformers", "spacy", "thinc",
+    "sklearn", "pdfplumber", "pdfminer", "docx"
+]
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "import_ms": elapsed * 1000,
+    "heavy": sorted(name for name in %r if name in sys.modules),
+}))
+""" % (HEAVY_MODULES,)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, float, float]]:
+    """(module, self ms, cumulative ms) for every line of -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return modules
+
+
+def measure_once() -> Dict[str, Any]:
+    """Import backend.main in a new interpreter"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        capture_output=True, text=True, env=env
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing backend.main failed:\n{completed.stderr[-4000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["modules"] = parse_importtime(completed.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000.0, help="Maximum median import time")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules (cumulative) to report")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.repeats)]
+    import_ms = [run["import_ms"] for run in runs]
+    median_ms = statistics.median(import_ms)
+    heavy = sorted({name for run in runs for name in run["heavy"]})
+
+    # Slowest modules of the median run, outermost imports first on ties
+    median_run = sorted(runs, key=lambda run: run["import_ms"])[len(runs) // 2]
+    slowest = sorted(median_run["modules"], key=lambda module: -module[2])[:args.top]
+
+    print(f"import backend.main: median {median_ms:.0f} ms, min {min(import_ms):.0f} ms, "
+          f"max {max(import_ms):.0f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"{'module':<50}{'self ms':>10}{'cumulative ms':>16}")
+    for name, self_ms, cumulative_ms in slowest:
+        print(f"{name:<50}{self_ms:>10.1f}{cumulative_ms:>16.1f}")
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"median import time {median_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    if heavy:
+        failures.append(f"heavy modules imported eagerly: {', '.join(heavy)}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "python": sys.version.split()[0],
+                "budget_ms": args.budget_ms,
+                "import_ms": import_ms,
+                "median_ms": median_ms,
+                "heavy_modules_imported": heavy,
+                "slowest_modules": [
+                    {"module": name, "self_ms": self_ms, "cumulative_ms": cumulative_ms}
+                    for name, self_ms, cumulative_ms in slowest
+                ],
+                "failures": failures,
+            }, f, indent=2)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Resume ingestion throughput: request-worker threads vs the ingestion process pool
+
+Parses and runs NLP extraction on a batch of synthetic PDF/DOCX resumes the way
+upload_resume does, with --concurrency uploads in flight at once:
+
+    threads   ResumeParser/NLPEngine in the event loop's thread pool
+              (INGESTION_POOL_SIZE=0)
+    pool-N    the ingestion ProcessPool with N worker processes
+
+For each mode it reports documents per second and how late a 10 ms event-loop
+ticker ran meanwhile; threads hold the GIL while parsing, which delays every
+other request on the worker, while pool workers leave the loop free. Pool
+startup (spawning workers, loading spaCy) is excluded from the timings.
+Like suite.py, a blank spaCy pipeline is used when the model is not installed.
+
+Usage:
+    python -m backend.benchmarks.bench_ingestion
+    python -m backend.benchmarks.bench_ingestion --documents 200 --workers 1 2 4 8 --output ingestion.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from starlette.concurrency import run_in_threadpool
+
+from . import synthetic
+from .suite import load_nlp_engine
+from ..core.process_pool import ProcessPool
+from ..services import ingestion
+from ..services.resume_parser import ResumeParser
+
+TICK_SECONDS = 0.01
+
+
+def init_bench_worker() -> None:
+    """Pool worker setup as in ingestion.init_worker, with the blank-pipeline fallback"""
+    ingestion._parser = ResumeParser()
+    ingestion._engine, _ = load_nlp_engine()
+
+
+def write_documents(workdir: str, count: int, num_jobs: int) -> List[str]:
+    """Alternating PDF and DOCX resumes"""
+    paths = []
+    for i in range(count):
+        text = synthetic.resume_text(seed=i, num_jobs=num_jobs)
+        if i % 2:
+            path = os.path.join(workdir, f"resume_{i}.docx")
+            synthetic.write_docx(path, text)
+        else:
+            path = os.path.join(workdir, f"resume_{i}.pdf")
+            synthetic.write_pdf(path, text)
+        paths.append(path)
+    return paths
+
+
+async def ingest(
+    paths: List[str],
+    concurrency: int,
+    parse: Callable[[str], Awaitable[Dict[str, Any]]],
+    extract: Callable[[str], Awaitable[Dict[str, Any]]]
+) -> Dict[str, float]:
+    """Ingest every document, measuring wall time and event-loop lag"""
+    semaphore = asyncio.Semaphore(concurrency)
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK_SECONDS)
+            lags.append(time.perf_counter() - start - TICK_SECONDS)
+
+    async def one(path: str):
+        async with semaphore:
+            parsed = await parse(path)
+            await extract(parsed["text"])
+
+    ticking = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(one(path) for path in paths))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await ticking
+
+    lags.sort()
+    return {
+        "seconds": round(elapsed, 3),
+        "docs_per_second": round(len(paths) / elapsed, 2),
+        "loop_lag_p50_ms": round(statistics.median(lags) * 1000, 2),
+        "loop_lag_p99_ms": round(lags[int(len(lags) * 0.99)] * 1000, 2),
+        "loop_lag_max_ms": round(lags[-1] * 1000, 2),
+    }
+
+
+async def run_threads(paths: List[str], concurrency: int) -> Dict[str, float]:
+    parser = ResumeParser()
+    engine, _ = load_nlp_engine()
+    return await ingest(
+        paths, concurrency,
+        lambda path: run_in_threadpool(parser.parse, path),
+        lambda text: run_in_threadpool(engine.process_resume, text)
+    )
+
+
+async def run_pool(paths: List[str], concurrency: int, workers: int) -> Dict[str, float]:
+    pool = ProcessPool("bench", size=workers, initializer=init_bench_worker, task_timeout=120)
+    try:
+        await pool.start()
+        # One task per worker, so every worker has finished its initializer before timing
+        await asyncio.gather(*(pool.run(ingestion.parse_resume, path) for path in paths[:workers]))
+        return await ingest(
+            paths, concurrency,
+            lambda path: pool.run(ingestion.parse_resume, path),
+            lambda text: pool.run(ingestion.extract_information, text)
+        )
+    finally:
+        await pool.shutdown()
+
+
+async def run_all(args, paths: List[str]) -> Dict[str, Dict[str, float]]:
+    results = {"threads": await run_threads(paths, args.concurrency)}
+    for workers in args.workers:
+        results[f"pool-{workers}"] = await run_pool(paths, args.concurrency, workers)
+    return results
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100)
+    parser.add_argument("--num-jobs", type=int, default=30, help="Experience entries per resume (30 is about 3 pages)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Uploads in flight at once")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, cpu_count}), help="Pool sizes to try")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_ingestion_")
+    paths = write_documents(workdir, args.documents, args.num_jobs)
+    results = asyncio.run(run_all(args, paths))
+
+    baseline = results["threads"]["docs_per_second"]
+    print(f"{args.documents} documents, concurrency {args.concurrency}, {cpu_count} CPUs")
+    print(f"{'mode':<12}{'docs/s':>10}{'speedup':>10}{'lag p50 ms':>12}{'lag p99 ms':>12}{'lag max ms':>12}")
+    for mode, result in results.items():
+        print(
+            f"{mode:<12}{result['docs_per_second']:>10}{result['docs_per_second'] / baseline:>9.1f}x"
+            f"{result['loop_lag_p50_ms']:>12}{result['loop_lag_p99_ms']:>12}{result['loop_lag_max_ms']:>12}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"cpu_count": cpu_count, "documents": args.documents, "concurrency": args.concurrency,
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+First-stage retrieval latency of the lexical (BM25) and dense stages
+
+Builds a LexicalIndex over a synthetic corpus with a Zipf-distributed
+vocabulary, then times index build, incremental adds, BM25 search, exact
+dense top-k over random embeddings and reciprocal rank fusion of the two.
+
+Usage:
+    python -m backend.benchmarks.bench_lexical_index --docs 100000
+    python -m backend.benchmarks.bench_lexical_index --docs 100000 --first-stage-k 500 --output lexical.json
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from ..services.lexical_index import LexicalIndex
+from ..services.ranking import reciprocal_rank_fusion
+
+SKILLS = [
+    "python", "java", "c++", "c#", "node.js", "react", "sql", "postgresql", "docker", "kubernetes",
+    "aws", "azure", "terraform", "spark", "pandas", "fastapi", "django", "go", "rust", "ci-cd"
+]
+
+
+def synthetic_corpus(num_docs: int, doc_length: int, vocab_size: int, seed: int = 0) -> List[str]:
+    """Documents of Zipf-distributed filler words with a few skills mixed in"""
+    rng = np.random.default_rng(seed)
+    words = np.array([f"w{i}" for i in range(vocab_size)] + SKILLS)
+    docs = []
+    for _ in range(num_docs):
+        ids = np.minimum(rng.zipf(1.3, doc_length) - 1, vocab_size - 1)
+        skills = rng.integers(vocab_size, len(words), 8)
+        docs.append(" ".join(words[np.concatenate([ids, skills])]))
+    return docs
+
+
+def timings(fn: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(samples[max(int(len(samples) * 0.95) - 1, 0)] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--doc-length", type=int, default=300, help="Tokens per synthetic document")
+    parser.add_argument("--vocab-size", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension for the dense stage")
+    parser.add_argument("--first-stage-k", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--adds", type=int, default=50, help="Incremental adds to time after the build")
+    parser.add_argument("--index-dir", default=None, help="Index directory (default: temporary directory)")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    index_dir = args.index_dir or tempfile.mkdtemp()
+    docs = synthetic_corpus(args.docs, args.doc_length, args.vocab_size)
+    index = LexicalIndex(index_dir, delta_max_docs=max(args.adds + 1, 2000))
+
+    start = time.perf_counter()
+    index.rebuild(enumerate(docs, start=1))
+    build_seconds = time.perf_counter() - start
+    index_bytes = sum(os.path.getsize(os.path.join(index_dir, name)) for name in os.listdir(index_dir))
+
+    extra = synthetic_corpus(args.adds, args.doc_length, args.vocab_size, seed=1)
+    next_id = iter(range(args.docs + 1, args.docs + args.adds + 1))
+    extra_docs = iter(extra)
+    add = timings(lambda: index.add(next(next_id), next(extra_docs)), args.adds)
+
+    rng = np.random.default_rng(2)
+    queries = [
+        " ".join(rng.choice(SKILLS, 4)) + " " + " ".join(f"w{i}" for i in rng.integers(0, 2000, 20))
+        for _ in range(args.queries)
+    ]
+    query_iter = iter(queries * 2)
+    index.search(queries[0], args.first_stage_k)  # Warm the cached search matrix
+    lexical = timings(lambda: index.search(next(query_iter), args.first_stage_k), args.queries)
+
+    embeddings = rng.standard_normal((args.docs, args.dim), dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    job_embedding = rng.standard_normal(args.dim, dtype=np.float32)
+
+    def dense_top_k():
+        similarities = embeddings @ job_embedding
+        top = np.argpartition(-similarities, args.first_stage_k - 1)[:args.first_stage_k]
+        return top[np.argsort(-similarities[top])]
+
+    dense = timings(dense_top_k, args.queries)
+
+    def first_stage():
+        lexical_ids = [doc_id for doc_id, _ in index.search(queries[0], args.first_stage_k)]
+        dense_ids = (dense_top_k() + 1).tolist()
+        return reciprocal_rank_fusion([lexical_ids, dense_ids])[:args.first_stage_k]
+
+    fused = timings(first_stage, args.queries)
+
+    results = {
+        "docs": args.docs,
+        "terms": len(index._terms),
+        "first_stage_k": args.first_stage_k,
+        "build_seconds": round(build_seconds, 2),
+        "index_mb": round(index_bytes / 1e6, 1),
+        "add": add,
+        "lexical_search": lexical,
+        "dense_top_k": dense,
+        "fused_first_stage": fused,
+    }
+
+    print(f"build {results['build_seconds']} s, index {results['index_mb']} MB, {results['terms']} terms")
+    for name in ("add", "lexical_search", "dense_top_k", "fused_first_stage"):
+        print(f"{name:>18}: p50 {results[name]['p50_ms']} ms  p95 {results[name]['p95_ms']} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Large response serialization: Pydantic response_model vs the fast JSON path
+
+Serves rankings (a MatchResponse with N MatchScores) and resume lists (N
+ResumeResponses built from synthetic resumes) through a throwaway FastAPI app
+in two ways, for N = 1k, 10k and 100k rows:
+
+    model   what the routes used to do: one Pydantic object per row (resumes as
+            ORM-like attribute objects), validated against the response_model
+            and encoded with jsonable_encoder + json.dumps
+    fast    what the routes do now: column tuples -> dicts -> orjson
+            (backend.core.responses), no per-row validation
+
+Each timing is a full in-process request through TestClient; no database is
+involved, rows are generated up front. Both bodies are compared once per size
+to make sure the fast path returns the same JSON.
+
+Usage:
+    python -m backend.benchmarks.bench_serialization
+    python -m backend.benchmarks.bench_serialization --sizes 1000 10000 --repeats 3 --output serialization.json
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from . import synthetic
+from ..core.responses import FastJSONResponse, dump_json, model_content, rows_to_dicts, schema_fields
+from ..schemas.job import MatchResponse, MatchScore
+from ..schemas.resume import ResumeResponse
+
+MATCH_SCORE_FIELDS = schema_fields(MatchScore)
+RESUME_RESPONSE_FIELDS = schema_fields(ResumeResponse)
+
+# Distinct synthetic resumes; larger lists repeat them with new IDs
+RESUME_VARIANTS = 1000
+
+
+def ranking_rows(count: int) -> List[tuple]:
+    """Stored-match tuples in MatchScore field order, best first"""
+    rng = random.Random(count)
+    scores = sorted((rng.random() for _ in range(count)), reverse=True)
+    return [
+        (i + 1, f"resume_{i + 1}.pdf", score, rng.random(), rng.random(), rng.random(), rng.random(), rank)
+        for rank, (i, score) in enumerate(zip(rng.sample(range(count), count), scores), start=1)
+    ]
+
+
+def resume_rows(count: int) -> List[tuple]:
+    """Resume tuples in ResumeResponse field order"""
+    variants = [synthetic.resume(seed) for seed in range(min(count, RESUME_VARIANTS))]
+    created = datetime(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        resume = variants[i % len(variants)]
+        timestamp = created + timedelta(minutes=i)
+        values = {
+            "filename": f"resume_{i + 1}.pdf",
+            "id": i + 1,
+            "owner_id": 1,
+            "raw_text": resume["text"],
+            "skills": resume["skills"],
+            "experience": resume["experience"],
+            "education": resume["education"],
+            "duplicate_cluster_id": i + 1,
+            "created_at": timestamp,
+            "updated_at": timestamp,
+        }
+        rows.append(tuple(values[field] for field in RESUME_RESPONSE_FIELDS))
+    return rows
+
+
+def build_app(rankings: Dict[int, List[tuple]], resumes: Dict[int, List[tuple]]) -> FastAPI:
+    """Routes serving the prepared rows the old way (/model) and the new way (/fast)"""
+    app = FastAPI()
+    # ORM stand-ins, created up front like rows an ORM query has already loaded
+    resume_objects = {
+        size: [SimpleNamespace(**dict(zip(RESUME_RESPONSE_FIELDS, row))) for row in rows]
+        for size, rows in resumes.items()
+    }
+
+    @app.get("/model/rankings/{size}", response_model=MatchResponse)
+    async def model_rankings(size: int):
+        rows = rankings[size]
+        matches = [MatchScore(**dict(zip(MATCH_SCORE_FIELDS, row))) for row in rows]
+        return MatchResponse(job_id=1, job_title="Benchmark", matches=matches, total_matched=len(matches))
+
+    @app.get("/fast/rankings/{size}", response_model=MatchResponse)
+    async def fast_rankings(size: int):
+        matches = rows_to_dicts(rankings[size], MATCH_SCORE_FIELDS)
+        body = dump_json(model_content(
+            MatchResponse, job_id=1, job_title="Benchmark", matches=matches, total_matched=len(matches)
+        ))
+        return Response(body, media_type="application/json")
+
+    @app.get("/model/resumes/{size}", response_model=List[ResumeResponse])
+    async def model_resumes(size: int):
+        return resume_objects[size]
+
+    @app.get("/fast/resumes/{size}", response_model=List[ResumeResponse])
+    async def fast_resumes(size: int):
+        return FastJSONResponse(rows_to_dicts(resumes[size], RESUME_RESPONSE_FIELDS))
+
+    return app
+
+
+def timings(fn: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {"p50_ms": round(statistics.median(samples) * 1000, 2), "min_ms": round(min(samples) * 1000, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Rows per payload")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    rankings = {size: ranking_rows(size) for size in args.sizes}
+    resumes = {size: resume_rows(size) for size in args.sizes}
+    client = TestClient(build_app(rankings, resumes))
+
+    results = {}
+    for kind in ("rankings", "resumes"):
+        for size in args.sizes:
+            model_body = client.get(f"/model/{kind}/{size}").content
+            fast_body = client.get(f"/fast/{kind}/{size}").content
+            if json.loads(model_body) != json.loads(fast_body):
+                raise AssertionError(f"{kind} x {size}: fast path returned different JSON")
+
+            model = timings(lambda: client.get(f"/model/{kind}/{size}"), args.repeats)
+            fast = timings(lambda: client.get(f"/fast/{kind}/{size}"), args.repeats)
+            results[f"{kind}.{size}"] = {
+                "rows": size,
+                "model": model,
+                "fast": fast,
+                "model_ms_per_1k_rows": round(model["p50_ms"] / size * 1000, 3),
+                "fast_ms_per_1k_rows": round(fast["p50_ms"] / size * 1000, 3),
+                "speedup": round(model["p50_ms"] / fast["p50_ms"], 1),
+                "model_bytes": len(model_body),
+                "fast_bytes": len(fast_body),
+            }
+
+    print(f"{'payload':<20}{'model p50 ms':>14}{'fast p50 ms':>13}{'speedup':>9}{'ms/1k model':>13}{'ms/1k fast':>12}{'MB':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:<20}{result['model']['p50_ms']:>14}{result['fast']['p50_ms']:>13}{result['speedup']:>8}x"
+            f"{result['model_ms_per_1k_rows']:>13}{result['fast_ms_per_1k_rows']:>12}{result['fast_bytes'] / 1e6:>8.1f}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Per-worker memory with and without preloading the app in the gunicorn master
+
+Starts gunicorn with backend/gunicorn_conf.py twice (PRELOAD_APP=true and
+false), waits until every worker answers, then reads /proc/<pid>/smaps_rollup
+of the master and each worker. Pss sums to the real footprint of the
+process tree; Private_Dirty is what a worker does not share. Linux only.
+
+Usage:
+    python -m backend.benchmarks.bench_worker_memory --workers 4
+    python -m backend.benchmarks.bench_worker_memory --workers 8 --output memory.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from ..core.memory import process_memory
+
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gunicorn_conf.py")
+
+
+def worker_pids(master_pid: int) -> List[int]:
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def measure(preload: bool, workers: int, port: int, startup_timeout: float) -> Dict[str, Any]:
+    """Launch gunicorn, wait for all workers, and report memory per process"""
+    env = dict(os.environ, PRELOAD_APP="true" if preload else "false", WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{port}")
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_worker_memory.db')}")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", CONFIG, "backend.main:app"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.monotonic() + startup_timeout
+        seen = set()
+        while len(seen) < workers:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Only {len(seen)} of {workers} workers answered")
+            try:
+                seen.add(httpx.get(f"http://127.0.0.1:{port}/health/memory", timeout=5).json()["pid"])
+            except httpx.HTTPError:
+                time.sleep(0.5)
+        
+        pids = worker_pids(process.pid)
+        per_worker = [process_memory(pid) for pid in pids]
+        return {
+            "preload": preload,
+            "workers": len(pids),
+            "master": process_memory(process.pid),
+            "worker_pss_mb": [m.get("Pss") for m in per_worker],
+            "worker_private_dirty_mb": [m.get("Private_Dirty") for m in per_worker],
+            "total_pss_mb": round(sum(m.get("Pss", 0) for m in per_worker) + process_memory(process.pid).get("Pss", 0), 1),
+        }
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = [measure(preload, args.workers, args.port, args.startup_timeout) for preload in (False, True)]
+    for result in results:
+        print(
+            f"preload={str(result['preload']):<5} total PSS {result['total_pss_mb']} MB  "
+            f"worker PSS {result['worker_pss_mb']}  private dirty {result['worker_private_dirty_mb']}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
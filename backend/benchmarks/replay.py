@@ -0,0 +1,356 @@
+"""
+Deterministic offline replay of captured production traffic
+
+Reads the JSONL traces written by TrafficCaptureMiddleware (CAPTURE_ENABLED),
+seeds a fresh local database whose shape follows the trace (one user per
+captured owner, each with as many resumes as their largest match scored, the
+jobs they referenced, resume lengths drawn from the captured upload sizes),
+boots `backend.main:app` and re-issues every request on the captured schedule,
+at 1x or accelerated by --speed. Request bodies are synthesized from the
+captured shape (numeric fields, string/list lengths); IDs in paths are mapped
+onto the seeded and replay-created rows.
+
+Prints per-route latency of the replay next to the latency captured in
+production, or next to an earlier replay given with --baseline, which is how
+a change is evaluated against a real workload mix.
+
+Usage:
+    python -m backend.benchmarks.replay captures/ --output before.json
+    python -m backend.benchmarks.replay captures/ --output after.json --baseline before.json
+    python -m backend.benchmarks.replay captures/traffic-1234.jsonl --speed 10 --database-url postgresql://...
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from . import synthetic
+from .load_test import API, PASSWORD, free_port, login, seed, start_server, summarize, wait_until_healthy
+
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def load_trace(paths: List[str]) -> List[Dict[str, Any]]:
+    """Records from JSONL files (directories are searched for traffic-*.jsonl*), oldest first"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, "traffic-*.jsonl*")))
+        else:
+            files.append(path)
+    records = []
+    for path in files:
+        with open(path) as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return sorted(records, key=lambda record: record["ts"])
+
+
+def response_id(record: Dict[str, Any]) -> Optional[int]:
+    return ((record.get("response_shape") or {}).get("fields") or {}).get("id")
+
+
+class TraceShape:
+    """Owners, pool sizes and referenced rows a trace needs to find in the database"""
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.owners: List[str] = []
+        self.pool_sizes: Dict[str, int] = defaultdict(int)
+        self.jobs: Dict[str, List[int]] = defaultdict(list)
+        self.resumes: Dict[str, List[int]] = defaultdict(list)
+        self.upload_bytes: List[int] = []
+
+        created_jobs = set()
+        created_resumes = set()
+        for record in records:
+            owner = record.get("owner")
+            if owner is None:
+                continue
+            if owner not in self.pool_sizes:
+                self.owners.append(owner)
+                self.pool_sizes[owner] = 0
+            route = record["route"]
+            params = record.get("path_params", {})
+            fields = (record.get("response_shape") or {}).get("fields") or {}
+
+            if route.endswith("/resumes/upload"):
+                self.upload_bytes.append(record["request_bytes"])
+                if response_id(record) is not None:
+                    created_resumes.add(response_id(record))
+            elif route.endswith("/jobs/") and record["method"] == "POST":
+                if response_id(record) is not None:
+                    created_jobs.add(response_id(record))
+            if "total_scored" in fields:
+                self.pool_sizes[owner] = max(self.pool_sizes[owner], fields["total_scored"])
+
+            job_id = params.get("job_id")
+            if job_id is not None and job_id not in created_jobs and job_id not in self.jobs[owner]:
+                self.jobs[owner].append(job_id)
+            resume_id = params.get("resume_id")
+            if resume_id is not None and resume_id not in created_resumes and resume_id not in self.resumes[owner]:
+                self.resumes[owner].append(resume_id)
+
+        for owner in self.owners:
+            self.pool_sizes[owner] = max(self.pool_sizes[owner], len(self.resumes[owner]))
+
+
+class ResumeSizer:
+    """Synthetic resume length (experience entries) whose DOCX is closest to a captured upload size"""
+
+    def __init__(self, max_entries: int = 60):
+        self.entries = np.arange(1, max_entries + 1)
+        self.sizes = np.array([len(synthetic.docx_bytes(synthetic.resume_text(0, int(n)))) for n in self.entries])
+
+    def entries_for(self, size: int) -> int:
+        return int(self.entries[np.argmin(np.abs(self.sizes - size))])
+
+
+class Replayer:
+    """Maps trace IDs onto local rows and turns records back into requests"""
+
+    def __init__(self, shape: TraceShape, usernames: List[str], jobs_by_user: Dict[str, List[int]],
+                 resumes_by_user: Dict[str, List[int]], tokens: Dict[str, str], sizer: ResumeSizer):
+        self.users = dict(zip(shape.owners, usernames))
+        self.tokens = tokens
+        self.sizer = sizer
+        self.rng = random.Random(0)
+        self.counter = 0
+        self.job_ids: Dict[int, int] = {}
+        self.resume_ids: Dict[int, int] = {}
+        for owner, username in self.users.items():
+            self.job_ids.update(zip(shape.jobs[owner], jobs_by_user[username]))
+            self.resume_ids.update(zip(shape.resumes[owner], resumes_by_user[username]))
+        self.local_jobs = jobs_by_user
+
+    def _next(self) -> int:
+        self.counter += 1
+        return self.counter
+
+    def build(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """httpx request arguments for a record, or None if its IDs cannot be mapped"""
+        params = {}
+        for name, trace_id in record.get("path_params", {}).items():
+            mapping = {"job_id": self.job_ids, "resume_id": self.resume_ids}.get(name)
+            if mapping is None or trace_id not in mapping:
+                return None
+            params[name] = mapping[trace_id]
+        route = record["route"]
+        request = {"method": record["method"], "url": route.format(**params), "params": record.get("query") or None}
+
+        username = self.users.get(record.get("owner"))
+        if username is not None:
+            request["headers"] = {"Authorization": f"Bearer {self.tokens[username]}"}
+        shape = record.get("request_shape") or {}
+        fields, lengths = shape.get("fields", {}), shape.get("lengths", {})
+
+        if route.endswith("/auth/login"):
+            username = self.rng.choice(list(self.tokens))
+            request["data"] = {"username": username, "password": PASSWORD}
+        elif route.endswith("/auth/register"):
+            n = self._next()
+            request["json"] = {"username": f"replay{n}", "email": f"replay{n}@example.com", "password": PASSWORD}
+        elif route.endswith("/resumes/upload"):
+            n = self._next()
+            text = synthetic.resume_text(10_000_000 + n, self.sizer.entries_for(record["request_bytes"]))
+            request["files"] = {"file": (f"replay_{n}.docx", synthetic.docx_bytes(text), DOCX_CONTENT_TYPE)}
+        elif route.endswith("/jobs/") and record["method"] == "POST":
+            posting = synthetic.job(self._next())
+            if "description" in lengths:
+                description = posting["description"]
+                posting["description"] = (description * (lengths["description"] // len(description) + 1))[:lengths["description"]]
+            if "required_skills" in lengths:
+                posting["required_skills"] = synthetic.SKILLS[:lengths["required_skills"]]
+            request["json"] = {**posting, **fields}
+        elif route.endswith("/jobs/match/batch"):
+            jobs = self.local_jobs.get(username) or []
+            request["json"] = {**fields, "job_ids": jobs[:lengths.get("job_ids", len(jobs))]}
+        elif record.get("request_content_type") == "application/json":
+            request["json"] = fields
+        return request
+
+    def record_created(self, record: Dict[str, Any], response: httpx.Response) -> None:
+        """Map IDs of rows the trace created onto the rows the replay created"""
+        trace_id = response_id(record)
+        if trace_id is None or response.status_code not in (200, 201):
+            return
+        route = record["route"]
+        if route.endswith("/resumes/upload"):
+            self.resume_ids[trace_id] = response.json()["id"]
+        elif route.endswith("/jobs/") and record["method"] == "POST":
+            local_id = response.json()["id"]
+            self.job_ids[trace_id] = local_id
+            self.local_jobs.setdefault(self.users.get(record.get("owner")), []).append(local_id)
+
+
+async def replay(client: httpx.AsyncClient, replayer: Replayer, records: List[Dict[str, Any]], speed: float) -> Dict[str, Any]:
+    """Re-issue records on their captured schedule divided by speed"""
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    captured: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    status_mismatches: Dict[str, int] = defaultdict(int)
+    unmapped = 0
+    in_flight = set()
+    loop = asyncio.get_running_loop()
+    trace_start = records[0]["ts"]
+
+    async def issue(record: Dict[str, Any], request: Dict[str, Any], scheduled: float):
+        route = f"{record['method']} {record['route']}"
+        try:
+            response = await client.request(**request)
+            status = response.status_code
+            replayer.record_created(record, response)
+        except httpx.HTTPError:
+            status = None
+        latencies[route].append(loop.time() - scheduled)
+        captured[route].append(record["duration_ms"] / 1000)
+        if status is None or status >= 400:
+            errors[route] += 1
+        if status != record["status"]:
+            status_mismatches[route] += 1
+
+    start = loop.time()
+    for record in records:
+        scheduled = start + (record["ts"] - trace_start) / speed
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Requests referencing rows created earlier in the trace wait for their creation
+        request = replayer.build(record)
+        if request is None and in_flight:
+            await asyncio.gather(*in_flight)
+            request = replayer.build(record)
+        if request is None:
+            unmapped += 1
+            continue
+        task = asyncio.create_task(issue(record, request, scheduled))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    elapsed = loop.time() - start
+
+    return {
+        "speed": speed,
+        "seconds": round(elapsed, 2),
+        "trace_seconds": round(records[-1]["ts"] - trace_start, 2),
+        "records": len(records),
+        "unmapped": unmapped,
+        "routes": {
+            route: {
+                "replay": summarize(route_latencies, errors[route], elapsed),
+                "captured": summarize(captured[route], 0, elapsed),
+                "status_mismatches": status_mismatches[route],
+            }
+            for route, route_latencies in sorted(latencies.items())
+        },
+    }
+
+
+def print_comparison(result: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    reference = "baseline" if baseline else "captured"
+    print(
+        f"\nReplayed {result['records'] - result['unmapped']}/{result['records']} requests "
+        f"({result['trace_seconds']} s of traffic at {result['speed']}x in {result['seconds']} s)"
+    )
+    print(f"  {'route':<40} {'n':>5} {'err':>4} | {reference + ' p50/p95/p99 ms':>26} | {'replay p50/p95/p99 ms':>26} | {'p50 x':>6}")
+    for route, stats in result["routes"].items():
+        if baseline:
+            before = baseline["routes"].get(route, {}).get("replay")
+        else:
+            before = stats["captured"]
+        now = stats["replay"]
+
+        def triple(s):
+            return "/".join(str(s.get(key, "-")) for key in ("p50_ms", "p95_ms", "p99_ms")) if s else "-"
+
+        ratio = f"{now['p50_ms'] / before['p50_ms']:.2f}" if before and before.get("p50_ms") else "-"
+        print(f"  {route:<40} {now['requests']:>5} {now['errors']:>4} | {triple(before):>26} | {triple(now):>26} | {ratio:>6}")
+
+
+async def run(args, records: List[Dict[str, Any]], database_url: str, workdir: str) -> Dict[str, Any]:
+    shape = TraceShape(records)
+    sizer = ResumeSizer()
+    experience_entries = [sizer.entries_for(size) for size in shape.upload_bytes] or [3]
+    usernames, jobs_by_user, resumes_by_user = seed(
+        database_url,
+        [shape.pool_sizes[owner] for owner in shape.owners],
+        [len(shape.jobs[owner]) for owner in shape.owners],
+        experience_entries
+    )
+    print(
+        f"Seeded {len(usernames)} owners, {sum(len(r) for r in resumes_by_user.values())} resumes, "
+        f"{sum(len(j) for j in jobs_by_user.values())} jobs",
+        file=sys.stderr
+    )
+
+    port = free_port()
+    server = start_server(database_url, workdir, args.workers, port)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        await wait_until_healthy(base_url, server, args.startup_timeout)
+        limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.request_timeout, limits=limits) as client:
+            tokens = await login(client, usernames)
+            if args.warmup:
+                # Embed the seeded resumes once, as production had before the trace started
+                for username, job_ids in jobs_by_user.items():
+                    for job_id in job_ids:
+                        await client.post(f"{API}/jobs/{job_id}/match", json={},
+                                          headers={"Authorization": f"Bearer {tokens[username]}"})
+            replayer = Replayer(shape, usernames, jobs_by_user, resumes_by_user, tokens, sizer)
+            return await replay(client, replayer, records, args.speed)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="Capture files or directories")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed-up (1 = captured pace)")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N records")
+    parser.add_argument("--database-url", default=None, help="Sync database URL (default: temporary SQLite file); wiped!")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--startup-timeout", type=float, default=180.0)
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false", help="Skip the initial match per seeded job")
+    parser.add_argument("--baseline", default=None, help="Earlier replay JSON to compare against instead of the capture")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    records = load_trace(args.paths)[:args.limit]
+    if not records:
+        raise SystemExit("No captured requests found")
+
+    workdir = tempfile.mkdtemp(prefix="replay_")
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'replay.db')}"
+    start = time.perf_counter()
+    result = asyncio.run(run(args, records, database_url, workdir))
+    result["wall_seconds"] = round(time.perf_counter() - start, 2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_comparison(result, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
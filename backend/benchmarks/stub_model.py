@@ -0,0 +1,46 @@
+"""
+Offline stand-in for the sentence transformer
+
+Hashes tokens into a fixed-size bag-of-words vector and L2-normalizes it. It
+has the SentenceTransformer methods MatchingService uses, needs no download or
+GPU, and is deterministic across processes (crc32, not the salted hash()).
+Benchmarks using it time everything around the model, not the model itself.
+"""
+import re
+import zlib
+from typing import List, Union
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class StubSentenceTransformer:
+    """Hashing bag-of-words encoder with the SentenceTransformer interface"""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            vector[zlib.crc32(token.encode()) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, sentences: Union[str, List[str]], convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        if isinstance(sentences, str):
+            return self._encode_one(sentences)
+        if not sentences:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self._encode_one(text) for text in sentences])
+
+
+def install_stub_model(matching_service, dim: int = 384) -> StubSentenceTransformer:
+    """Serve a MatchingService's current model from the stub (no model is loaded)"""
+    model = StubSentenceTransformer(dim)
+    matching_service._models[matching_service.model_name] = model
+    return model
@@ -0,0 +1,385 @@
+"""
+Offline micro-benchmark suite
+
+Times the resume pipeline piece by piece on deterministic synthetic data
+(see synthetic.py): ResumeParser on PDF/DOCX of several sizes, every NLPEngine
+extractor, embedding and scoring in MatchingService at N = 1e2..1e5 resumes,
+and the database read/write paths against a temporary SQLite file. The
+sentence transformer is replaced by StubSentenceTransformer, so the suite
+runs offline and without a GPU; if the spaCy model is not installed, the
+extractors run on a blank spaCy pipeline (recorded in the output).
+
+Results are written as JSON; --compare checks them against an earlier run
+and exits with status 1 if any benchmark's median got slower than the
+tolerance allows.
+
+Usage:
+    python -m backend.benchmarks.suite --output baseline.json
+    python -m backend.benchmarks.suite --output current.json --compare baseline.json
+    python -m backend.benchmarks.suite --quick --only scoring nlp
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import spacy
+from sqlalchemy import create_engine, delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from . import synthetic
+from .stub_model import install_stub_model
+from ..core.config import settings
+from ..database.bulk import upsert_job_matches
+from ..database.models import Base, Job, JobMatch, Resume, User
+from ..database.session import get_async_database_url
+from ..services.matching_service import MatchingService
+from ..services.nlp_engine import NLPEngine
+from ..services.resume_parser import ResumeParser
+
+GROUPS = ["parser", "nlp", "embedding", "scoring", "db"]
+
+# Resume sizes as experience entries: ~1 page, ~3 pages, ~15 pages
+DOCUMENT_SIZES = {"small": 3, "medium": 30, "large": 150}
+
+
+def timings(fn: Callable[[], Any], repeats: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """Median/min/mean of `repeats` timed calls after one warm-up; setup runs untimed before each call"""
+    if setup:
+        setup()
+    fn()
+    samples = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 4),
+        "min_ms": round(min(samples) * 1000, 4),
+        "mean_ms": round(statistics.mean(samples) * 1000, 4),
+        "repeats": repeats,
+    }
+
+
+def load_nlp_engine() -> Tuple[NLPEngine, str]:
+    """The configured spaCy model, or a blank English pipeline (no NER) when it is not installed"""
+    engine = NLPEngine()
+    try:
+        engine.warm_up()
+    except OSError:
+        engine.model_name = "blank:en"
+        engine._nlp = spacy.blank("en")
+    return engine, engine.model_name
+
+
+def bench_parser(workdir: str, repeats: int) -> Dict[str, Dict[str, float]]:
+    parser = ResumeParser()
+    results = {}
+    for size, num_jobs in DOCUMENT_SIZES.items():
+        text = synthetic.resume_text(seed=1, num_jobs=num_jobs)
+        for extension, write in ((".pdf", synthetic.write_pdf), (".docx", synthetic.write_docx)):
+            path = os.path.join(workdir, f"resume_{size}{extension}")
+            write(path, text)
+            result = timings(lambda: parser.parse(path), repeats)
+            result["bytes"] = os.path.getsize(path)
+            results[f"parser.{extension[1:]}.{size}"] = result
+    return results
+
+
+def bench_nlp(engine: NLPEngine, repeats: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for size, num_jobs in DOCUMENT_SIZES.items():
+        text = synthetic.resume_text(seed=2, num_jobs=num_jobs)
+        for name in ("extract_skills", "extract_experience", "extract_education", "process_resume"):
+            method = getattr(engine, name)
+            results[f"nlp.{name}.{size}"] = timings(lambda: method(text), repeats)
+    return results
+
+
+def bench_embedding(matching_service: MatchingService, repeats: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for batch_size in (1, 32, 256):
+        texts = synthetic.resume_texts(batch_size, seed=3)
+        results[f"embedding.generate_embeddings.{batch_size}"] = timings(
+            lambda: matching_service.generate_embeddings(texts), repeats
+        )
+    return results
+
+
+def scoring_corpus(n: int, dim: int) -> Dict[str, Any]:
+    """Stored-resume fields for n resumes, as the match path loads them"""
+    rng = random.Random(4)
+    embeddings = np.random.default_rng(4).standard_normal((n, dim)).astype(np.float32)
+    skills = [rng.sample(synthetic.SKILLS, rng.randint(3, 10)) for _ in range(n)]
+    experience = [[{"role": "Engineer"}] * rng.randint(0, 6) for _ in range(n)]
+    education = [[{"degree": rng.choice(["Bachelor", "Master", "PhD", ""])}] for _ in range(n)]
+    return {"embeddings": embeddings, "skills": skills, "experience": experience, "education": education}
+
+
+def bench_scoring(matching_service: MatchingService, sizes: List[int], pairwise_max: int, repeats: int) -> Dict[str, Dict[str, float]]:
+    dim = matching_service._get_model(matching_service.model_name).get_sentence_embedding_dimension()
+    corpus = scoring_corpus(max(sizes), dim)
+    job = synthetic.job(0)
+    job_embedding = matching_service.generate_embedding(job["description"])
+    results = {}
+    for n in sizes:
+        embeddings = corpus["embeddings"][:n]
+        skills = corpus["skills"][:n]
+        experience_counts = np.array([len(e) for e in corpus["experience"][:n]])
+        education_scores = np.array([matching_service.calculate_education_score(e) for e in corpus["education"][:n]])
+        runs = max(1, repeats if n <= 10_000 else repeats // 4)
+
+        def score_matrix():
+            for _ in matching_service.score_matrix_blocks(
+                job_embeddings=np.array([job_embedding], dtype=np.float32),
+                job_skills=[job["required_skills"]],
+                job_experience_levels=[job["experience_level"]],
+                job_weights=[None],
+                resume_embeddings=embeddings,
+                resume_skills=skills,
+                resume_experience_counts=experience_counts,
+                resume_education_scores=education_scores,
+                block_size=settings.MATCH_CHUNK_SIZE
+            ):
+                pass
+
+        results[f"scoring.score_matrix.{n}"] = timings(score_matrix, runs)
+        results[f"scoring.nearest_neighbors.{n}"] = timings(
+            lambda: matching_service.nearest_neighbors(job_embedding, embeddings, 100), runs
+        )
+
+        if n <= pairwise_max:
+            # Per-resume scoring, as used for single matches and the streaming endpoint
+            vectors = [row.tolist() for row in embeddings]
+
+            def score_pairwise():
+                for i in range(n):
+                    matching_service.match_resume_to_job(
+                        resume_text="",
+                        resume_skills=skills[i],
+                        resume_experience=corpus["experience"][i],
+                        resume_education=corpus["education"][i],
+                        job_description=job["description"],
+                        job_skills=job["required_skills"],
+                        job_experience_level=job["experience_level"],
+                        resume_embedding=vectors[i],
+                        job_embedding=job_embedding
+                    )
+
+            results[f"scoring.match_resume_to_job.{n}"] = timings(score_pairwise, runs)
+    return results
+
+
+def bench_db(workdir: str, n: int, repeats: int) -> Dict[str, Dict[str, float]]:
+    database_url = f"sqlite:///{os.path.join(workdir, 'bench_suite.db')}"
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(User.__table__.insert().values(
+            username="bench", email="bench@example.com", hashed_password="x"
+        )).inserted_primary_key[0]
+        job_id = conn.execute(Job.__table__.insert().values(
+            title="Bench", description=synthetic.job(0)["description"], owner_id=user_id
+        )).inserted_primary_key[0]
+
+    texts = synthetic.resume_texts(n, seed=5)
+    rng = random.Random(5)
+    resume_rows = [
+        {
+            "filename": f"resume_{i}.pdf",
+            "file_path": f"/tmp/resume_{i}.pdf",
+            "owner_id": user_id,
+            "raw_text": text,
+            "skills": rng.sample(synthetic.SKILLS, 5),
+            "experience": [{"role": "Engineer", "company": "Acme Corp", "dates": ["2019", "2021"]}],
+            "education": [{"degree": "Bachelor", "institution": "State University", "year": 2015}],
+        }
+        for i, text in enumerate(texts)
+    ]
+
+    def clear_resumes():
+        with engine.begin() as conn:
+            conn.execute(delete(JobMatch.__table__))
+            conn.execute(delete(Resume.__table__))
+
+    def insert_resumes():
+        with engine.begin() as conn:
+            conn.execute(Resume.__table__.insert(), resume_rows)
+
+    results = {f"db.insert_resumes.{n}": timings(insert_resumes, repeats, setup=clear_resumes)}
+    insert_resumes()
+
+    with engine.connect() as conn:
+        resume_ids = [row.id for row in conn.execute(select(Resume.id).where(Resume.owner_id == user_id))]
+    match_rows = [
+        {
+            "job_id": job_id, "resume_id": resume_id, "overall_score": score, "skill_match_score": score,
+            "experience_score": score, "education_score": score, "semantic_similarity": score, "rank": rank,
+            "job_fingerprint": "job", "resume_fingerprint": "resume", "embedding_model": "bench", "scoring_version": 1
+        }
+        for rank, (resume_id, score) in enumerate(zip(resume_ids, np.linspace(1, 0, len(resume_ids)).tolist()), start=1)
+    ]
+
+    async_engine = create_async_engine(get_async_database_url(database_url))
+    AsyncSessionFactory = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    loop = asyncio.new_event_loop()
+
+    async def upsert_matches():
+        async with AsyncSessionFactory() as db:
+            await upsert_job_matches(db, match_rows)
+            await db.commit()
+
+    async def read_rankings_page():
+        async with AsyncSessionFactory() as db:
+            rows = (await db.execute(
+                select(JobMatch.resume_id, JobMatch.overall_score, JobMatch.rank, Resume.filename)
+                .join(Resume, Resume.id == JobMatch.resume_id)
+                .where(JobMatch.job_id == job_id)
+                .order_by(JobMatch.rank.asc())
+                .limit(50)
+            )).all()
+        return rows
+
+    async def load_owner_resumes():
+        async with AsyncSessionFactory() as db:
+            rows = (await db.execute(
+                select(Resume.id, Resume.filename, Resume.skills, Resume.experience, Resume.education)
+                .where(Resume.owner_id == user_id)
+            )).all()
+        return rows
+
+    def clear_matches():
+        with engine.begin() as conn:
+            conn.execute(delete(JobMatch.__table__))
+
+    try:
+        results[f"db.upsert_job_matches.insert.{n}"] = timings(
+            lambda: loop.run_until_complete(upsert_matches()), repeats, setup=clear_matches
+        )
+        results[f"db.upsert_job_matches.update.{n}"] = timings(lambda: loop.run_until_complete(upsert_matches()), repeats)
+        results["db.rankings_page.50"] = timings(lambda: loop.run_until_complete(read_rankings_page()), repeats * 4)
+        results[f"db.load_owner_resumes.{n}"] = timings(lambda: loop.run_until_complete(load_owner_resumes()), repeats)
+    finally:
+        loop.run_until_complete(async_engine.dispose())
+        loop.close()
+        engine.dispose()
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Print current vs baseline medians
+
+    Args:
+        current: Results of this run
+        baseline: Results of an earlier run
+        tolerance: Allowed relative slowdown of a median (0.25 = 25%)
+
+    Returns:
+        Names of benchmarks slower than the tolerance allows
+    """
+    regressions = []
+    print(f"\n{'benchmark':<44} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for name, result in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            print(f"{name:<44} {'-':>12} {result['p50_ms']:>12} {'new':>7}")
+            continue
+        ratio = result["p50_ms"] / before["p50_ms"] if before["p50_ms"] else 1.0
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<44} {before['p50_ms']:>12} {result['p50_ms']:>12} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=GROUPS, help="Benchmark groups to run")
+    parser.add_argument("--quick", action="store_true", help="Fewer repeats and N up to 1e4 only")
+    parser.add_argument("--repeats", type=int, default=None, help="Timed calls per benchmark (default 20, 5 with --quick)")
+    parser.add_argument("--db-resumes", type=int, default=2000, help="Rows written/read by the database benchmarks")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown of a median before failing")
+    args = parser.parse_args()
+
+    repeats = args.repeats or (5 if args.quick else 20)
+    sizes = [100, 1_000, 10_000] if args.quick else [100, 1_000, 10_000, 100_000]
+    workdir = tempfile.mkdtemp(prefix="bench_suite_")
+
+    matching_service = MatchingService()
+    stub = install_stub_model(matching_service)
+    nlp_engine, spacy_model = load_nlp_engine()
+
+    benchmarks: Dict[str, Dict[str, float]] = {}
+    for group in args.only:
+        start = time.perf_counter()
+        if group == "parser":
+            benchmarks.update(bench_parser(workdir, repeats))
+        elif group == "nlp":
+            benchmarks.update(bench_nlp(nlp_engine, repeats))
+        elif group == "embedding":
+            benchmarks.update(bench_embedding(matching_service, repeats))
+        elif group == "scoring":
+            benchmarks.update(bench_scoring(matching_service, sizes, pairwise_max=1_000, repeats=repeats))
+        elif group == "db":
+            benchmarks.update(bench_db(workdir, args.db_resumes, repeats))
+        print(f"{group}: {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "spacy_model": spacy_model,
+            "embedding_model": f"stub-{stub.dim}",
+            "repeats": repeats,
+        },
+        "benchmarks": benchmarks,
+    }
+
+    for name, result in benchmarks.items():
+        print(f"{name:<44} p50 {result['p50_ms']:>10} ms  min {result['min_ms']:>10} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
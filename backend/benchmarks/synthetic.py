@@ -0,0 +1,181 @@
+"""
+Deterministic synthetic resumes and jobs for benchmarks
+
+Every generator takes an explicit seed, so a given (seed, size) always yields
+the same text and the same files; results stay comparable across commits.
+Resumes follow the layout the NLP extractors look for: a role line above a
+date range, description bullets, and degree lines with an institution and year.
+"""
+import io
+import random
+from typing import Any, Dict, List
+
+from docx import Document
+
+SKILLS = [
+    'python', 'java', 'javascript', 'react', 'node.js', 'sql', 'postgresql',
+    'mongodb', 'docker', 'kubernetes', 'aws', 'azure', 'git', 'linux',
+    'machine learning', 'deep learning', 'nlp', 'data science', 'tensorflow',
+    'pytorch', 'fastapi', 'django', 'flask', 'html', 'css', 'typescript',
+    'angular', 'vue', 'rest api', 'graphql', 'microservices', 'ci/cd',
+    'agile', 'scrum', 'project management'
+]
+ROLES = ['Software Engineer', 'Senior Software Engineer', 'Data Scientist', 'Backend Developer',
+         'Frontend Developer', 'DevOps Engineer', 'Machine Learning Engineer', 'Engineering Manager']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Hooli', 'Stark Industries',
+             'Wayne Enterprises', 'Vandelay Industries', 'Soylent Systems', 'Cyberdyne']
+DEGREES = ['Bachelor of Science', 'Master of Science', 'Bachelor of Engineering', 'PhD']
+FIELDS = ['Computer Science', 'Software Engineering', 'Mathematics', 'Electrical Engineering', 'Statistics']
+INSTITUTIONS = ['State University', 'Institute of Technology', 'City College', 'National University']
+VERBS = ['Built', 'Designed', 'Led', 'Migrated', 'Optimized', 'Maintained', 'Automated', 'Scaled']
+OBJECTS = ['a payments service', 'the data pipeline', 'an internal dashboard', 'search ranking',
+           'the CI workflow', 'a recommendation model', 'the public API', 'monitoring and alerting']
+EXPERIENCE_LEVELS = ['entry', 'mid', 'senior', 'lead']
+
+
+def resume(seed: int, num_jobs: int = 3) -> Dict[str, Any]:
+    """
+    Generate one resume with the fields the NLP extractors would store for it
+
+    Args:
+        seed: Determines the whole resume
+        num_jobs: Experience entries; roughly 4 lines (~350 bytes) each
+
+    Returns:
+        Dict with 'text', 'skills', 'experience' and 'education'
+    """
+    rng = random.Random(seed)
+    summary_skills = rng.sample(SKILLS, 3)
+    listed_skills = rng.sample(SKILLS, rng.randint(4, 10))
+    lines = [
+        f"Candidate {seed}",
+        f"candidate{seed}@example.com",
+        "",
+        "Summary",
+        f"{rng.choice(ROLES)} with experience in {', '.join(summary_skills)}.",
+        "",
+        "Skills",
+        ", ".join(listed_skills),
+        "",
+        "Experience",
+    ]
+    experience = []
+    year = 2024
+    for _ in range(num_jobs):
+        start = year - rng.randint(1, 4)
+        role = rng.choice(ROLES)
+        end = str(year) if year < 2024 else "Present"
+        lines.append(role)
+        lines.append(f"{start} - {end}")
+        lines.append(rng.choice(COMPANIES))
+        bullets = [
+            f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {' and '.join(rng.sample(SKILLS, 2))}"
+            for _ in range(rng.randint(1, 3))
+        ]
+        lines += bullets
+        experience.append({"dates": [str(start), end], "role": role, "company": "Unknown", "description": " ".join(bullets)[:500]})
+        year = start
+    degree, field, institution = rng.choice(DEGREES), rng.choice(FIELDS), rng.choice(INSTITUTIONS)
+    graduation = year - rng.randint(0, 3)
+    lines += [
+        "",
+        "Education",
+        f"{degree} in {field}, {institution}, {graduation}",
+    ]
+    return {
+        "text": "\n".join(lines),
+        "skills": list(dict.fromkeys(summary_skills + listed_skills)),
+        "experience": experience,
+        "education": [{
+            "institution": institution,
+            "degree": degree.split()[0] if degree != "PhD" else "PhD",
+            "field": field,
+            "year": graduation
+        }],
+    }
+
+
+def resume_text(seed: int, num_jobs: int = 3) -> str:
+    """Text of resume(seed, num_jobs)"""
+    return resume(seed, num_jobs)["text"]
+
+
+def job(seed: int) -> Dict[str, Any]:
+    """Generate one job posting (title, description, required_skills, experience_level)"""
+    rng = random.Random(-seed - 1)
+    skills = rng.sample(SKILLS, rng.randint(3, 6))
+    role = rng.choice(ROLES)
+    return {
+        "title": role,
+        "description": (
+            f"We are hiring a {role} at {rng.choice(COMPANIES)}. You will work with {', '.join(skills)} "
+            f"and help us {rng.choice(VERBS).lower()} {rng.choice(OBJECTS)}."
+        ),
+        "required_skills": skills,
+        "experience_level": rng.choice(EXPERIENCE_LEVELS),
+    }
+
+
+def resume_texts(count: int, seed: int = 0, num_jobs: int = 3) -> List[str]:
+    """`count` resumes with consecutive seeds"""
+    return [resume_text(seed + i, num_jobs) for i in range(count)]
+
+
+def docx_bytes(text: str) -> bytes:
+    """Text as the contents of a DOCX file, one paragraph per line"""
+    document = Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def write_docx(path: str, text: str) -> None:
+    """Write text as a DOCX file, one paragraph per line"""
+    with open(path, "wb") as f:
+        f.write(docx_bytes(text))
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, text: str, lines_per_page: int = 60) -> None:
+    """
+    Write text as a minimal PDF (Helvetica, one text line per line)
+
+    Built by hand so the benchmarks need no PDF-writing dependency; the output
+    is a regular PDF 1.4 file with an xref table that pdfplumber parses normally.
+    """
+    lines = [line.encode("latin-1", "replace").decode("latin-1") for line in text.split("\n")]
+    pages = [lines[i:i + lines_per_page] for i in range(0, max(len(lines), 1), lines_per_page)]
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a (page, content) pair per page
+    objects: List[bytes] = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_refs = []
+    for page_lines in pages:
+        content = "BT /F1 10 Tf 12 TL 50 800 Td\n" + "".join(f"({_pdf_escape(line)}) '\n" for line in page_lines) + "ET"
+        content_bytes = content.encode("latin-1")
+        page_number = len(objects) + 1
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_number + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content_bytes) + content_bytes + b"\nendstream")
+        page_refs.append(f"{page_number} 0 R")
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(page_refs)} >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    with open(path, "wb") as f:
+        f.write(bytes(output))
@@ -0,0 +1,213 @@
+import asyncio
+import itertools
+import math
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, status
+
+from .config import settings
+from .metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTIONS, ADMISSION_WAIT_SECONDS
+from .security import UserPrincipal, get_current_user
+
+# Bounds for the Retry-After estimate, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 120
+
+
+class AdmissionLimiter:
+    """
+    Concurrency limit with a bounded, owner-fair wait queue for one route class
+    
+    At most max_concurrent requests of the class run at once in this worker.
+    Further requests wait, at most max_queue of them and for at most
+    queue_timeout seconds. A freed slot goes to the waiting owner with the
+    fewest running requests (oldest request first among equals), so a tenant
+    with a backlog cannot starve the others, and one owner may have at most
+    max_per_owner requests running or waiting. Rejections carry Retry-After:
+    429 when the owner is over its share, 503 when the queue is full or the
+    wait timed out.
+    
+    Runs on the worker's event loop only; no locking is needed.
+    """
+    
+    def __init__(self, route_class: str, max_concurrent: int, max_queue: int, max_per_owner: int, queue_timeout: float):
+        """
+        Initialize the limiter
+        
+        Args:
+            route_class: Label for metrics and error messages (e.g. "match")
+            max_concurrent: Requests running at once
+            max_queue: Requests waiting at once
+            max_per_owner: Requests one owner may have running or waiting
+            queue_timeout: Seconds a request waits for a slot before it is rejected
+        """
+        self.route_class = route_class
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_per_owner = max_per_owner
+        self.queue_timeout = queue_timeout
+        self.running = 0
+        self.waiting = 0
+        self._running_by_owner: Counter = Counter()
+        self._waiting_by_owner: Counter = Counter()
+        self._waiters: Dict[int, Deque[Tuple[int, asyncio.Future]]] = {}
+        self._arrivals = itertools.count()
+        # Moving average of how long a request holds its slot, for Retry-After
+        self._average_hold = 1.0
+    
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained"""
+        estimate = self._average_hold * (self.waiting + 1) / self.max_concurrent
+        return int(min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, math.ceil(estimate))))
+    
+    def _reject(self, status_code: int, reason: str, detail: str) -> HTTPException:
+        ADMISSION_REJECTIONS.labels(self.route_class, reason).inc()
+        return HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after())}
+        )
+    
+    def _update_gauges(self) -> None:
+        ADMISSION_IN_FLIGHT.labels(self.route_class).set(self.running)
+        ADMISSION_QUEUE_DEPTH.labels(self.route_class).set(self.waiting)
+    
+    def _dequeue(self, owner_id: int, entry: Tuple[int, asyncio.Future]) -> None:
+        queue = self._waiters[owner_id]
+        queue.remove(entry)
+        if not queue:
+            del self._waiters[owner_id]
+        self.waiting -= 1
+        self._waiting_by_owner[owner_id] -= 1
+        if not self._waiting_by_owner[owner_id]:
+            del self._waiting_by_owner[owner_id]
+    
+    def _next_waiter(self) -> Optional[Tuple[int, Tuple[int, asyncio.Future]]]:
+        """Oldest request of the waiting owner with the fewest running requests"""
+        if not self._waiters:
+            return None
+        owner_id = min(self._waiters, key=lambda o: (self._running_by_owner[o], self._waiters[o][0][0]))
+        return owner_id, self._waiters[owner_id][0]
+    
+    async def acquire(self, owner_id: int) -> None:
+        """
+        Take a slot, waiting for one if necessary
+        
+        Raises:
+            HTTPException: 429 if the owner is over max_per_owner, 503 if the
+                queue is full or no slot freed up within queue_timeout
+        """
+        if self._running_by_owner[owner_id] + self._waiting_by_owner[owner_id] >= self.max_per_owner:
+            raise self._reject(
+                status.HTTP_429_TOO_MANY_REQUESTS, "owner_limit",
+                f"Too many {self.route_class} requests in progress for this account"
+            )
+        
+        if self.running < self.max_concurrent and not self._waiters:
+            self.running += 1
+            self._running_by_owner[owner_id] += 1
+            ADMISSION_WAIT_SECONDS.labels(self.route_class).observe(0.0)
+            self._update_gauges()
+            return
+        
+        if self.waiting >= self.max_queue:
+            raise self._reject(
+                status.HTTP_503_SERVICE_UNAVAILABLE, "queue_full",
+                f"Server is busy with {self.route_class} requests; retry later"
+            )
+        
+        future = asyncio.get_running_loop().create_future()
+        entry = (next(self._arrivals), future)
+        self._waiters.setdefault(owner_id, deque()).append(entry)
+        self.waiting += 1
+        self._waiting_by_owner[owner_id] += 1
+        self._update_gauges()
+        
+        start = time.monotonic()
+        try:
+            # asyncio.wait leaves the future alone on timeout, so a slot handed
+            # over at the last moment is never lost
+            await asyncio.wait({future}, timeout=self.queue_timeout)
+        except BaseException:
+            # Cancelled (client gone): give back a slot we may just have received
+            if future.done():
+                self.release(owner_id)
+            else:
+                self._dequeue(owner_id, entry)
+                self._update_gauges()
+            raise
+        
+        if not future.done():
+            self._dequeue(owner_id, entry)
+            self._update_gauges()
+            raise self._reject(
+                status.HTTP_503_SERVICE_UNAVAILABLE, "queue_timeout",
+                f"Timed out waiting for a {self.route_class} slot; retry later"
+            )
+        ADMISSION_WAIT_SECONDS.labels(self.route_class).observe(time.monotonic() - start)
+    
+    def release(self, owner_id: int, held_seconds: Optional[float] = None) -> None:
+        """Free a slot, handing it straight to the next waiter if there is one"""
+        self._running_by_owner[owner_id] -= 1
+        if not self._running_by_owner[owner_id]:
+            del self._running_by_owner[owner_id]
+        if held_seconds is not None:
+            self._average_hold = 0.8 * self._average_hold + 0.2 * held_seconds
+        
+        waiter = self._next_waiter()
+        if waiter is None:
+            self.running -= 1
+        else:
+            # The slot changes hands; the running count stays the same
+            next_owner, entry = waiter
+            self._dequeue(next_owner, entry)
+            self._running_by_owner[next_owner] += 1
+            entry[1].set_result(None)
+        self._update_gauges()
+    
+    @asynccontextmanager
+    async def slot(self, owner_id: int) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block"""
+        await self.acquire(owner_id)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(owner_id, time.monotonic() - start)
+
+
+def admission(limiter: AdmissionLimiter):
+    """
+    Route dependency holding one of the limiter's slots while the request runs
+    
+    Usage: @router.post(..., dependencies=[Depends(admission(match_limiter))]).
+    The slot is released once the response (including a streamed body) is sent.
+    """
+    async def hold_slot(current_user: UserPrincipal = Depends(get_current_user)) -> AsyncIterator[None]:
+        if not settings.ADMISSION_CONTROL_ENABLED:
+            yield
+            return
+        async with limiter.slot(current_user.id):
+            yield
+    
+    return hold_slot
+
+
+# Per-worker limiters for the CPU-heavy route classes
+match_limiter = AdmissionLimiter(
+    "match",
+    max_concurrent=settings.MATCH_MAX_CONCURRENT,
+    max_queue=settings.MATCH_MAX_QUEUE,
+    max_per_owner=settings.MATCH_MAX_PER_OWNER,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+)
+upload_limiter = AdmissionLimiter(
+    "upload",
+    max_concurrent=settings.UPLOAD_MAX_CONCURRENT,
+    max_queue=settings.UPLOAD_MAX_QUEUE,
+    max_per_owner=settings.UPLOAD_MAX_PER_OWNER,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+)
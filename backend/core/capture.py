@@ -0,0 +1,206 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueListener, RotatingFileHandler
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl
+
+from jose import JWTError, jwt
+
+from .config import settings
+from .metrics import match_route
+
+logger = logging.getLogger(__name__)
+
+# JSON bodies larger than this are counted but not inspected
+MAX_INSPECTED_BODY_BYTES = 64 * 1024
+
+
+def owner_pseudonym(authorization: str) -> Optional[str]:
+    """Stable per-user pseudonym from a bearer token (keyed hash of the subject, never the name)"""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        subject = jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+    if not subject:
+        return None
+    return hmac.new(settings.SECRET_KEY.encode(), subject.encode(), hashlib.sha256).hexdigest()[:16]
+
+
+def body_shape(body: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Shape of a JSON body without its content
+    
+    Keeps top-level numbers and booleans (IDs, limits, scores, counts); strings
+    and lists are reduced to their lengths, nested objects are dropped.
+    
+    Returns:
+        {"fields": {...}, "lengths": {...}} for objects, {"items": n} for
+        arrays, None if the body is not JSON
+    """
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    if isinstance(data, list):
+        return {"items": len(data)}
+    if not isinstance(data, dict):
+        return None
+    fields = {}
+    lengths = {}
+    for key, value in data.items():
+        if isinstance(value, (bool, int, float)):
+            fields[key] = value
+        elif isinstance(value, (str, list)):
+            lengths[key] = len(value)
+    return {"fields": fields, "lengths": lengths}
+
+
+def query_shape(query_string: bytes) -> Dict[str, Any]:
+    """Query parameters whose values are numbers or booleans; other values are dropped"""
+    params = {}
+    for key, value in parse_qsl(query_string.decode("latin-1")):
+        if value in ("true", "false"):
+            params[key] = value == "true"
+            continue
+        try:
+            params[key] = int(value)
+        except ValueError:
+            try:
+                params[key] = float(value)
+            except ValueError:
+                continue
+    return params
+
+
+class TrafficWriter:
+    """
+    Per-process rotating JSONL files, written off the event loop
+    
+    Records go through a queue to a listener thread that owns a
+    RotatingFileHandler on traffic-<pid>.jsonl, so workers never share a file.
+    The listener starts on first use, i.e. after gunicorn has forked.
+    """
+    
+    def __init__(self, directory: str, max_bytes: int, backup_count: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._pid = None
+        self._queue: "queue.Queue" = queue.Queue(maxsize=10000)
+        self._lock = threading.Lock()
+    
+    def _start(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        handler = RotatingFileHandler(
+            os.path.join(self.directory, f"traffic-{os.getpid()}.jsonl"),
+            maxBytes=self.max_bytes,
+            backupCount=self.backup_count
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._queue = queue.Queue(maxsize=10000)
+        QueueListener(self._queue, handler).start()
+        self._pid = os.getpid()
+    
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._start()
+        line = json.dumps(record, separators=(",", ":"))
+        try:
+            self._queue.put_nowait(logging.makeLogRecord({"msg": line, "levelno": logging.INFO}))
+        except queue.Full:
+            # Never slow requests down for the capture; the trace just has a gap
+            pass
+
+
+traffic_writer = TrafficWriter(settings.CAPTURE_DIR, settings.CAPTURE_MAX_BYTES, settings.CAPTURE_BACKUP_COUNT)
+
+
+class TrafficCaptureMiddleware:
+    """
+    ASGI middleware recording sanitized metadata of every API request
+    
+    Each record holds the route template, numeric path/query parameters, a
+    pseudonymous owner, request/response sizes, the numeric fields of JSON
+    bodies (see body_shape), status and timing. No text, file content, name,
+    email or token is ever written.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.CAPTURE_ENABLED
+            or not scope["path"].startswith(settings.API_V1_STR)
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        headers = dict(scope["headers"])
+        inspect_request = headers.get(b"content-type", b"").startswith(b"application/json")
+        request_body = bytearray()
+        response_body = bytearray()
+        sizes = {"request": 0, "response": 0}
+        response = {"status": 500, "json": False}
+        
+        async def receive_with_size():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                sizes["request"] += len(chunk)
+                if inspect_request and len(request_body) < MAX_INSPECTED_BODY_BYTES:
+                    request_body.extend(chunk)
+            return message
+        
+        async def send_with_size(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                response["json"] = content_type.startswith(b"application/json")
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                sizes["response"] += len(chunk)
+                if response["json"] and len(response_body) < MAX_INSPECTED_BODY_BYTES:
+                    response_body.extend(chunk)
+            await send(message)
+        
+        timestamp = time.time()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_with_size, send_with_size)
+        finally:
+            duration = time.perf_counter() - start
+            try:
+                route, path_params = match_route(scope)
+                record = {
+                    "ts": round(timestamp, 4),
+                    "method": scope["method"],
+                    "route": route,
+                    "path_params": {k: int(v) for k, v in path_params.items() if str(v).isdigit()},
+                    "query": query_shape(scope.get("query_string", b"")),
+                    "owner": owner_pseudonym(headers.get(b"authorization", b"").decode("latin-1")),
+                    "request_content_type": headers.get(b"content-type", b"").decode("latin-1").split(";")[0],
+                    "request_bytes": sizes["request"],
+                    "response_bytes": sizes["response"],
+                    "status": response["status"],
+                    "duration_ms": round(duration * 1000, 3),
+                }
+                if request_body and len(request_body) < MAX_INSPECTED_BODY_BYTES:
+                    record["request_shape"] = body_shape(bytes(request_body))
+                if response_body and len(response_body) < MAX_INSPECTED_BODY_BYTES:
+                    record["response_shape"] = body_shape(bytes(response_body))
+                traffic_writer.write(record)
+            except Exception as e:
+                logger.error(f"Error capturing request: {str(e)}")
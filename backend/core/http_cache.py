@@ -0,0 +1,52 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response
+
+# Responses are per user: shared caches must not store them, browsers must revalidate
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Weak ETag for a resource version
+    
+    Args:
+        parts: Everything the representation depends on (resource kind and ID,
+            version columns such as updated_at, query parameters)
+    
+    Returns:
+        Quoted weak entity tag, e.g. W/"3f2a..."
+    """
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers etag (weak comparison, as RFC 9110 requires for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    """Attach the validator and revalidation policy to a response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    response.headers["Vary"] = "Authorization"
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response for a client whose copy is current"""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag)
+    return response
@@ -0,0 +1,45 @@
+import os
+from typing import Dict, Union
+
+try:
+    import resource
+except ImportError:  # Windows: no memory figures
+    resource = None
+
+# /proc/<pid>/smaps_rollup fields reported, in kB
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Swap")
+
+
+def process_memory(pid: Union[int, str] = "self") -> Dict[str, float]:
+    """
+    Memory of a process in MB
+    
+    On Linux this reads /proc/<pid>/smaps_rollup: Pss splits shared pages
+    between the processes mapping them, so summing Pss over the workers
+    gives the real footprint, and Private_Dirty is what a worker does not
+    share with the preloading master. Elsewhere only the peak RSS of the
+    current process is available, and on Windows nothing is.
+    
+    Args:
+        pid: Process ID ("self" for the calling process)
+        
+    Returns:
+        Field name to megabytes (empty when unavailable)
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            lines = f.readlines()
+    except OSError:
+        if pid not in ("self", os.getpid()) or resource is None:
+            return {}
+        # ru_maxrss is in kB on Linux, bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        scale = 1024 * 1024 if os.uname().sysname == "Darwin" else 1024
+        return {"MaxRss": round(max_rss / scale, 1)}
+    
+    memory = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].rstrip(":") in SMAPS_FIELDS:
+            memory[parts[0].rstrip(":")] = round(int(parts[1]) / 1024, 1)
+    return memory
@@ -0,0 +1,248 @@
+import functools
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.routing import Match
+
+# Under gunicorn, each worker writes to PROMETHEUS_MULTIPROC_DIR and /metrics aggregates them
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_SECONDS = Histogram(
+    "pipeline_stage_seconds", "Time spent in each resume/matching pipeline stage",
+    ["stage"], buckets=STAGE_BUCKETS
+)
+EMBEDDING_SECONDS = Histogram(
+    "embedding_batch_seconds", "Time to embed one batch of texts",
+    ["model", "batch_size"], buckets=STAGE_BUCKETS
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_seconds", "Database statement execution time",
+    ["engine", "operation"], buckets=FAST_BUCKETS
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection",
+    ["engine"], buckets=FAST_BUCKETS
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Pool connections checked out and pool size",
+    ["engine", "state"], multiprocess_mode="livesum"
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests currently being served",
+    ["method", "route"], multiprocess_mode="livesum"
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency until the response body is sent",
+    ["method", "route", "status"], buckets=STAGE_BUCKETS
+)
+MODEL_LOADED = Gauge(
+    "model_loaded", "1 for each model loaded in the process",
+    ["kind", "name"], multiprocess_mode="liveall"
+)
+MODEL_LOAD_SECONDS = Gauge(
+    "model_load_seconds", "Time it took to load a model",
+    ["kind", "name"], multiprocess_mode="liveall"
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Cache lookups by result",
+    ["cache", "result"]
+)
+CACHE_ENTRIES = Gauge(
+    "cache_entries", "Entries held by an in-process cache",
+    ["cache"], multiprocess_mode="liveall"
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight", "Heavy requests holding an admission slot",
+    ["route_class"], multiprocess_mode="livesum"
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth", "Heavy requests waiting for an admission slot",
+    ["route_class"], multiprocess_mode="livesum"
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "admission_wait_seconds", "Time admitted requests waited for a slot",
+    ["route_class"], buckets=STAGE_BUCKETS
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total", "Heavy requests turned away by admission control",
+    ["route_class", "reason"]
+)
+PROCESS_POOL_BUSY = Gauge(
+    "process_pool_busy_workers", "Pool worker processes running a task",
+    ["pool"], multiprocess_mode="livesum"
+)
+PROCESS_POOL_TASKS = Counter(
+    "process_pool_tasks_total", "Tasks run in a worker process pool by outcome",
+    ["pool", "task", "outcome"]
+)
+PROCESS_POOL_TASK_SECONDS = Histogram(
+    "process_pool_task_seconds", "Time from submitting a task to its result, including the wait for a free worker",
+    ["pool", "task"], buckets=STAGE_BUCKETS
+)
+PROCESS_POOL_WORKER_EXITS = Counter(
+    "process_pool_worker_exits_total", "Pool worker processes stopped or killed, by reason",
+    ["pool", "reason"]
+)
+
+
+@contextmanager
+def observe_stage(stage: str) -> Iterator[None]:
+    """Record the duration of a pipeline stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+def timed_stage(stage: str) -> Callable:
+    """Decorator form of observe_stage"""
+    def decorator(func: Callable) -> Callable:
+        histogram = STAGE_SECONDS.labels(stage)
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def batch_size_label(size: int) -> str:
+    """Coarse batch-size bucket, keeping label cardinality bounded"""
+    for limit in (1, 8, 32, 128, 512):
+        if size <= limit:
+            return f"<={limit}"
+    return ">512"
+
+
+# Database
+
+
+class _TimedCheckout:
+    """Pool mixin timing how long a checkout waits for a connection"""
+    
+    metrics_engine = "sync"
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(self.metrics_engine).observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    metrics_engine = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics_engine = "async"
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Record per-statement time and pool saturation for an engine
+    
+    Args:
+        engine: Sync engine (use AsyncEngine.sync_engine for async engines)
+        name: Engine label value
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start_times"].pop()
+        operation = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "other"
+        if operation not in ("select", "insert", "update", "delete", "with"):
+            operation = "other"
+        DB_QUERY_SECONDS.labels(name, operation).observe(time.perf_counter() - start)
+    
+    def record_pool_state(returning: int) -> None:
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            DB_POOL_CONNECTIONS.labels(name, "checked_out").set(pool.checkedout() - returning)
+            DB_POOL_CONNECTIONS.labels(name, "size").set(pool.size() + max(pool.overflow(), 0))
+    
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        record_pool_state(0)
+    
+    @event.listens_for(engine, "checkin")
+    def checkin(dbapi_connection, connection_record):
+        # Fired before the connection is back in the pool
+        record_pool_state(1)
+
+
+# HTTP
+
+
+def match_route(scope) -> Tuple[str, Dict[str, Any]]:
+    """Path template and path parameters of the route that will serve the request"""
+    app = scope.get("app")
+    for route in getattr(app, "routes", []):
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            return route.path, child_scope.get("path_params", {})
+    return "unmatched", {}
+
+
+def route_template(scope) -> str:
+    """Path template of the route that will serve the request (bounded label values)"""
+    return match_route(scope)[0]
+
+
+class MetricsMiddleware:
+    """ASGI middleware tracking in-flight requests and latency per route"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        route = route_template(scope)
+        in_flight = HTTP_IN_FLIGHT.labels(method, route)
+        status_code = 500
+        
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_SECONDS.labels(method, route, str(status_code)).observe(time.perf_counter() - start)
+
+
+def render_metrics() -> bytes:
+    """Exposition text for this process, or for all workers in multiprocess mode"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
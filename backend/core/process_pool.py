@@ -0,0 +1,343 @@
+"""
+Managed pool of worker processes for CPU-bound request work
+
+Parsing and NLP hold the GIL, so running them in the server's thread pool
+serializes them with everything else in the worker. ProcessPool keeps a fixed
+number of long-lived worker processes instead; each runs an initializer once
+(to load its parser and models) and then executes tasks sent over a pipe.
+Requests await a free worker and their result, so the event loop stays free.
+
+Unlike concurrent.futures.ProcessPoolExecutor, a task that runs longer than its
+timeout gets its worker killed and replaced, and workers are recycled after a
+number of tasks to bound memory growth in long-lived processes.
+
+Tasks are module-level functions (pickled by reference) taking and returning
+picklable values; exceptions raised by a task are re-raised in the caller.
+"""
+import asyncio
+import logging
+import pickle
+import signal
+import threading
+import time
+from multiprocessing import get_context
+from typing import Any, Callable, List, Optional, Tuple
+
+from prometheus_client import multiprocess
+from starlette.concurrency import run_in_threadpool
+
+from .metrics import (
+    MULTIPROCESS, PROCESS_POOL_BUSY, PROCESS_POOL_TASK_SECONDS, PROCESS_POOL_TASKS, PROCESS_POOL_WORKER_EXITS
+)
+from .profiling import span
+
+logger = logging.getLogger(__name__)
+
+# How long a retired worker may take to exit before it is killed
+RETIRE_GRACE_SECONDS = 5.0
+
+
+class TaskTimeout(TimeoutError):
+    """A task ran longer than its timeout; its worker was killed"""
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker process died (or failed to start) while running a task"""
+
+
+def _portable(error: Exception) -> Exception:
+    """The exception itself if it survives pickling, else a RuntimeError carrying its message"""
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {str(error)}")
+
+
+def _worker_main(conn, initializer: Optional[Callable[[], None]]) -> None:
+    """Entry point of a worker process: initialize once, then serve tasks until told to stop"""
+    # Ctrl+C reaches the whole process group; the parent decides when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if initializer is not None:
+        initializer()
+    conn.send(("ready", None))
+    
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        func, args = message
+        try:
+            reply = ("ok", func(*args))
+        except Exception as e:
+            reply = ("error", _portable(e))
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Unpicklable result or exception
+            conn.send(("error", RuntimeError(f"{type(e).__name__}: {str(e)}")))
+
+
+class _Worker:
+    """Parent-side handle of one worker process"""
+    
+    def __init__(self, context, name: str, initializer: Optional[Callable[[], None]]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, initializer), name=name, daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.tasks_done = 0
+        self.retired_at: Optional[float] = None
+    
+    def _receive(self) -> Tuple[str, Any]:
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join(1)
+            raise WorkerCrashed(f"Worker process exited with code {self.process.exitcode}")
+    
+    def call(self, func: Callable, args: tuple, timeout: Optional[float], start_timeout: float) -> Any:
+        """Run func(*args) in the worker (blocking)"""
+        if not self.ready:
+            # The first task waits for the initializer, which is not charged to its timeout
+            if not self.conn.poll(start_timeout):
+                raise WorkerCrashed(f"Worker process did not start within {start_timeout:.0f}s")
+            self._receive()
+            self.ready = True
+        
+        try:
+            self.conn.send((func, args))
+        except (BrokenPipeError, OSError):
+            raise WorkerCrashed(f"Worker process exited with code {self.process.exitcode}")
+        if not self.conn.poll(timeout):
+            raise TaskTimeout(f"{func.__name__} did not finish within {timeout:.0f}s")
+        status, payload = self._receive()
+        if status == "error":
+            raise payload
+        return payload
+    
+    def stop(self) -> None:
+        """Ask the worker to exit once it is idle"""
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.conn.close()
+    
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ProcessPool:
+    """
+    Fixed-size pool of worker processes with per-task timeouts and recycling
+    
+    Workers start on the first task, or up front with start(). Use from the
+    event loop of one process; a forked child must not use its parent's pool.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        size: int,
+        initializer: Optional[Callable[[], None]] = None,
+        max_tasks_per_worker: int = 0,
+        task_timeout: Optional[float] = None,
+        start_method: str = "spawn",
+        start_timeout: float = 120.0
+    ):
+        """
+        Initialize the pool (no processes are started yet)
+        
+        Args:
+            name: Label for metrics and process names
+            size: Number of worker processes; 0 disables the pool
+            initializer: Module-level function run once in every new worker
+            max_tasks_per_worker: Tasks after which a worker is replaced (0 = never)
+            task_timeout: Default seconds a task may run before its worker is killed
+            start_method: multiprocessing start method ("spawn", "forkserver" or "fork")
+            start_timeout: Seconds a new worker may take to run its initializer
+        """
+        self.name = name
+        self.size = size
+        self.initializer = initializer
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.task_timeout = task_timeout
+        self.start_timeout = start_timeout
+        self._context = get_context(start_method)
+        # One entry per worker slot: an idle worker, or None for one not started yet
+        self._slots: Optional[asyncio.Queue] = None
+        # Workers asked to stop, reaped when the next worker starts
+        self._retired: List[_Worker] = []
+        self._started = 0
+        # _execute runs in several threads at once
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+    
+    def _slot_queue(self) -> asyncio.Queue:
+        if self._slots is None:
+            self._slots = asyncio.Queue()
+            for _ in range(self.size):
+                self._slots.put_nowait(None)
+        return self._slots
+    
+    def _spawn(self) -> _Worker:
+        with self._lock:
+            self._reap()
+            self._started += 1
+            name = f"{self.name}-pool-{self._started}"
+        return _Worker(self._context, name, self.initializer)
+    
+    def _retire(self, worker: _Worker, reason: str) -> None:
+        """Stop (or, after a timeout or crash, kill) a worker and count why it went away"""
+        PROCESS_POOL_WORKER_EXITS.labels(self.name, reason).inc()
+        worker.retired_at = time.monotonic()
+        if reason in ("timeout", "crashed"):
+            worker.kill()
+            self._forget(worker)
+        else:
+            worker.stop()
+            with self._lock:
+                self._retired.append(worker)
+    
+    def _reap(self) -> None:
+        """Collect retired workers that have exited; kill those past the grace period (lock held)"""
+        still_running = []
+        for worker in self._retired:
+            worker.process.join(0)
+            if worker.process.is_alive() and time.monotonic() - worker.retired_at < RETIRE_GRACE_SECONDS:
+                still_running.append(worker)
+                continue
+            if worker.process.is_alive():
+                worker.kill()
+            self._forget(worker)
+        self._retired = still_running
+    
+    @staticmethod
+    def _forget(worker: _Worker) -> None:
+        if MULTIPROCESS:
+            # Drop the worker's live gauges from the aggregated /metrics output
+            multiprocess.mark_process_dead(worker.process.pid)
+    
+    def _execute(self, worker: Optional[_Worker], func: Callable, args: tuple, timeout: Optional[float]) -> Tuple[Optional[_Worker], str, Any]:
+        """
+        Run one task on worker (started here if None); called in a thread
+        
+        Returns:
+            (worker to put back in the slot, outcome, result or exception)
+        """
+        try:
+            if worker is None:
+                worker = self._spawn()
+            result = worker.call(func, args, timeout, self.start_timeout)
+        except TaskTimeout as e:
+            logger.error(f"Error in {self.name} pool: {str(e)}; killing worker {worker.process.pid}")
+            self._retire(worker, "timeout")
+            return None, "timeout", e
+        except WorkerCrashed as e:
+            logger.error(f"Error in {self.name} pool: {str(e)}")
+            self._retire(worker, "crashed")
+            return None, "crashed", e
+        except Exception as e:
+            if worker is None:
+                logger.error(f"Error starting {self.name} pool worker: {str(e)}")
+                return None, "crashed", e
+            outcome, payload = "error", e
+        else:
+            outcome, payload = "ok", result
+        
+        worker.tasks_done += 1
+        if self.max_tasks_per_worker and worker.tasks_done >= self.max_tasks_per_worker:
+            self._retire(worker, "max_tasks")
+            # Start the replacement now so it initializes while the slot is idle
+            try:
+                worker = self._spawn()
+            except Exception as e:
+                logger.error(f"Error starting {self.name} pool worker: {str(e)}")
+                worker = None
+        return worker, outcome, payload
+    
+    async def run(self, func: Callable, *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Run func(*args) in a worker process and return its result
+        
+        Args:
+            func: Module-level function importable in the worker
+            args: Picklable arguments
+            timeout: Seconds the task may run (the pool's task_timeout if None)
+        
+        Raises:
+            TaskTimeout: The task ran too long and its worker was killed
+            WorkerCrashed: The worker died while running the task
+            Exception: Whatever func raised
+        """
+        slots = self._slot_queue()
+        task = func.__name__
+        start = time.perf_counter()
+        worker = await slots.get()
+        PROCESS_POOL_BUSY.labels(self.name).inc()
+        execution = asyncio.ensure_future(run_in_threadpool(
+            self._execute, worker, func, args, timeout if timeout is not None else self.task_timeout
+        ))
+        
+        def release(done: asyncio.Future) -> None:
+            # Runs when the thread is done with the worker, even if the caller was
+            # cancelled meanwhile: the slot must not be reused while its pipe is busy
+            PROCESS_POOL_BUSY.labels(self.name).dec()
+            returned = None
+            if not done.cancelled() and done.exception() is None:
+                returned, outcome, _ = done.result()
+                PROCESS_POOL_TASKS.labels(self.name, task, outcome).inc()
+                PROCESS_POOL_TASK_SECONDS.labels(self.name, task).observe(time.perf_counter() - start)
+            if slots is self._slots:
+                slots.put_nowait(returned)
+            elif returned is not None:
+                # The pool was shut down while the task ran
+                self._retire(returned, "shutdown")
+        
+        execution.add_done_callback(release)
+        with span(f"{self.name}_pool.{task}"):
+            _, outcome, payload = await asyncio.shield(execution)
+        if outcome != "ok":
+            raise payload
+        return payload
+    
+    async def start(self) -> None:
+        """Start every worker now, so that their initializers run before the first task"""
+        slots = self._slot_queue()
+        workers = [slots.get_nowait() for _ in range(slots.qsize())]
+        try:
+            for i, worker in enumerate(workers):
+                if worker is None:
+                    workers[i] = await run_in_threadpool(self._spawn)
+        finally:
+            for worker in workers:
+                slots.put_nowait(worker)
+    
+    async def shutdown(self) -> None:
+        """Stop idle workers; busy ones stop when their task finishes"""
+        slots, self._slots = self._slots, None
+        if slots is None:
+            return
+        while not slots.empty():
+            worker = slots.get_nowait()
+            if worker is not None:
+                self._retire(worker, "shutdown")
+        await run_in_threadpool(self._join_retired)
+    
+    def _join_retired(self) -> None:
+        with self._lock:
+            retired = list(self._retired)
+        for worker in retired:
+            worker.process.join(RETIRE_GRACE_SECONDS)
+        with self._lock:
+            self._reap()
@@ -0,0 +1,327 @@
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+from .metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+# Profile of the request being served; contextvars follow the request into run_in_threadpool
+_active_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("active_profile", default=None)
+
+# The sampler and tracemalloc are process-wide, so a worker profiles one request at a time
+_profiling_lock = threading.Lock()
+
+# Leaf frames of threads that are blocked rather than working (idle pool threads, the idle event loop)
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+}
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Time a named section of the current request when it is being profiled
+    
+    A no-op (one context variable lookup) for requests that are not profiled.
+    
+    Args:
+        name: Span name shown in the stored profile
+    """
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(name, start, time.perf_counter())
+
+
+class StackSampler(threading.Thread):
+    """
+    Background thread sampling the Python stacks of every busy thread in the process
+    
+    Samples are not limited to the profiled request: the event loop and the
+    threadpool are shared, so work of requests served concurrently shows up too.
+    """
+    
+    def __init__(self, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+    
+    def run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                leaf = (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name)
+                if leaf in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[tuple(reversed(stack))] += 1
+    
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class RequestProfile:
+    """
+    CPU samples, allocations and spans collected while one request ran
+    
+    Spans belong to the request alone. CPU samples and tracemalloc figures are
+    process-wide (reported with scope "process") and include any other request
+    the worker served at the same time.
+    """
+    
+    def __init__(self, method: str, route: str, trigger: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.route = route
+        self.trigger = trigger
+        self.started_at = datetime.utcnow()
+        self.spans: List[Dict[str, Any]] = []
+        self._spans_lock = threading.Lock()
+        self._sampler = StackSampler(settings.PROFILING_INTERVAL_SECONDS)
+        self._started_tracemalloc = False
+        self._start = 0.0
+        self.result: Dict[str, Any] = {}
+    
+    def add_span(self, name: str, start: float, end: float) -> None:
+        with self._spans_lock:
+            self.spans.append({
+                "name": name,
+                "offset_ms": round((start - self._start) * 1000, 3),
+                "duration_ms": round((end - start) * 1000, 3),
+                "thread": threading.current_thread().name
+            })
+    
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._baseline_memory = tracemalloc.get_traced_memory()[0]
+        self._start = time.perf_counter()
+        self._sampler.start()
+    
+    def stop(self, status_code: int) -> None:
+        duration = time.perf_counter() - self._start
+        self._sampler.stop()
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        
+        self.result = {
+            "status_code": status_code,
+            "duration_ms": round(duration * 1000, 3),
+            # What the cpu and memory sections cover: the whole worker, not just this request
+            "scope": "process",
+            "memory": {
+                "peak_bytes": peak - self._baseline_memory,
+                "retained_bytes": current - self._baseline_memory,
+                "top_allocations": [
+                    {"location": str(stat.traceback[0]), "size_bytes": stat.size, "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[:settings.PROFILING_TOP_ALLOCATIONS]
+                ]
+            },
+            "cpu": self._cpu_summary()
+        }
+    
+    def _cpu_summary(self, top: int = 30) -> Dict[str, Any]:
+        """Hottest functions by own and inclusive samples, plus collapsed stacks for flame graphs"""
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, count in self._sampler.stacks.items():
+            own[stack[-1]] += count
+            for function in set(stack):
+                inclusive[function] += count
+        return {
+            "interval_ms": self._sampler.interval * 1000,
+            "samples": self._sampler.samples,
+            "top_own": [{"function": f, "samples": n} for f, n in own.most_common(top)],
+            "top_inclusive": [{"function": f, "samples": n} for f, n in inclusive.most_common(top)],
+            "collapsed_stacks": {";".join(stack): count for stack, count in self._sampler.stacks.most_common(500)}
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "route": self.route,
+            "trigger": self.trigger,
+            "started_at": self.started_at.isoformat(),
+            "spans": self.spans,
+            **self.result
+        }
+
+
+class ProfileStore:
+    """Profiles as JSON files in a directory shared by the workers"""
+    
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = directory
+        self.max_profiles = max_profiles
+    
+    def _path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.json")
+    
+    def save(self, profile: Dict[str, Any]) -> None:
+        """Write a profile, deleting the oldest ones beyond max_profiles"""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._path(profile["id"]) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(profile, f)
+        os.replace(tmp_path, self._path(profile["id"]))
+        
+        for _, path in self._files()[self.max_profiles:]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Load a profile by ID (None if unknown)"""
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def list(self, limit: int) -> List[Dict[str, Any]]:
+        """Summaries of the newest profiles"""
+        summaries = []
+        for _, path in self._files()[:limit]:
+            try:
+                with open(path) as f:
+                    profile = json.load(f)
+            except (FileNotFoundError, ValueError):
+                continue
+            summaries.append({
+                key: profile.get(key)
+                for key in ("id", "method", "route", "trigger", "started_at", "status_code", "duration_ms")
+            })
+        return summaries
+    
+    def _files(self) -> List[Tuple[float, str]]:
+        """Profile files, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                try:
+                    files.append((os.path.getmtime(path), path))
+                except FileNotFoundError:
+                    continue
+        return sorted(files, reverse=True)
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_STORED)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests on demand
+    
+    A request is profiled when settings.PROFILING_HEADER is sent with an
+    Authorization header that `authorize` accepts, or at random with probability
+    settings.PROFILING_SAMPLE_RATE. The response then carries an X-Profile-Id
+    header naming the stored profile.
+    """
+    
+    def __init__(self, app, authorize: Callable[[str], Awaitable[bool]]):
+        """
+        Args:
+            app: ASGI application
+            authorize: Coroutine deciding from the Authorization header value
+                whether the caller may request a profile
+        """
+        self.app = app
+        self.authorize = authorize
+        self.header = settings.PROFILING_HEADER.lower().encode()
+    
+    async def _trigger(self, scope) -> Optional[str]:
+        """Why this request should be profiled, or None"""
+        headers = dict(scope["headers"])
+        if self.header in headers and b"authorization" in headers:
+            if await self.authorize(headers[b"authorization"].decode("latin-1")):
+                return "header"
+        if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+            return "sampled"
+        return None
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        
+        trigger = await self._trigger(scope)
+        if trigger is None or not _profiling_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        
+        profile = RequestProfile(scope["method"], route_template(scope), trigger)
+        status_code = 500
+        
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode())]
+            await send(message)
+        
+        context_token = _active_profile.set(profile)
+        try:
+            profile.start()
+            try:
+                await self.app(scope, receive, send_with_profile_id)
+            finally:
+                profile.stop(status_code)
+        finally:
+            _active_profile.reset(context_token)
+            _profiling_lock.release()
+        try:
+            await run_in_threadpool(profile_store.save, profile.to_dict())
+        except Exception as e:
+            logger.error(f"Error saving profile {profile.id}: {str(e)}")
@@ -0,0 +1,66 @@
+"""
+Fast JSON path for large responses
+
+Endpoints returning thousands of rows build plain dicts straight from column
+tuples (or from the match dicts the scoring code produced) and encode them
+with orjson, instead of validating one Pydantic model per row and encoding
+through jsonable_encoder + json.dumps. The data is produced by our own
+queries and scoring, so it is trusted to already have the schema's shape;
+the response_model on the route still documents that shape in OpenAPI.
+"""
+from typing import Any, Dict, Iterable, List, Sequence, Type
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+# NumPy scalars/arrays may come straight from the scoring code
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def dump_json(content: Any) -> bytes:
+    """Encode trusted content (dicts, lists, datetimes, NumPy values) as compact JSON"""
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """ORJSONResponse with the NumPy-aware options of dump_json"""
+    
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def schema_fields(model: Type[BaseModel]) -> tuple:
+    """Field names of a response schema, in declaration order"""
+    return tuple(model.model_fields)
+
+
+def rows_to_dicts(rows: Iterable[Sequence[Any]], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Column tuples as dicts without per-row validation
+    
+    Args:
+        rows: Result rows whose columns are selected in the order of fields
+        fields: Keys for the columns (usually schema_fields of the row schema)
+    
+    Returns:
+        One dict per row
+    """
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def model_content(model: Type[BaseModel], **values: Any) -> Dict[str, Any]:
+    """
+    Dict with exactly the schema's keys: the given values, defaults for the rest
+    
+    Args:
+        model: Response schema whose output is mimicked
+        values: Field values (already JSON-compatible; not validated)
+    
+    Returns:
+        Content for FastJSONResponse/dump_json
+    """
+    return {
+        name: values[name] if name in values else field.get_default(call_default_factory=True)
+        for name, field in model.model_fields.items()
+    }
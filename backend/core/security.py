@@ -1,18 +1,81 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from .cache import TTLCache
 from .config import settings
-from ..database.session import get_db
+from .metrics import CACHE_REQUESTS
+from ..database.session import AsyncSessionLocal, get_async_db
 from ..database.models import User
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# bcrypt runs on its own small pool so login bursts queue here instead of
+# occupying the shared threadpool that serves the other endpoints
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Lightweight view of an authenticated user, safe to share across requests"""
+    id: int
+    username: str
+    email: str
+    is_active: bool
+    is_superuser: bool
+
+
+# Token subject (username) -> UserPrincipal, per worker process. Changes made
+# through this process evict entries right away (see the User listeners below);
+# other workers, and changes made directly in the database, only catch up when
+# their entry expires, so a deactivated or deleted user keeps access for up to
+# AUTH_CACHE_TTL_SECONDS there. Keep that setting short.
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+
+def principal_from_user(user: User) -> UserPrincipal:
+    """Build a principal from a User row"""
+    return UserPrincipal(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        is_active=bool(user.is_active),
+        is_superuser=bool(user.is_superuser)
+    )
+
+
+def invalidate_principal(username: str) -> None:
+    """Drop a cached principal so the next request reloads the user"""
+    principal_cache.pop(username)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_user_update(mapper, connection, target: User) -> None:
+    """Evict this process's cached principal when a user row changes (deactivation, password, rename)"""
+    for old_username in inspect(target).attrs.username.history.deleted or ():
+        invalidate_principal(old_username)
+    invalidate_principal(target.username)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_delete(mapper, connection, target: User) -> None:
+    invalidate_principal(target.username)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -24,6 +87,18 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the dedicated bcrypt executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the dedicated bcrypt executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -36,28 +111,76 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+async def principal_from_token(token: str, db: AsyncSession) -> Optional[UserPrincipal]:
+    """
+    Resolve a JWT to its user principal
+    
+    Args:
+        token: Encoded access token
+        db: Session used when the principal is not cached
+        
+    Returns:
+        The principal, or None if the token is invalid or the user no longer exists
+    """
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        return None
+    username: str = payload.get("sub")
+    if username is None:
+        return None
     
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
+    principal = principal_cache.get(username)
+    CACHE_REQUESTS.labels("principal", "miss" if principal is None else "hit").inc()
+    if principal is None:
+        result = await db.execute(select(User).where(User.username == username))
+        user = result.scalar_one_or_none()
+        if user is None:
+            return None
+        principal = principal_from_user(user)
+        principal_cache.set(username, principal)
+    return principal
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> UserPrincipal:
+    """Get current authenticated user from JWT token"""
+    principal = await principal_from_token(token, db)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is inactive"
+        )
+    return principal
+
+
+async def get_current_superuser(current_user: UserPrincipal = Depends(get_current_user)) -> UserPrincipal:
+    """Require an administrator"""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator privileges required"
+        )
+    return current_user
+
+
+async def authorization_is_superuser(authorization: str) -> bool:
+    """Whether an Authorization header carries an active administrator's bearer token"""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    async with AsyncSessionLocal() as db:
+        principal = await principal_from_token(token, db)
+    return principal is not None and principal.is_active and principal.is_superuser
 
 if __name__ == "__main__":
     # Example usage
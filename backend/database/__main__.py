@@ -0,0 +1,24 @@
+"""
+Create the database tables, or upgrade an existing database
+
+    python -m backend.database
+
+Run once per deploy (before starting the workers) together with
+CREATE_TABLES_ON_STARTUP=false, so that no server process spends its
+startup on schema checks. Startup only creates missing tables; columns,
+indexes and constraints added to existing tables by a new release are
+applied here (see upgrade_db).
+"""
+import logging
+
+from .session import DATABASE_URL, upgrade_db
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    upgrade_db()
+    print(f"Tables ready on {DATABASE_URL.split('@')[-1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Job, JobMatch, Resume
+
+# Columns rewritten when a (job_id, resume_id) pair already has a match row
+JOB_MATCH_UPSERT_COLUMNS = [
+    "overall_score",
+    "skill_match_score",
+    "experience_score",
+    "education_score",
+    "semantic_similarity",
+    "rank",
+    "job_fingerprint",
+    "resume_fingerprint",
+    "embedding_model",
+    "scoring_version",
+]
+
+
+def _dialect_insert(db: AsyncSession):
+    """Return the dialect-specific insert construct supporting ON CONFLICT"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Bulk upsert is not supported for dialect: {dialect}")
+    return insert
+
+
+async def upsert_job_matches(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert or update job match rows in a single executemany statement
+    
+    Args:
+        db: Database session
+        rows: Dicts with job_id, resume_id and the JOB_MATCH_UPSERT_COLUMNS values
+    """
+    if not rows:
+        return
+    
+    insert = _dialect_insert(db)
+    stmt = insert(JobMatch.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["job_id", "resume_id"],
+        set_={column: stmt.excluded[column] for column in JOB_MATCH_UPSERT_COLUMNS}
+    )
+    await db.execute(stmt, rows)
+
+
+async def update_resume_embeddings(
+    db: AsyncSession,
+    embeddings: Dict[int, List[float]],
+    embedding_model: str
+) -> None:
+    """
+    Store generated resume embeddings in a single executemany UPDATE
+    
+    updated_at is written back unchanged: an embedding is derived data, and
+    bumping the timestamp would invalidate every match fingerprint.
+    
+    Args:
+        db: Database session
+        embeddings: Embedding vectors keyed by resume ID
+        embedding_model: Model that produced the vectors
+    """
+    if not embeddings:
+        return
+    
+    table = Resume.__table__
+    stmt = update(table).where(
+        table.c.id == bindparam("b_id")
+    ).values(
+        embedding=bindparam("b_embedding"),
+        embedding_model=embedding_model,
+        embedding_dim=bindparam("b_embedding_dim"),
+        updated_at=table.c.updated_at
+    )
+    await db.execute(stmt, [
+        {"b_id": resume_id, "b_embedding": embedding, "b_embedding_dim": len(embedding)}
+        for resume_id, embedding in embeddings.items()
+    ])
+
+
+async def rerank_job_matches(db: AsyncSession, job_id: int, weights: Dict[str, float]) -> None:
+    """
+    Recompute overall scores and ranks for all of a job's matches in one UPDATE
+    
+    Overall scores are rebuilt from the stored component scores, so rows
+    written under different weights are ranked on one scale.
+    
+    Args:
+        db: Database session
+        job_id: Job whose matches are ranked by overall score (descending), ties by resume_id
+        weights: The job's scoring weights (semantic, skills, experience, education)
+    """
+    overall = (
+        func.coalesce(JobMatch.semantic_similarity, 0.0) * weights['semantic'] +
+        func.coalesce(JobMatch.skill_match_score, 0.0) * weights['skills'] +
+        func.coalesce(JobMatch.experience_score, 0.0) * weights['experience'] +
+        func.coalesce(JobMatch.education_score, 0.0) * weights['education']
+    )
+    ranked = select(
+        JobMatch.id,
+        overall.label("new_score"),
+        func.row_number().over(
+            order_by=(overall.desc(), JobMatch.resume_id.asc())
+        ).label("new_rank")
+    ).where(JobMatch.job_id == job_id).subquery()
+    
+    await db.execute(
+        update(JobMatch.__table__)
+        .where(JobMatch.__table__.c.id == ranked.c.id)
+        .values(overall_score=ranked.c.new_score, rank=ranked.c.new_rank)
+    )
+
+
+async def delete_job_matches_except(
+    db: AsyncSession,
+    job_id: int,
+    keep_resume_ids: List[int],
+    within_resume_ids: Optional[List[int]] = None
+) -> None:
+    """
+    Delete a job's match rows other than the kept resumes
+    
+    Args:
+        db: Database session
+        job_id: Job whose rows are pruned
+        keep_resume_ids: Resumes whose rows survive
+        within_resume_ids: Only prune rows for these resumes (all of the job's rows if None)
+    """
+    stmt = delete(JobMatch).where(
+        JobMatch.job_id == job_id,
+        JobMatch.resume_id.notin_(keep_resume_ids)
+    )
+    if within_resume_ids is not None:
+        stmt = stmt.where(JobMatch.resume_id.in_(within_resume_ids))
+    await db.execute(stmt)
+
+
+async def update_job_match_ranking(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    Rewrite overall_score and rank for existing match rows in one executemany UPDATE
+    
+    Args:
+        db: Database session
+        rows: Dicts with the row id, overall_score and rank
+    """
+    if not rows:
+        return
+    
+    table = JobMatch.__table__
+    stmt = update(table).where(
+        table.c.id == bindparam("b_id")
+    ).values(
+        overall_score=bindparam("b_overall_score"),
+        rank=bindparam("b_rank")
+    )
+    await db.execute(stmt, [
+        {"b_id": row["id"], "b_overall_score": row["overall_score"], "b_rank": row["rank"]}
+        for row in rows
+    ])
+
+
+async def update_job_match_scores(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    Rewrite the component scores, overall score, rank and job fingerprint of
+    existing match rows in one executemany UPDATE
+    
+    Args:
+        db: Database session
+        rows: Dicts with the row id and the new column values
+    """
+    if not rows:
+        return
+    
+    columns = [
+        "overall_score", "skill_match_score", "experience_score", "education_score",
+        "semantic_similarity", "rank", "job_fingerprint", "embedding_model"
+    ]
+    table = JobMatch.__table__
+    stmt = update(table).where(
+        table.c.id == bindparam("b_id")
+    ).values(**{column: bindparam(f"b_{column}") for column in columns})
+    await db.execute(stmt, [
+        {"b_id": row["id"], **{f"b_{column}": row[column] for column in columns}}
+        for row in rows
+    ])
+
+
+async def bump_match_generation(db: AsyncSession, job_ids: List[int]) -> None:
+    """
+    Increment the jobs' match generation in the database (no lost updates between workers)
+    
+    updated_at is left alone: it versions the job itself (the job ETags), not its matches.
+    
+    Args:
+        db: Database session
+        job_ids: Jobs whose match rows were just rewritten
+    """
+    if not job_ids:
+        return
+    
+    table = Job.__table__
+    await db.execute(
+        update(table)
+        .where(table.c.id.in_(job_ids))
+        .values(match_generation=table.c.match_generation + 1, updated_at=table.c.updated_at)
+    )
+
+
+async def update_match_summary(db: AsyncSession, job_id: int, match_summary: Optional[Dict[str, Any]]) -> None:
+    """
+    Store the top_k tail summary of a match run without touching the job's updated_at
+    
+    Args:
+        db: Database session
+        job_id: Job that was matched
+        match_summary: Scored count and tail histogram, or None for an untruncated run
+    """
+    table = Job.__table__
+    await db.execute(
+        update(table)
+        .where(table.c.id == job_id)
+        .values(match_summary=match_summary, updated_at=table.c.updated_at)
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, JSON, Boolean, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -14,6 +14,7 @@ class User(Base):
     email = Column(String(100), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
+    is_superuser = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     resumes = relationship("Resume", back_populates="owner")
@@ -36,6 +37,12 @@ class Resume(Base):
     
     # Embeddings
     embedding = Column(JSON)  # Vector embedding for semantic search
+    embedding_model = Column(String(255), index=True)  # Model that produced the embedding (None: legacy all-MiniLM-L6-v2)
+    embedding_dim = Column(Integer)  # Length of the embedding vector
+    
+    # Near-duplicate detection
+    minhash_signature = Column(JSON)  # MinHash of raw_text word shingles
+    duplicate_cluster_id = Column(Integer, index=True)  # ID of the first resume in its near-duplicate cluster
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -44,6 +51,20 @@ class Resume(Base):
     matches = relationship("JobMatch", back_populates="resume")
 
 
+class ResumeLSHBucket(Base):
+    __tablename__ = "resume_lsh_buckets"
+    __table_args__ = (
+        # Candidate lookup: an owner's resumes sharing a band's bucket
+        Index("ix_resume_lsh_buckets_owner_id_band_bucket_key", "owner_id", "band", "bucket_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False, index=True)
+    band = Column(Integer, nullable=False)  # LSH band number
+    bucket_key = Column(String(16), nullable=False)  # Hash of the band's slice of the MinHash signature
+
+
 class Job(Base):
     __tablename__ = "jobs"
 
@@ -57,6 +78,18 @@ class Job(Base):
     
     # Embeddings
     embedding = Column(JSON)  # Vector embedding for semantic search
+    embedding_model = Column(String(255), index=True)  # Model that produced the embedding (None: legacy all-MiniLM-L6-v2)
+    embedding_dim = Column(Integer)  # Length of the embedding vector
+    description_hash = Column(String(64))  # SHA-256 of the description the embedding was computed from
+    
+    # Summary of the last top-k match run (total scored, tail score histogram)
+    match_summary = Column(JSON)
+    
+    # Saved overall-score weights (semantic/skills/experience/education); defaults if None
+    scoring_weights = Column(JSON)
+    
+    # Incremented by every run that rewrites the job's match rows; part of the rankings ETag
+    match_generation = Column(Integer, nullable=False, default=0, server_default="0")
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -67,6 +100,12 @@ class Job(Base):
 
 class JobMatch(Base):
     __tablename__ = "job_matches"
+    __table_args__ = (
+        # One score row per (job, resume) pair; target of bulk upserts
+        UniqueConstraint("job_id", "resume_id", name="uq_job_matches_job_id_resume_id"),
+        # Serves ranking reads ordered by rank within a job
+        Index("ix_job_matches_job_id_rank", "job_id", "rank"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
@@ -82,6 +121,12 @@ class JobMatch(Base):
     # Ranking
     rank = Column(Integer)  # Rank position (1 = best match)
     
+    # Inputs the scores were computed from; a rematch reuses the row when all match
+    job_fingerprint = Column(String(64))  # Hash of job description/skills/level
+    resume_fingerprint = Column(String(64))  # Resume updated_at at scoring time
+    embedding_model = Column(String(255))  # Sentence transformer used for similarity
+    scoring_version = Column(String(20))  # MatchingService.SCORING_VERSION
+    
     created_at = Column(DateTime, default=datetime.utcnow)
 
     job = relationship("Job", back_populates="matches")
@@ -0,0 +1,94 @@
+"""
+Production launcher: preload the app (and its models) once, then fork workers
+
+    gunicorn -c backend/gunicorn_conf.py backend.main:app
+
+The master imports backend.main and loads the sentence transformer and spaCy
+weights (when_ready) before forking, so they are loaded once and shared
+copy-on-write by every worker. With the ingestion pool enabled, spaCy is
+loaded by the pool's processes instead, which each worker starts itself.
+Garbage collection is frozen before the fork so that collections in the
+workers do not touch (and thereby copy) the master's objects. Each worker
+then gets its own database connections and a bounded torch thread pool.
+
+Environment:
+    WEB_CONCURRENCY   number of workers (default 2)
+    BIND              listen address (default 0.0.0.0:8000)
+    PRELOAD_APP       set to "false" to load the app in every worker instead
+    TORCH_THREADS_PER_WORKER  see Settings
+"""
+import gc
+import logging
+import multiprocessing
+import os
+
+from backend.core.config import settings
+
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+bind = os.getenv("BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("PRELOAD_APP", "true").lower() != "false"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+
+# Threads per worker for torch/BLAS; fork-time defaults would give every
+# worker one thread per core and oversubscribe the host
+torch_threads = settings.TORCH_THREADS_PER_WORKER or max(1, multiprocessing.cpu_count() // workers)
+for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+    os.environ.setdefault(variable, str(torch_threads))
+# The Rust tokenizers thread pool is not fork-safe
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+# Keep the preloaded heap out of the collector until it is frozen
+if preload_app:
+    gc.disable()
+
+logger = logging.getLogger("gunicorn.error")
+
+
+def when_ready(server):
+    from backend.core.memory import process_memory
+    if preload_app:
+        # Tables and models are set up here, once, rather than in every worker:
+        # the workers inherit both (init_db is then a no-op) and share the
+        # model weights copy-on-write
+        from backend.database.session import init_db
+        from backend.main import warm_up_models
+        if settings.CREATE_TABLES_ON_STARTUP:
+            init_db()
+        warm_up_models()
+    logger.info(f"Master ready (preload_app={preload_app}), memory MB: {process_memory()}")
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # Move everything allocated so far to the permanent generation
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+    
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    
+    if preload_app:
+        # Pooled connections opened in the master must not be shared across processes
+        from backend.database.session import async_engine, engine
+        engine.dispose(close=False)
+        async_engine.sync_engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    from backend.core.memory import process_memory
+    logger.info(f"Worker {worker.pid} ready, memory MB: {process_memory()}")
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Drop the dead worker's live gauges from the aggregated /metrics output
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,20 +1,49 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from .core.config import settings
+from .core.memory import process_memory
+from .core.capture import TrafficCaptureMiddleware
+from .core.metrics import CACHE_ENTRIES, CONTENT_TYPE_LATEST, MetricsMiddleware, render_metrics
+from .core.profiling import ProfilingMiddleware
+from .core.security import authorization_is_superuser, principal_cache
 from .database.session import init_db
-from .api import auth, resumes, jobs
+from .services.ingestion import ingestion_pool
+from .api import admin, auth, resumes, jobs
 
 
-# Initialize database
-init_db()
+def warm_up_models():
+    """Load the spaCy and sentence transformer models (otherwise loaded by the first request using them)"""
+    if not ingestion_pool.enabled:
+        # Otherwise the ingestion pool's workers load their own spaCy model
+        resumes.nlp_engine.warm_up()
+    jobs.matching_service.warm_up()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup work kept out of import time, so importing the app stays cheap"""
+    if settings.CREATE_TABLES_ON_STARTUP:
+        await run_in_threadpool(init_db)
+    if settings.WARM_UP_MODELS:
+        await run_in_threadpool(warm_up_models)
+    if ingestion_pool.enabled:
+        # Started in each server worker (the gunicorn master does not run the lifespan)
+        await ingestion_pool.start()
+    yield
+    await ingestion_pool.shutdown()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="Resume Screening & Job Matching API",
     description="NLP-powered resume screening and job matching system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -26,10 +55,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and in-flight requests
+app.add_middleware(MetricsMiddleware)
+
+# Opt-in request profiling (settings.PROFILING_ENABLED)
+app.add_middleware(ProfilingMiddleware, authorize=authorization_is_superuser)
+
+# Sanitized request metadata for offline replay (settings.CAPTURE_ENABLED)
+app.add_middleware(TrafficCaptureMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(resumes.router)
 app.include_router(jobs.router)
+app.include_router(admin.router)
 
 
 @app.get("/")
@@ -48,6 +87,21 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/memory")
+def memory_check():
+    """Memory of the worker serving the request"""
+    return {"pid": os.getpid(), "memory_mb": process_memory()}
+
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics (all workers when PROMETHEUS_MULTIPROC_DIR is set)"""
+    CACHE_ENTRIES.labels("principal").set(len(principal_cache))
+    CACHE_ENTRIES.labels("rankings").set(len(jobs.rankings_cache))
+    return Response(render_metrics(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -15,9 +15,26 @@ class JobCreate(JobBase):
     pass
 
 
+class JobUpdate(BaseModel):
+    # Omitted fields keep their value
+    title: Optional[str] = None
+    description: Optional[str] = None
+    required_skills: Optional[List[str]] = None
+    preferred_skills: Optional[List[str]] = None
+    experience_level: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_required(self) -> "JobUpdate":
+        for field in ("title", "description"):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f"{field} cannot be null")
+        return self
+
+
 class JobResponse(JobBase):
     id: int
     owner_id: int
+    scoring_weights: Optional[Dict[str, float]] = None
     created_at: datetime
     updated_at: datetime
 
@@ -25,8 +42,24 @@ class JobResponse(JobBase):
         from_attributes = True
 
 
+class JobUpdateResponse(JobResponse):
+    changed_fields: List[str] = []  # Fields whose value actually changed
+    rescored_components: List[str] = []  # Stored match scores recomputed: semantic, skills, experience
+    rescored_matches: int = 0  # Stored matches updated in place
+    invalidated_matches: int = 0  # Stored matches deleted because they could not be updated (rescored by the next match run)
+
+
 class MatchRequest(BaseModel):
     resume_ids: Optional[List[int]] = None  # If None, match all resumes
+    top_k: Optional[int] = Field(None, ge=1, le=10000)  # Keep and persist only the best k matches (the rest are rescored by the next run)
+    first_stage_k: Optional[int] = Field(None, ge=1, le=100000)  # Score only the best k candidates from hybrid lexical + dense retrieval
+    collapse_duplicates: bool = False  # Score only the latest resume of each near-duplicate cluster
+
+
+class MatchStreamRequest(MatchRequest):
+    deadline_ms: Optional[int] = Field(None, gt=0)  # Stop scoring after this long and return best-so-far
+    chunk_size: int = Field(256, ge=1, le=10000)  # Resumes scored between progress events
+    preview_size: int = Field(10, ge=1, le=100)  # Top matches included in each progress event
 
 
 class MatchScore(BaseModel):
@@ -40,8 +73,49 @@ class MatchScore(BaseModel):
     rank: int
 
 
+class BatchMatchRequest(BaseModel):
+    job_ids: List[int] = Field(..., min_length=1, max_length=500)
+    resume_ids: Optional[List[int]] = None  # If None, match all resumes
+    top_k: Optional[int] = Field(100, ge=1, le=10000)  # Best matches kept per job (all if null; the rest are rescored by the next run)
+
+
+class ScoreHistogram(BaseModel):
+    bin_edges: List[float]
+    counts: List[int]
+
+
 class MatchResponse(BaseModel):
     job_id: int
     job_title: str
     matches: List[MatchScore]
     total_matched: int
+    next_cursor: Optional[str] = None  # "rank:resume_id" to pass as `cursor` for the next page
+    computed: Optional[int] = None  # Pairs scored by this match run
+    reused: Optional[int] = None  # Pairs whose stored scores were still current
+    total_scored: Optional[int] = None  # Pairs considered, including those cut by top_k
+    tail_histogram: Optional[ScoreHistogram] = None  # Scores of pairs outside the top_k
+
+
+class BatchMatchResponse(BaseModel):
+    results: List[MatchResponse]
+    total_jobs: int
+    total_resumes: int
+
+
+class ScoringWeights(BaseModel):
+    semantic: float = Field(..., ge=0.0, le=1.0)
+    skills: float = Field(..., ge=0.0, le=1.0)
+    experience: float = Field(..., ge=0.0, le=1.0)
+    education: float = Field(..., ge=0.0, le=1.0)
+
+    @model_validator(mode="after")
+    def check_sum(self) -> "ScoringWeights":
+        total = self.semantic + self.skills + self.experience + self.education
+        if abs(total - 1.0) > 1e-6:
+            raise ValueError(f"Weights must sum to 1 (got {total:.6f})")
+        return self
+
+
+class RerankRequest(BaseModel):
+    weights: ScoringWeights
+    save_profile: bool = False  # Store the weights on the job and write the new ranking back; otherwise only preview it
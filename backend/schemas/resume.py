@@ -18,6 +18,7 @@ class ResumeResponse(ResumeBase):
     skills: Optional[List[str]] = None
     experience: Optional[List[Dict[str, Any]]] = None
     education: Optional[List[Dict[str, Any]]] = None
+    duplicate_cluster_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
@@ -29,3 +30,4 @@ class ResumeUploadResponse(BaseModel):
     id: int
     filename: str
     message: str
+    duplicate_cluster_id: Optional[int] = None
@@ -0,0 +1,319 @@
+import glob
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.profiling import span
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def _log_dtype(dim: int) -> np.dtype:
+    """Append-log record: resume ID (negated, minus one, for a delete) and its vector"""
+    return np.dtype([("id", "<i8"), ("vector", "<f4", (dim,))])
+
+
+class EmbeddingStore:
+    """
+    Host-local store of one owner's embeddings for one model
+    
+    A compacted base (contiguous float32 matrix plus sorted IDs, both .npy)
+    is memory-mapped read-only, so every worker on the host shares one copy
+    through the page cache. New vectors and deletes go to an append log of
+    fixed-size records. Once the log holds log_max_records records, a
+    background thread folds it into a new base generation; meta.json names
+    the live generation and is replaced atomically, so readers never see a
+    base and log from different generations.
+    """
+    
+    def __init__(self, directory: str, log_max_records: int = 1000):
+        """
+        Initialize a store under directory (loaded lazily)
+        
+        Args:
+            directory: Directory holding the store files
+            log_max_records: Log length that triggers a background compaction
+        """
+        self.directory = directory
+        self.log_max_records = log_max_records
+        self._lock = threading.RLock()
+        self._compacting = False
+        self._signature = None
+        self._reset()
+    
+    def _reset(self) -> None:
+        self._dim: Optional[int] = None
+        self._generation = 0
+        self._base_ids = np.empty(0, dtype=np.int64)
+        self._base: Optional[np.ndarray] = None
+        self._log_index: Dict[int, int] = {}
+        self._log_vectors: Optional[np.ndarray] = None
+        self._deleted: set = set()
+    
+    # Persistence
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+    
+    def _read_meta(self) -> Optional[Dict[str, int]]:
+        try:
+            with open(self._path("meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def _current_signature(self) -> Optional[tuple]:
+        try:
+            meta = os.stat(self._path("meta.json"))
+        except FileNotFoundError:
+            return None
+        generation = self._read_meta()["generation"]
+        log_path = self._path(f"log-{generation}.bin")
+        log_size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+        return (meta.st_mtime_ns, meta.st_ino, log_size)
+    
+    def _load(self) -> None:
+        """Map the live base generation and replay its log, if anything changed"""
+        signature = self._current_signature()
+        if signature == self._signature:
+            return
+        meta = self._read_meta()
+        if meta is None:
+            self._reset()
+            self._signature = signature
+            return
+        
+        if meta["generation"] != self._generation or self._base is None:
+            self._dim = meta["dim"]
+            self._generation = meta["generation"]
+            self._base_ids = np.load(self._path(f"ids-{self._generation}.npy"))
+            self._base = np.load(self._path(f"vectors-{self._generation}.npy"), mmap_mode="r")
+        
+        # Replay the log; later records win and a partial trailing record is ignored
+        dtype = _log_dtype(self._dim)
+        log_path = self._path(f"log-{self._generation}.bin")
+        count = os.path.getsize(log_path) // dtype.itemsize if os.path.exists(log_path) else 0
+        records = np.fromfile(log_path, dtype=dtype, count=count) if count else np.empty(0, dtype=dtype)
+        self._log_index = {}
+        self._deleted = set()
+        for row, record_id in enumerate(records["id"].tolist()):
+            if record_id < 0:
+                self._log_index.pop(-record_id - 1, None)
+                self._deleted.add(-record_id - 1)
+            else:
+                self._log_index[record_id] = row
+                self._deleted.discard(record_id)
+        self._log_vectors = records["vector"]
+        self._signature = signature
+    
+    def _write_meta(self, dim: int, generation: int) -> None:
+        tmp_path = self._path(".meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"dim": dim, "generation": generation}, f)
+        os.replace(tmp_path, self._path("meta.json"))
+    
+    def _write_base(self, generation: int, ids: np.ndarray, vectors: np.ndarray) -> None:
+        for name, array in ((f"ids-{generation}.npy", ids), (f"vectors-{generation}.npy", vectors)):
+            tmp_path = self._path(f".{name}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, self._path(name))
+        open(self._path(f"log-{generation}.bin"), "wb").close()
+    
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        """Hold the writer lock (thread and, where supported, process) on fresh state"""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(".lock"), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._load()
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _append(self, records: np.ndarray) -> None:
+        with open(self._path(f"log-{self._generation}.bin"), "ab") as f:
+            f.write(records.tobytes())
+        self._load()
+    
+    # Updates
+    
+    def put(self, embeddings: Dict[int, List[float]]) -> None:
+        """
+        Add or replace vectors
+        
+        Args:
+            embeddings: Embedding vectors keyed by resume ID
+        """
+        if not embeddings:
+            return
+        
+        with self._exclusive():
+            dim = len(next(iter(embeddings.values())))
+            if self._dim is None:
+                self._write_base(0, np.empty(0, dtype=np.int64), np.empty((0, dim), dtype=np.float32))
+                self._write_meta(dim, 0)
+                self._load()
+            if dim != self._dim:
+                raise ValueError(f"Store holds {self._dim}-dimensional vectors, got {dim}")
+            
+            records = np.empty(len(embeddings), dtype=_log_dtype(self._dim))
+            records["id"] = list(embeddings.keys())
+            records["vector"] = np.asarray(list(embeddings.values()), dtype=np.float32)
+            self._append(records)
+            log_length = len(self._log_vectors)
+        
+        if log_length >= self.log_max_records:
+            self.compact_in_background()
+    
+    def delete(self, resume_ids: List[int]) -> None:
+        """
+        Remove vectors
+        
+        Args:
+            resume_ids: Resume IDs to remove
+        """
+        with self._exclusive():
+            if self._dim is None:
+                return
+            records = np.zeros(len(resume_ids), dtype=_log_dtype(self._dim))
+            records["id"] = [-resume_id - 1 for resume_id in resume_ids]
+            self._append(records)
+    
+    def compact(self) -> None:
+        """Fold the log into a new base generation and drop superseded generations"""
+        with self._exclusive():
+            if self._dim is None or (not self._log_index and not self._deleted):
+                return
+            
+            keep = ~np.isin(self._base_ids, list(self._log_index) + list(self._deleted))
+            log_ids = np.fromiter(self._log_index.keys(), dtype=np.int64, count=len(self._log_index))
+            log_rows = np.fromiter(self._log_index.values(), dtype=np.int64, count=len(self._log_index))
+            ids = np.concatenate([self._base_ids[keep], log_ids])
+            vectors = np.concatenate([self._base[keep], self._log_vectors[log_rows]])
+            order = np.argsort(ids, kind="stable")
+            
+            generation = self._generation + 1
+            self._write_base(generation, ids[order], np.ascontiguousarray(vectors[order], dtype=np.float32))
+            self._write_meta(self._dim, generation)
+            self._load()
+            
+            # Keep the previous generation for readers that are just switching over
+            for path in glob.glob(self._path("*-*.*")):
+                name = os.path.basename(path)
+                stem = os.path.splitext(name)[0]
+                if int(stem.rsplit("-", 1)[1]) < generation - 1:
+                    os.remove(path)
+    
+    def compact_in_background(self) -> None:
+        """Start a compaction thread unless one is already running"""
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        
+        def run():
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"Error compacting embedding store {self.directory}: {str(e)}")
+            finally:
+                self._compacting = False
+        
+        threading.Thread(target=run, name="embedding-store-compaction", daemon=True).start()
+    
+    # Reads
+    
+    def get(self, resume_ids: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Look up vectors without deserializing anything
+        
+        Args:
+            resume_ids: Resume IDs, ideally sorted ascending
+            
+        Returns:
+            Tuple of a found mask and a (len(resume_ids), dim) float32 matrix;
+            rows of IDs that are not stored are undefined. When the request
+            covers the whole base and the log is empty, the matrix is the
+            read-only memory map itself
+        """
+        with span("embedding_store.get"), self._lock:
+            self._load()
+            ids = np.asarray(resume_ids, dtype=np.int64)
+            if self._dim is None:
+                return np.zeros(len(ids), dtype=bool), np.empty((len(ids), 0), dtype=np.float32)
+            if not self._log_index and not self._deleted and np.array_equal(ids, self._base_ids):
+                return np.ones(len(ids), dtype=bool), self._base
+            
+            matrix = np.empty((len(ids), self._dim), dtype=np.float32)
+            found = np.zeros(len(ids), dtype=bool)
+            if len(self._base_ids):
+                positions = np.minimum(np.searchsorted(self._base_ids, ids), len(self._base_ids) - 1)
+                in_base = self._base_ids[positions] == ids
+                matrix[in_base] = self._base[positions[in_base]]
+                found |= in_base
+            for i, resume_id in enumerate(ids.tolist()):
+                row = self._log_index.get(resume_id)
+                if row is not None:
+                    matrix[i] = self._log_vectors[row]
+                    found[i] = True
+                elif resume_id in self._deleted:
+                    found[i] = False
+            return found, matrix
+
+
+_stores: Dict[Tuple[int, str], EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _owner_directory(owner_id: int) -> str:
+    return os.path.join(settings.INDEX_DIR, "embeddings", str(owner_id))
+
+
+def get_embedding_store(owner_id: int, embedding_model: str) -> EmbeddingStore:
+    """Per-process EmbeddingStore for an owner's vectors from one model"""
+    key = (owner_id, embedding_model)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = EmbeddingStore(
+                os.path.join(_owner_directory(owner_id), embedding_model.replace("/", "__")),
+                log_max_records=settings.EMBEDDING_STORE_LOG_MAX_RECORDS
+            )
+            _stores[key] = store
+        return store
+
+
+def store_embeddings(owner_id: int, embedding_model: str, embeddings: Dict[int, List[float]]) -> None:
+    """Write vectors to the owner's store; the database stays the source of truth"""
+    try:
+        get_embedding_store(owner_id, embedding_model).put(embeddings)
+    except Exception as e:
+        logger.error(f"Error storing embeddings for owner {owner_id}: {str(e)}")
+
+
+def forget_resume(owner_id: int, resume_id: int) -> None:
+    """Remove a resume's vectors from every model's store of its owner"""
+    directory = _owner_directory(owner_id)
+    if not os.path.isdir(directory):
+        return
+    for model_directory in os.listdir(directory):
+        try:
+            get_embedding_store(owner_id, model_directory.replace("__", "/")).delete([resume_id])
+        except Exception as e:
+            logger.error(f"Error removing resume {resume_id} from embedding store: {str(e)}")
@@ -0,0 +1,53 @@
+"""
+Resume parsing and NLP extraction in worker processes
+
+The ingestion pool's workers each create one ResumeParser and one NLPEngine
+(loading the spaCy model) when they start; upload_resume sends them the file
+path and the extracted text. Set INGESTION_POOL_SIZE=0 to run both steps in
+the request worker's thread pool instead.
+"""
+import logging
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from ..core.process_pool import ProcessPool
+from .nlp_engine import NLPEngine
+from .resume_parser import ResumeParser
+
+logger = logging.getLogger(__name__)
+
+# Set by init_worker in each pool worker
+_parser: Optional[ResumeParser] = None
+_engine: Optional[NLPEngine] = None
+
+
+def init_worker() -> None:
+    """Create the worker's parser and engine and load the spaCy model"""
+    global _parser, _engine
+    _parser = ResumeParser()
+    _engine = NLPEngine()
+    try:
+        _engine.warm_up()
+    except Exception:
+        # Already logged by NLPEngine; extraction raises again and uploads continue without it
+        pass
+
+
+def parse_resume(file_path: str) -> Dict[str, Any]:
+    """ResumeParser.parse in a pool worker"""
+    return _parser.parse(file_path)
+
+
+def extract_information(text: str) -> Dict[str, Any]:
+    """NLPEngine.process_resume in a pool worker"""
+    return _engine.process_resume(text)
+
+
+ingestion_pool = ProcessPool(
+    "ingestion",
+    size=settings.INGESTION_POOL_SIZE,
+    initializer=init_worker,
+    max_tasks_per_worker=settings.INGESTION_MAX_TASKS_PER_WORKER,
+    task_timeout=settings.INGESTION_TASK_TIMEOUT_SECONDS,
+    start_method=settings.INGESTION_POOL_START_METHOD
+)
@@ -0,0 +1,364 @@
+import json
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from ..core.config import settings
+from ..core.profiling import span
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Keeps tokens such as c++, c#, node.js and ci-cd intact
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-/][a-z0-9+#]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into index terms"""
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+class LexicalIndex:
+    """
+    Persistent BM25 index over resume text for one owner
+    
+    Term frequencies live in a main CSR matrix (documents x terms) plus a
+    small delta matrix that absorbs uploads; deletes are tombstones over the
+    main matrix. The delta is merged into the main matrix once it holds
+    delta_max_docs documents. Every file is replaced atomically; a lock file
+    serializes writers across worker processes and, held shared, keeps
+    readers from loading a mix of two writes.
+    """
+    
+    K1 = 1.2
+    B = 0.75
+    FILES = ("vocab.json", "main.npz", "main_ids.npy", "delta.npz", "delta_ids.npy", "deleted.json")
+    
+    def __init__(self, directory: str, delta_max_docs: int = 2000):
+        """
+        Initialize an index stored under directory (loaded lazily)
+        
+        Args:
+            directory: Directory holding the index files
+            delta_max_docs: Delta size that triggers a merge into the main matrix
+        """
+        self.directory = directory
+        self.delta_max_docs = delta_max_docs
+        self._lock = threading.RLock()
+        self._signature: Dict[str, Optional[tuple]] = {}
+        self._reset()
+    
+    def _reset(self) -> None:
+        self._terms: List[str] = []
+        self._vocab: Dict[str, int] = {}
+        self._main = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self._main_ids = np.empty(0, dtype=np.int64)
+        self._delta = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self._delta_ids = np.empty(0, dtype=np.int64)
+        self._deleted: set = set()
+        self._main_stats = None
+        self._delta_stats = None
+    
+    # Persistence
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+    
+    def exists(self) -> bool:
+        """Whether the index has been built on disk"""
+        return os.path.exists(self._path("vocab.json"))
+    
+    def _file_signature(self, name: str) -> Optional[tuple]:
+        # Every write replaces the file, so the inode changes even within one mtime tick
+        try:
+            stat = os.stat(self._path(name))
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+    
+    def _load(self) -> None:
+        """Reload whatever another process (or this one) has written since the last load (file lock held)"""
+        signature = {name: self._file_signature(name) for name in self.FILES}
+        if signature == self._signature:
+            return
+        if signature["vocab.json"] is None:
+            self._reset()
+            self._signature = signature
+            return
+        
+        changed = {name for name in self.FILES if signature[name] != self._signature.get(name)}
+        if changed & {"main.npz", "main_ids.npy"}:
+            self._main = sparse.load_npz(self._path("main.npz")).tocsr()
+            self._main_ids = np.load(self._path("main_ids.npy"))
+            self._main_stats = None
+        if changed & {"delta.npz", "delta_ids.npy"}:
+            self._delta = sparse.load_npz(self._path("delta.npz")).tocsr()
+            self._delta_ids = np.load(self._path("delta_ids.npy"))
+            self._delta_stats = None
+        if "deleted.json" in changed:
+            with open(self._path("deleted.json")) as f:
+                self._deleted = set(json.load(f))
+        if "vocab.json" in changed:
+            with open(self._path("vocab.json")) as f:
+                self._terms = json.load(f)
+            self._vocab = {term: i for i, term in enumerate(self._terms)}
+        self._signature = signature
+    
+    def _write(self, name: str, writer) -> None:
+        tmp_path = self._path(f".{name}.tmp")
+        with open(tmp_path, "wb") as f:
+            writer(f)
+        os.replace(tmp_path, self._path(name))
+    
+    def _save(self, main: bool = False) -> None:
+        """Write the delta segment, tombstones and vocabulary (and the main segment if asked)"""
+        os.makedirs(self.directory, exist_ok=True)
+        if main:
+            self._write("main.npz", lambda f: sparse.save_npz(f, self._main, compressed=False))
+            self._write("main_ids.npy", lambda f: np.save(f, self._main_ids))
+            self._main_stats = None
+        self._write("delta.npz", lambda f: sparse.save_npz(f, self._delta, compressed=False))
+        self._write("delta_ids.npy", lambda f: np.save(f, self._delta_ids))
+        self._write("deleted.json", lambda f: f.write(json.dumps(sorted(self._deleted)).encode()))
+        # Written last: its presence marks a complete index
+        self._write("vocab.json", lambda f: f.write(json.dumps(self._terms).encode()))
+        self._delta_stats = None
+        self._signature = {name: self._file_signature(name) for name in self.FILES}
+    
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """Hold the lock file (where supported) and load fresh state; the thread lock must be held"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                self._load()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        """Hold the writer lock (thread and, where supported, process) on fresh state"""
+        with self._lock, self._file_lock(exclusive=True):
+            yield
+    
+    # Updates
+    
+    def _rows(self, texts: List[str]) -> sparse.csr_matrix:
+        """Term-frequency rows for texts, growing the vocabulary as needed"""
+        data, indices, indptr = [], [], [0]
+        for text in texts:
+            for term, count in Counter(tokenize(text)).items():
+                column = self._vocab.get(term)
+                if column is None:
+                    column = self._vocab[term] = len(self._terms)
+                    self._terms.append(term)
+                indices.append(column)
+                data.append(count)
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.array(data, dtype=np.int32), np.array(indices, dtype=np.int32), np.array(indptr)),
+            shape=(len(texts), len(self._terms))
+        )
+    
+    def _resized(self, matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+        matrix = matrix.copy()
+        matrix.resize((matrix.shape[0], len(self._terms)))
+        return matrix
+    
+    def _forget(self, doc_id: int) -> None:
+        """Drop a document from the delta and tombstone it in the main segment"""
+        keep = self._delta_ids != doc_id
+        if not keep.all():
+            self._delta = self._delta[np.flatnonzero(keep)]
+            self._delta_ids = self._delta_ids[keep]
+        if np.any(self._main_ids == doc_id):
+            self._deleted.add(doc_id)
+    
+    def _merge_delta(self) -> None:
+        alive = ~np.isin(self._main_ids, list(self._deleted))
+        self._main = sparse.vstack([
+            self._resized(self._main)[np.flatnonzero(alive)],
+            self._resized(self._delta)
+        ]).tocsr()
+        self._main_ids = np.concatenate([self._main_ids[alive], self._delta_ids])
+        self._delta = sparse.csr_matrix((0, len(self._terms)), dtype=np.int32)
+        self._delta_ids = np.empty(0, dtype=np.int64)
+        self._deleted = set()
+    
+    def add(self, doc_id: int, text: str) -> None:
+        """
+        Index (or re-index) one document
+        
+        Args:
+            doc_id: Resume ID
+            text: Resume raw text
+        """
+        with self._exclusive():
+            self._forget(doc_id)
+            row = self._rows([text])
+            self._delta = sparse.vstack([self._resized(self._delta), row]).tocsr()
+            self._delta_ids = np.append(self._delta_ids, np.int64(doc_id))
+            
+            merge = len(self._delta_ids) >= self.delta_max_docs
+            if merge:
+                self._merge_delta()
+            self._save(main=merge)
+    
+    def remove(self, doc_id: int) -> None:
+        """
+        Remove a document from the index
+        
+        Args:
+            doc_id: Resume ID
+        """
+        with self._exclusive():
+            self._forget(doc_id)
+            self._save()
+    
+    def rebuild(self, documents: Iterable[Tuple[int, str]]) -> None:
+        """
+        Replace the whole index with the given documents
+        
+        Args:
+            documents: (resume ID, raw text) pairs
+        """
+        documents = list(documents)
+        with self._exclusive():
+            self._reset()
+            self._main = self._rows([text for _, text in documents])
+            self._main_ids = np.array([doc_id for doc_id, _ in documents], dtype=np.int64)
+            self._delta = sparse.csr_matrix((0, len(self._terms)), dtype=np.int32)
+            self._save(main=True)
+    
+    # Search
+    
+    @staticmethod
+    def _segment_stats(matrix: sparse.csr_matrix):
+        """Column-major copy, document lengths and document frequencies of a segment"""
+        doc_len = np.asarray(matrix.sum(axis=1), dtype=np.float64).ravel()
+        columns = matrix.tocsc()
+        return columns, doc_len, np.diff(columns.indptr)
+    
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        Rank documents against a query with BM25
+        
+        Args:
+            query: Query text (e.g. job description and required skills)
+            k: Maximum number of results
+            
+        Returns:
+            (resume ID, score) pairs, best first; documents without any
+            query term are omitted
+        """
+        # Shared file lock, so a writer in another process cannot replace files halfway through the load
+        with span("lexical_index.search"), self._lock, self._file_lock(exclusive=False):
+            columns = np.array(sorted({self._vocab[t] for t in tokenize(query) if t in self._vocab}), dtype=np.int64)
+            if len(columns) == 0:
+                return []
+            # The main segment's stats survive uploads; only the small delta is recomputed
+            if self._main_stats is None:
+                self._main_stats = self._segment_stats(self._main)
+            if self._delta_stats is None:
+                self._delta_stats = self._segment_stats(self._delta)
+            main_alive = np.ones(len(self._main_ids), dtype=bool)
+            if self._deleted:
+                main_alive = ~np.isin(self._main_ids, list(self._deleted))
+            segments = [
+                self._main_stats + (self._main_ids, main_alive),
+                self._delta_stats + (self._delta_ids, np.ones(len(self._delta_ids), dtype=bool))
+            ]
+        
+        # Collection statistics across both segments (df counts tombstoned rows until the next merge)
+        num_docs = sum(int(alive.sum()) for *_, alive in segments)
+        total_len = sum(float(doc_len[alive].sum()) for _, doc_len, _, _, alive in segments)
+        avgdl = max(total_len / max(num_docs, 1), 1.0)
+        term_df = np.zeros(len(columns), dtype=np.float64)
+        for matrix, _, df, _, _ in segments:
+            present = columns < matrix.shape[1]
+            term_df[present] += df[columns[present]]
+        idf = np.log1p((num_docs - term_df + 0.5) / (term_df + 0.5))
+        
+        hit_ids, hit_scores = [], []
+        for matrix, doc_len, _, ids, alive in segments:
+            present = np.flatnonzero(columns < matrix.shape[1])
+            if len(ids) == 0 or len(present) == 0:
+                continue
+            sub = matrix[:, columns[present]].tocoo()
+            tf = sub.data.astype(np.float64)
+            norm = self.K1 * (1 - self.B + self.B * doc_len[sub.row] / avgdl)
+            contributions = idf[present][sub.col] * tf * (self.K1 + 1) / (tf + norm)
+            scores = np.bincount(sub.row, weights=contributions, minlength=len(ids))
+            hits = np.flatnonzero((scores > 0) & alive)
+            hit_ids.append(ids[hits])
+            hit_scores.append(scores[hits])
+        
+        if not hit_ids:
+            return []
+        ids = np.concatenate(hit_ids)
+        scores = np.concatenate(hit_scores)
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            ids, scores = ids[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+
+_indexes: Dict[int, LexicalIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_lexical_index(owner_id: int) -> LexicalIndex:
+    """Per-process LexicalIndex for an owner's resumes"""
+    with _indexes_lock:
+        index = _indexes.get(owner_id)
+        if index is None:
+            index = LexicalIndex(
+                os.path.join(settings.INDEX_DIR, "lexical", str(owner_id)),
+                delta_max_docs=settings.LEXICAL_DELTA_MAX_DOCS
+            )
+            _indexes[owner_id] = index
+        return index
+
+
+def index_resume(owner_id: int, resume_id: int, text: str) -> None:
+    """
+    Add a resume to its owner's lexical index
+    
+    Indexes that were never built are left alone: they are built from the
+    database on first use, which picks this resume up (the build also adds
+    resumes committed while it ran, so an upload racing it is not lost).
+    """
+    index = get_lexical_index(owner_id)
+    if not index.exists():
+        return
+    try:
+        index.add(resume_id, text)
+    except Exception as e:
+        logger.error(f"Error indexing resume {resume_id}: {str(e)}")
+
+
+def unindex_resume(owner_id: int, resume_id: int) -> None:
+    """Remove a resume from its owner's lexical index"""
+    index = get_lexical_index(owner_id)
+    if not index.exists():
+        return
+    try:
+        index.remove(resume_id)
+    except Exception as e:
+        logger.error(f"Error removing resume {resume_id} from index: {str(e)}")
@@ -1,44 +1,200 @@
+import hashlib
+import json
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator, Optional, Tuple
 import logging
-from sklearn.metrics.pairwise import cosine_similarity
+import threading
+import time
+
+from ..core.config import settings
+from ..core.metrics import EMBEDDING_SECONDS, MODEL_LOADED, MODEL_LOAD_SECONDS, batch_size_label
+from ..core.profiling import span
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 logger = logging.getLogger(__name__)
 
+# Model behind embeddings stored before vectors were tagged with their model
+LEGACY_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+class EmbeddingModelMismatch(ValueError):
+    """Raised when vectors from different embedding models would be compared"""
+
+
+def compute_job_fingerprint(
+    description: str,
+    required_skills: Optional[List[str]],
+    experience_level: Optional[str]
+) -> str:
+    """
+    Hash the job fields that feed into scoring
+    
+    Args:
+        description: Job description text
+        required_skills: Required skills list
+        experience_level: Required experience level
+        
+    Returns:
+        Hex SHA-256 digest of the scoring inputs
+    """
+    payload = json.dumps([description, required_skills or [], experience_level], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def compute_description_hash(description: str) -> str:
+    """
+    Hash a job description, to tell whether its embedding needs regenerating
+    
+    Args:
+        description: Job description text
+        
+    Returns:
+        Hex SHA-256 digest of the text
+    """
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+def compute_resume_fingerprint(updated_at: Optional[datetime]) -> str:
+    """
+    Fingerprint a resume by its last content update
+    
+    Args:
+        updated_at: Resume updated_at timestamp
+        
+    Returns:
+        ISO timestamp string (empty if unknown)
+    """
+    return updated_at.isoformat() if updated_at else ""
+
 
 class MatchingService:
     """Service for matching resumes with job descriptions using semantic similarity"""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    # Bump whenever a change to the scoring functions alters their output so
+    # that stored match scores are recomputed instead of reused
+    SCORING_VERSION = "1"
+    
+    # Weights used for the overall score unless a job carries its own profile
+    DEFAULT_WEIGHTS = {
+        'semantic': 0.4,
+        'skills': 0.3,
+        'experience': 0.2,
+        'education': 0.1
+    }
+    
+    def __init__(self, model_name: Optional[str] = None, previous_model_name: Optional[str] = None):
         """
         Initialize matching service with sentence transformer model
         
         Args:
-            model_name: Name of the sentence transformer model
+            model_name: Name of the sentence transformer model (settings.SENTENCE_TRANSFORMER_MODEL if None)
+            previous_model_name: Model whose stored vectors stay readable while a
+                re-embedding migration runs (settings.PREVIOUS_SENTENCE_TRANSFORMER_MODEL if None)
+        """
+        self.model_name = model_name or settings.SENTENCE_TRANSFORMER_MODEL
+        self.previous_model_name = previous_model_name or settings.PREVIOUS_SENTENCE_TRANSFORMER_MODEL
+        # Models load on first use (or in warm_up) so that importing the API stays cheap
+        self._models: Dict[str, "SentenceTransformer"] = {}
+        self._load_lock = threading.Lock()
+    
+    @property
+    def model(self) -> "SentenceTransformer":
+        """Current model, loaded on first access"""
+        return self._get_model(self.model_name)
+    
+    @property
+    def embedding_dim(self) -> int:
+        """Dimension of the current model's vectors"""
+        return self.model.get_sentence_embedding_dimension()
+    
+    def warm_up(self) -> None:
+        """Load every readable model now instead of on the first request"""
+        for model_name in self.readable_models:
+            self._get_model(model_name)
+    
+    @property
+    def readable_models(self) -> Tuple[str, ...]:
+        """Models whose stored vectors can be compared (current first)"""
+        if self.previous_model_name and self.previous_model_name != self.model_name:
+            return (self.model_name, self.previous_model_name)
+        return (self.model_name,)
+    
+    def _get_model(self, model_name: str) -> "SentenceTransformer":
+        """Load a readable model on first use"""
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+        if model_name not in (self.model_name, self.previous_model_name):
+            raise EmbeddingModelMismatch(f"Embedding model {model_name} is not configured")
+        with self._load_lock:
+            model = self._models.get(model_name)
+            if model is None:
+                try:
+                    start = time.perf_counter()
+                    # Imported here: sentence_transformers pulls in torch, seconds of import time
+                    from sentence_transformers import SentenceTransformer
+                    model = SentenceTransformer(model_name)
+                    MODEL_LOAD_SECONDS.labels("sentence_transformer", model_name).set(time.perf_counter() - start)
+                    logger.info(f"Loaded sentence transformer model: {model_name}")
+                except Exception as e:
+                    logger.error(f"Error loading model {model_name}: {str(e)}")
+                    raise
+                self._models[model_name] = model
+                MODEL_LOADED.labels("sentence_transformer", model_name).set(1)
+        return model
+    
+    def embedding_space(self, embedding_model: Optional[str]) -> Optional[str]:
+        """
+        Model a stored vector can be compared under
+        
+        Args:
+            embedding_model: Model tag stored with the vector (None for untagged legacy vectors)
+            
+        Returns:
+            The model name if it is readable, None if the vector must be regenerated
         """
-        try:
-            self.model = SentenceTransformer(model_name)
-            logger.info(f"Loaded sentence transformer model: {model_name}")
-        except Exception as e:
-            logger.error(f"Error loading model {model_name}: {str(e)}")
-            raise
+        model_name = embedding_model or LEGACY_EMBEDDING_MODEL
+        return model_name if model_name in self.readable_models else None
     
-    def generate_embedding(self, text: str) -> List[float]:
+    def generate_embedding(self, text: str, model_name: Optional[str] = None) -> List[float]:
         """
         Generate embedding vector for text
         
         Args:
             text: Input text
+            model_name: Readable model to embed with (current model if None)
             
         Returns:
             Embedding vector as list of floats
         """
-        if not text or not text.strip():
-            return [0.0] * 384  # Default dimension for all-MiniLM-L6-v2
+        return self.generate_embeddings([text], model_name)[0]
+    
+    def generate_embeddings(self, texts: List[str], model_name: Optional[str] = None) -> List[List[float]]:
+        """
+        Generate embedding vectors for many texts in one model call
         
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+        Args:
+            texts: Input texts
+            model_name: Readable model to embed with (current model if None)
+            
+        Returns:
+            Embedding vectors in input order (zero vectors for empty texts)
+        """
+        model_name = model_name or self.model_name
+        model = self._get_model(model_name)
+        embeddings = [[0.0] * model.get_sentence_embedding_dimension() for _ in texts]
+        non_empty = [i for i, text in enumerate(texts) if text and text.strip()]
+        if non_empty:
+            start = time.perf_counter()
+            with span("embedding.encode"):
+                encoded = model.encode([texts[i] for i in non_empty], convert_to_numpy=True)
+            EMBEDDING_SECONDS.labels(model_name, batch_size_label(len(non_empty))).observe(time.perf_counter() - start)
+            for i, embedding in zip(non_empty, encoded):
+                embeddings[i] = embedding.tolist()
+        return embeddings
     
     def calculate_semantic_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """
@@ -51,14 +207,21 @@ class MatchingService:
         Returns:
             Similarity score between 0 and 1
         """
-        if not embedding1 or not embedding2:
+        if embedding1 is None or embedding2 is None or len(embedding1) == 0 or len(embedding2) == 0:
             return 0.0
+        if len(embedding1) != len(embedding2):
+            raise EmbeddingModelMismatch(
+                f"Cannot compare embeddings of dimension {len(embedding1)} and {len(embedding2)}"
+            )
         
-        vec1 = np.array(embedding1).reshape(1, -1)
-        vec2 = np.array(embedding2).reshape(1, -1)
+        vec1 = np.asarray(embedding1, dtype=np.float64)
+        vec2 = np.asarray(embedding2, dtype=np.float64)
         
-        similarity = cosine_similarity(vec1, vec2)[0][0]
-        return float(similarity)
+        # Same result as sklearn's cosine_similarity, zero vectors included
+        norms = np.linalg.norm(vec1) * np.linalg.norm(vec2)
+        if norms == 0:
+            return 0.0
+        return float(np.dot(vec1, vec2) / norms)
     
     def calculate_skill_match_score(self, resume_skills: List[str], job_skills: List[str]) -> float:
         """
@@ -163,12 +326,7 @@ class MatchingService:
             Overall score between 0 and 1
         """
         if weights is None:
-            weights = {
-                'semantic': 0.4,
-                'skills': 0.3,
-                'experience': 0.2,
-                'education': 0.1
-            }
+            weights = self.DEFAULT_WEIGHTS
         
         overall = (
             semantic_similarity * weights['semantic'] +
@@ -179,6 +337,204 @@ class MatchingService:
         
         return float(overall)
     
+    def calculate_overall_scores(
+        self,
+        components: np.ndarray,
+        weights: Optional[Dict[str, float]] = None
+    ) -> np.ndarray:
+        """
+        Vectorized overall scores from stored component scores
+        
+        Args:
+            components: Array of shape (n, 4) with semantic, skill, experience
+                and education scores per row (NaN is treated as 0)
+            weights: Optional custom weights for each factor
+            
+        Returns:
+            Array of n overall scores
+        """
+        if weights is None:
+            weights = self.DEFAULT_WEIGHTS
+        
+        weight_vector = np.array([
+            weights['semantic'],
+            weights['skills'],
+            weights['experience'],
+            weights['education']
+        ], dtype=np.float64)
+        
+        return np.nan_to_num(components, nan=0.0) @ weight_vector
+    
+    def calculate_experience_scores(self, experience_counts: np.ndarray, job_experience_level: Optional[str] = None) -> np.ndarray:
+        """
+        Vectorized calculate_experience_score over many resumes
+        
+        Args:
+            experience_counts: Number of experience entries per resume
+            job_experience_level: Required experience level (entry/mid/senior)
+            
+        Returns:
+            Experience scores between 0 and 1
+        """
+        total_years = experience_counts.astype(np.float64)
+        default = np.minimum(total_years / 5, 1.0)
+        level = job_experience_level.lower() if job_experience_level else None
+        
+        if level == 'entry':
+            scores = np.minimum(total_years / 2, 1.0)
+        elif level == 'mid':
+            scores = np.where(total_years >= 2, np.minimum((total_years - 2) / 3, 1.0), default)
+        elif level == 'senior':
+            scores = np.where(total_years >= 5, np.minimum((total_years - 5) / 5, 1.0), default)
+        else:
+            scores = default
+        
+        return np.where(total_years > 0, scores, 0.0)
+    
+    def score_matrix_blocks(
+        self,
+        job_embeddings: np.ndarray,
+        job_skills: List[List[str]],
+        job_experience_levels: List[Optional[str]],
+        job_weights: List[Optional[Dict[str, float]]],
+        resume_embeddings: np.ndarray,
+        resume_skills: List[List[str]],
+        resume_experience_counts: np.ndarray,
+        resume_education_scores: np.ndarray,
+        block_size: int = 4096
+    ) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+        """
+        Score every job against every resume, one block of resumes at a time
+        
+        Semantic similarity for a block is a single (jobs x dim) @ (dim x block)
+        product over L2-normalized embeddings; skill overlap is a product of
+        binary job/resume skill matrices over the jobs' skill vocabulary. Only
+        one block of (jobs x block) matrices is alive at a time.
+        
+        Args:
+            job_embeddings: Array of shape (m, dim)
+            job_skills: Required skills per job
+            job_experience_levels: Experience level per job
+            job_weights: Overall-score weights per job (defaults if None)
+            resume_embeddings: Array of shape (n, dim)
+            resume_skills: Skills per resume
+            resume_experience_counts: Number of experience entries per resume
+            resume_education_scores: Education score per resume
+            block_size: Resumes scored per block
+            
+        Yields:
+            (block_start, scores) where scores maps 'semantic', 'skills',
+            'experience', 'education' and 'overall' to (m, block) arrays
+        """
+        jobs_normalized = _normalize_rows(job_embeddings)
+        
+        # Vocabulary of required skills across all jobs
+        vocabulary: Dict[str, int] = {}
+        for skills in job_skills:
+            for skill in skills:
+                vocabulary.setdefault(skill.lower().strip(), len(vocabulary))
+        
+        job_skill_matrix = np.zeros((len(job_skills), len(vocabulary)), dtype=np.float32)
+        job_skill_counts = np.zeros(len(job_skills), dtype=np.float64)
+        for j, skills in enumerate(job_skills):
+            for skill in skills:
+                job_skill_matrix[j, vocabulary[skill.lower().strip()]] = 1.0
+            job_skill_counts[j] = len(skills)
+        has_job_skills = (job_skill_counts > 0)[:, None]
+        
+        weight_matrix = np.array([
+            [w['semantic'], w['skills'], w['experience'], w['education']]
+            for w in (weights or self.DEFAULT_WEIGHTS for weights in job_weights)
+        ], dtype=np.float64)
+        
+        for start in range(0, len(resume_skills), block_size):
+            stop = min(start + block_size, len(resume_skills))
+            
+            with span("scoring.semantic_block"):
+                semantic = jobs_normalized @ _normalize_rows(resume_embeddings[start:stop]).T
+            
+            resume_skill_matrix = np.zeros((stop - start, len(vocabulary)), dtype=np.float32)
+            has_resume_skills = np.zeros(stop - start, dtype=bool)
+            for i, skills in enumerate(resume_skills[start:stop]):
+                has_resume_skills[i] = bool(skills)
+                for skill in skills:
+                    column = vocabulary.get(skill.lower().strip())
+                    if column is not None:
+                        resume_skill_matrix[i, column] = 1.0
+            
+            overlap = (job_skill_matrix @ resume_skill_matrix.T).astype(np.float64)
+            skills_score = np.where(
+                has_job_skills,
+                np.where(
+                    has_resume_skills[None, :],
+                    np.minimum(overlap / np.maximum(job_skill_counts, 1.0)[:, None], 1.0),
+                    0.0
+                ),
+                1.0
+            )
+            
+            experience_by_level = {
+                level: self.calculate_experience_scores(resume_experience_counts[start:stop], level)
+                for level in set(job_experience_levels)
+            }
+            experience = np.stack([experience_by_level[level] for level in job_experience_levels])
+            education = np.broadcast_to(resume_education_scores[start:stop], semantic.shape)
+            
+            overall = (
+                semantic * weight_matrix[:, 0:1] +
+                skills_score * weight_matrix[:, 1:2] +
+                experience * weight_matrix[:, 2:3] +
+                education * weight_matrix[:, 3:4]
+            )
+            
+            yield start, {
+                'semantic': semantic,
+                'skills': skills_score,
+                'experience': experience,
+                'education': education,
+                'overall': overall
+            }
+    
+    def calculate_semantic_similarities(self, query_embedding: List[float], embeddings: np.ndarray) -> np.ndarray:
+        """
+        Vectorized calculate_semantic_similarity of one vector against many
+        
+        Args:
+            query_embedding: Query vector (e.g. job embedding)
+            embeddings: Vectors from the same model, one per row
+            
+        Returns:
+            Cosine similarity per row (0 for zero vectors)
+        """
+        if len(embeddings) == 0:
+            return np.empty(0, dtype=np.float64)
+        with span("scoring.semantic_similarities"):
+            similarities = _normalize_rows(embeddings) @ _normalize_rows(np.asarray([query_embedding]))[0]
+        return similarities.astype(np.float64)
+    
+    def nearest_neighbors(self, query_embedding: List[float], embeddings: np.ndarray, k: int) -> np.ndarray:
+        """
+        Exact cosine nearest neighbours of a query among stored embeddings
+        
+        Args:
+            query_embedding: Query vector (e.g. job embedding)
+            embeddings: Candidate vectors, one per row
+            k: Number of neighbours to return
+            
+        Returns:
+            Row indices of the k most similar vectors, best first
+        """
+        if len(embeddings) == 0:
+            return np.empty(0, dtype=np.int64)
+        
+        with span("nearest_neighbors"):
+            similarities = _normalize_rows(embeddings) @ _normalize_rows(np.asarray([query_embedding]))[0]
+        if len(similarities) > k:
+            top = np.argpartition(-similarities, k - 1)[:k]
+        else:
+            top = np.arange(len(similarities))
+        return top[np.argsort(-similarities[top], kind="stable")]
+    
     def match_resume_to_job(
         self,
         resume_text: str,
@@ -187,7 +543,11 @@ class MatchingService:
         resume_education: List[Dict],
         job_description: str,
         job_skills: List[str],
-        job_experience_level: Optional[str] = None
+        job_experience_level: Optional[str] = None,
+        resume_embedding: Optional[List[float]] = None,
+        job_embedding: Optional[List[float]] = None,
+        weights: Optional[Dict[str, float]] = None,
+        embedding_model: Optional[str] = None
     ) -> Dict[str, float]:
         """
         Match a resume to a job description and return scores
@@ -200,13 +560,20 @@ class MatchingService:
             job_description: Job description text
             job_skills: Required/preferred skills for the job
             job_experience_level: Required experience level
+            resume_embedding: Precomputed resume embedding (generated if omitted)
+            job_embedding: Precomputed job embedding (generated if omitted)
+            weights: Optional custom weights for the overall score
+            embedding_model: Model both given embeddings come from (current model if None);
+                missing embeddings are generated with it
             
         Returns:
             Dictionary with all matching scores
         """
-        # Generate embeddings
-        resume_embedding = self.generate_embedding(resume_text)
-        job_embedding = self.generate_embedding(job_description)
+        # Generate embeddings unless already stored
+        if resume_embedding is None:
+            resume_embedding = self.generate_embedding(resume_text, embedding_model)
+        if job_embedding is None:
+            job_embedding = self.generate_embedding(job_description, embedding_model)
         
         # Calculate semantic similarity
         semantic_sim = self.calculate_semantic_similarity(resume_embedding, job_embedding)
@@ -222,7 +589,7 @@ class MatchingService:
         
         # Calculate overall score
         overall_score = self.calculate_overall_score(
-            semantic_sim, skill_match, experience_score, education_score
+            semantic_sim, skill_match, experience_score, education_score, weights
         )
         
         return {
@@ -234,3 +601,10 @@ class MatchingService:
             'resume_embedding': resume_embedding,
             'job_embedding': job_embedding
         }
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows, leaving all-zero rows as zeros (cosine similarity 0)"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
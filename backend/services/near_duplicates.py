@@ -0,0 +1,98 @@
+import hashlib
+import zlib
+from typing import List, Optional
+
+import numpy as np
+
+from .lexical_index import tokenize
+
+# Modulus for the universal hash family (a * x + b) mod p; 32-bit shingle hashes
+# times 32-bit coefficients stay below 2**64, so uint64 arithmetic cannot overflow
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class NearDuplicateDetector:
+    """MinHash signatures over word shingles with LSH banding for candidate lookup"""
+    
+    def __init__(self, num_perm: int = 128, bands: int = 32, shingle_size: int = 5, seed: int = 1):
+        """
+        Initialize the hash family
+        
+        Args:
+            num_perm: Signature length (number of hash permutations)
+            bands: LSH bands; num_perm must be divisible by it. With 32 bands of
+                4 rows, pairs above ~0.42 Jaccard similarity become candidates
+            shingle_size: Words per shingle
+            seed: Seed for the permutation coefficients (changing it invalidates stored signatures)
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        """32-bit hashes of the distinct word shingles of text"""
+        words = tokenize(text)
+        if not words:
+            return np.empty(0, dtype=np.uint64)
+        
+        size = min(self.shingle_size, len(words))
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+        return np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+    
+    def signature(self, text: str) -> Optional[List[int]]:
+        """
+        MinHash signature of a document
+        
+        Args:
+            text: Document text
+            
+        Returns:
+            num_perm hash minima, or None if the text has no words
+        """
+        hashes = self._shingle_hashes(text)
+        if len(hashes) == 0:
+            return None
+        
+        # (num_perm, num_shingles) permuted hashes; minimum per permutation
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=1).astype(np.int64).tolist()
+    
+    def band_keys(self, signature: List[int]) -> List[str]:
+        """
+        LSH bucket key of each band of a signature
+        
+        Args:
+            signature: MinHash signature
+            
+        Returns:
+            One short hex digest per band (index = band number)
+        """
+        values = np.asarray(signature, dtype=np.uint32)
+        return [
+            hashlib.blake2b(values[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8).hexdigest()
+            for band in range(self.bands)
+        ]
+    
+    @staticmethod
+    def similarity(signature1: List[int], signature2: List[int]) -> float:
+        """
+        Estimated Jaccard similarity of the shingle sets behind two signatures
+        
+        Args:
+            signature1: First MinHash signature
+            signature2: Second MinHash signature
+            
+        Returns:
+            Fraction of agreeing signature positions (0-1)
+        """
+        if not signature1 or not signature2 or len(signature1) != len(signature2):
+            return 0.0
+        return float(np.mean(np.asarray(signature1) == np.asarray(signature2)))
@@ -1,24 +1,55 @@
-import spacy
 import re
+import threading
+import time
 from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime
 
+from ..core.config import settings
+from ..core.metrics import MODEL_LOADED, MODEL_LOAD_SECONDS, timed_stage
+from ..core.profiling import span
+
 logger = logging.getLogger(__name__)
 
 
 class NLPEngine:
     """NLP service for extracting structured information from resume text"""
     
-    def __init__(self):
+    def __init__(self, model_name: Optional[str] = None):
         """
         Initialize NLP engine with spaCy model
         
         Args:
-            model_name: Name of the spaCy model to use
+            model_name: Name of the spaCy model to use (settings.SPACY_MODEL if None)
         """
-
+        self.model_name = model_name or settings.SPACY_MODEL
+        # Loaded on first use (or in warm_up) so that importing the API stays cheap
+        self._nlp = None
+        self._load_lock = threading.Lock()
+    
+    @property
+    def nlp(self):
+        """spaCy pipeline, loaded on first access"""
+        if self._nlp is None:
+            with self._load_lock:
+                if self._nlp is None:
+                    try:
+                        start = time.perf_counter()
+                        import spacy
+                        self._nlp = spacy.load(self.model_name)
+                        MODEL_LOAD_SECONDS.labels("spacy", self.model_name).set(time.perf_counter() - start)
+                        MODEL_LOADED.labels("spacy", self.model_name).set(1)
+                        logger.info(f"Loaded spaCy model: {self.model_name}")
+                    except Exception as e:
+                        logger.error(f"Error loading spaCy model {self.model_name}: {str(e)}")
+                        raise
+        return self._nlp
     
+    def warm_up(self) -> None:
+        """Load the spaCy model now instead of on the first request"""
+        self.nlp
+    
+    @timed_stage("nlp.extract_skills")
     def extract_skills(self, text: str, common_skills: Optional[List[str]] = None) -> List[str]:
         """
         Extract skills from resume text
@@ -60,6 +91,7 @@ class NLPEngine:
         # Remove duplicates and return
         return list(set(skills_found))
     
+    @timed_stage("nlp.extract_experience")
     def extract_experience(self, text: str) -> List[Dict[str, Any]]:
         """
         Extract work experience from resume text
@@ -130,6 +162,7 @@ class NLPEngine:
         
         return cleaned_entries
     
+    @timed_stage("nlp.extract_education")
     def extract_education(self, text: str) -> List[Dict[str, Any]]:
         """
         Extract education information from resume text
@@ -201,11 +234,12 @@ class NLPEngine:
         Returns:
             Dictionary with extracted skills, experience, and education
         """
-        return {
-            'skills': self.extract_skills(text),
-            'experience': self.extract_experience(text),
-            'education': self.extract_education(text)
-        }
+        with span("nlp.process_resume"):
+            return {
+                'skills': self.extract_skills(text),
+                'experience': self.extract_experience(text),
+                'education': self.extract_education(text)
+            }
 
 if __name__ == "__main__":
     my_engine = NLPEngine()
@@ -0,0 +1,119 @@
+import heapq
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Equal-width bins over [0, 1] used to summarize scores that are not kept
+HISTOGRAM_BINS = 10
+
+# Standard damping constant for reciprocal rank fusion
+RRF_K = 60
+
+
+class TopMatches:
+    """Streaming top-k selection over match dicts with a score histogram"""
+    
+    def __init__(self, k: Optional[int] = None, bins: int = HISTOGRAM_BINS):
+        """
+        Initialize an empty selection
+        
+        Args:
+            k: Number of best matches to keep (keep every match if None)
+            bins: Number of histogram bins over the [0, 1] score range
+        """
+        self.k = k
+        self.bins = bins
+        self.total = 0
+        self._counts = [0] * bins
+        self._heap: List[Tuple[float, int, Dict[str, Any]]] = []
+    
+    def _bin(self, score: float) -> int:
+        return min(max(int(score * self.bins), 0), self.bins - 1)
+    
+    def extend(self, matches: List[Dict[str, Any]]) -> None:
+        """
+        Add scored matches, keeping only the k best in O(log k) per match
+        
+        Args:
+            matches: Match dicts with at least resume_id and overall_score
+        """
+        for m in matches:
+            self.total += 1
+            self._counts[self._bin(m['overall_score'])] += 1
+            self._push(m)
+    
+    def extend_scores(self, scores: np.ndarray, build_match: Callable[[int], Dict[str, Any]]) -> None:
+        """
+        Add a block of overall scores, building match dicts only for top-k candidates
+        
+        Args:
+            scores: Overall scores for a block of resumes
+            build_match: Returns the match dict for a position in the block
+        """
+        self.total += len(scores)
+        bins = np.clip((scores * self.bins).astype(np.int64), 0, self.bins - 1)
+        for i, count in enumerate(np.bincount(bins, minlength=self.bins)):
+            self._counts[i] += int(count)
+        
+        if self.k is not None and self.k < len(scores):
+            # Only the block's k best can enter the heap
+            candidates = np.argpartition(-scores, self.k - 1)[:self.k]
+        else:
+            candidates = range(len(scores))
+        for i in candidates:
+            self._push(build_match(int(i)))
+    
+    def _push(self, m: Dict[str, Any]) -> None:
+        # Resume IDs are unique, so ties never fall through to comparing dicts
+        item = (m['overall_score'], -m['resume_id'], m)
+        if self.k is None or len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+    
+    def ranked(self) -> List[Dict[str, Any]]:
+        """
+        Kept matches, best first
+        
+        Returns:
+            Copies of the kept match dicts with 'rank' assigned from 1
+        """
+        top = [item[2] for item in sorted(self._heap, reverse=True)]
+        return [dict(m, rank=rank) for rank, m in enumerate(top, start=1)]
+    
+    def tail_histogram(self) -> Optional[Dict[str, List]]:
+        """
+        Histogram of the scores that were not kept
+        
+        Returns:
+            Dict with 'bin_edges' and 'counts', or None if nothing was cut
+        """
+        if self.k is None or self.total <= self.k:
+            return None
+        
+        counts = list(self._counts)
+        for score, _, _ in self._heap:
+            counts[self._bin(score)] -= 1
+        
+        return {
+            'bin_edges': [i / self.bins for i in range(self.bins + 1)],
+            'counts': counts
+        }
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int = RRF_K) -> List[Tuple[int, float]]:
+    """
+    Fuse several best-first rankings of IDs with reciprocal rank fusion
+    
+    Args:
+        rankings: Ranked ID lists (e.g. lexical and dense retrieval results)
+        k: Damping constant; larger values flatten the contribution of top ranks
+        
+    Returns:
+        (ID, fused score) pairs, best first
+    """
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + 1.0 / (k + rank)
+    
+    return sorted(fused.items(), key=lambda item: (-item[1], item[0]))
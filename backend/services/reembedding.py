@@ -0,0 +1,179 @@
+"""
+Throttled, resumable migration of stored embeddings to the current model
+
+Set PREVIOUS_SENTENCE_TRANSFORMER_MODEL to the old model and
+SENTENCE_TRANSFORMER_MODEL to the new one, then run:
+
+    python -m backend.services.reembedding --batch-size 64 --delay 0.5
+
+While it runs, matching keeps comparing old vectors with the job embedded
+in the old model (dual-read). Progress lives in the rows' embedding_model
+tags, so an interrupted run picks up where it stopped when started again.
+Unset PREVIOUS_SENTENCE_TRANSFORMER_MODEL once nothing is pending.
+"""
+import argparse
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..database.models import Job, Resume
+from ..database.session import SessionLocal
+from .embedding_store import store_embeddings
+from .matching_service import MatchingService
+
+logger = logging.getLogger(__name__)
+
+
+class ReembeddingJob:
+    """Re-embeds resumes and jobs whose vectors come from another model, in throttled batches"""
+    
+    def __init__(
+        self,
+        matching_service: MatchingService,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = settings.REEMBED_BATCH_SIZE,
+        delay_seconds: float = settings.REEMBED_BATCH_DELAY_SECONDS
+    ):
+        """
+        Initialize the job
+        
+        Args:
+            matching_service: Service whose current model is the migration target
+            session_factory: Factory for sync database sessions
+            batch_size: Rows embedded and committed per batch
+            delay_seconds: Pause between batches
+        """
+        self.matching_service = matching_service
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.delay_seconds = delay_seconds
+    
+    def _stale(self, model):
+        """Rows whose embedding is missing or was produced by another model"""
+        return or_(
+            model.embedding_model.is_(None),
+            model.embedding_model != self.matching_service.model_name
+        )
+    
+    def pending(self) -> Dict[str, int]:
+        """
+        Count rows still to migrate
+        
+        Returns:
+            Pending row count per table
+        """
+        with self.session_factory() as db:
+            return {
+                model.__tablename__: db.scalar(select(func.count()).select_from(model).where(self._stale(model)))
+                for model in (Resume, Job)
+            }
+    
+    def migrate(self, model, text_column, limit: Optional[int] = None) -> int:
+        """
+        Re-embed one table's stale rows in id order
+        
+        A row edited after it was read keeps its old vector: the UPDATE is
+        conditional on updated_at, and the row is retried on the next run.
+        
+        Args:
+            model: Resume or Job
+            text_column: Column holding the text to embed
+            limit: Stop after this many rows (all if None)
+            
+        Returns:
+            Number of rows migrated
+        """
+        table = model.__table__
+        stmt = update(table).where(
+            table.c.id == bindparam("b_id"),
+            table.c.updated_at == bindparam("b_updated_at")
+        ).values(
+            embedding=bindparam("b_embedding"),
+            embedding_model=self.matching_service.model_name,
+            embedding_dim=bindparam("b_embedding_dim"),
+            updated_at=table.c.updated_at
+        )
+        
+        migrated = 0
+        last_id = 0
+        while limit is None or migrated < limit:
+            batch_size = self.batch_size if limit is None else min(self.batch_size, limit - migrated)
+            with self.session_factory() as db:
+                rows = db.execute(
+                    select(model.id, model.updated_at, model.owner_id, text_column)
+                    .where(self._stale(model), model.id > last_id)
+                    .order_by(model.id)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                
+                embeddings = self.matching_service.generate_embeddings([row[3] or "" for row in rows])
+                db.execute(stmt, [
+                    {
+                        "b_id": row.id,
+                        "b_updated_at": row.updated_at,
+                        "b_embedding": embedding,
+                        "b_embedding_dim": len(embedding)
+                    }
+                    for row, embedding in zip(rows, embeddings)
+                ])
+                db.commit()
+            
+            if model is Resume:
+                # Keep the host-local mmap store in step with the new tags
+                by_owner: Dict[int, Dict[int, list]] = {}
+                for row, embedding in zip(rows, embeddings):
+                    by_owner.setdefault(row.owner_id, {})[row.id] = embedding
+                for owner_id, owner_embeddings in by_owner.items():
+                    store_embeddings(owner_id, self.matching_service.model_name, owner_embeddings)
+            
+            migrated += len(rows)
+            last_id = rows[-1].id
+            logger.info(f"Re-embedded {migrated} {table.name} rows (last id {last_id})")
+            
+            # Leave CPU and the database to request traffic
+            if self.delay_seconds:
+                time.sleep(self.delay_seconds)
+        
+        return migrated
+    
+    def run(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """
+        Migrate resumes, then jobs
+        
+        Args:
+            limit: Maximum rows per table for this run (all if None)
+            
+        Returns:
+            Rows migrated per table
+        """
+        return {
+            "resumes": self.migrate(Resume, Resume.raw_text, limit),
+            "jobs": self.migrate(Job, Job.description, limit)
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=settings.REEMBED_BATCH_SIZE)
+    parser.add_argument("--delay", type=float, default=settings.REEMBED_BATCH_DELAY_SECONDS, help="Seconds between batches")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum rows per table for this run")
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many rows are pending")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    job = ReembeddingJob(MatchingService(), batch_size=args.batch_size, delay_seconds=args.delay)
+    print(f"Target model: {job.matching_service.model_name}")
+    print(f"Pending: {job.pending()}")
+    if not args.dry_run:
+        print(f"Migrated: {job.run(args.limit)}")
+        print(f"Pending: {job.pending()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
 import os
-import pdfplumber
-from docx import Document
 from typing import Dict, Any
 import logging
 
+from ..core.metrics import timed_stage
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,6 +13,7 @@ class ResumeParser:
     def __init__(self):
         self.supported_formats = ['.pdf', '.docx']
     
+    @timed_stage("parse")
     def parse(self, file_path: str) -> Dict[str, Any]:
         """
         Parse a resume file and extract raw text
@@ -49,6 +50,9 @@ class ResumeParser:
     
     def _parse_pdf(self, file_path: str) -> str:
         """Extract text from PDF file"""
+        # PDF/DOCX libraries are imported on first parse to keep startup cheap
+        import pdfplumber
+        
         text_parts = []
         try:
             with pdfplumber.open(file_path) as pdf:
@@ -64,6 +68,8 @@ class ResumeParser:
     
     def _parse_docx(self, file_path: str) -> str:
         """Extract text from DOCX file"""
+        from docx import Document
+        
         try:
             doc = Document(file_path)
             paragraphs = [para.text for para in doc.paragraphs if para.text.strip()]